@@ -55,6 +55,12 @@ from libqtile.backend.x11.xcursors import Cursors
 from libqtile.log_utils import logger
 from libqtile.utils import hex
 
+try:
+    import numpy
+    has_numpy = True
+except ImportError:
+    has_numpy = False
+
 keysyms = xkeysyms.keysyms
 
 
@@ -185,6 +191,30 @@ PropertyMap = {
 for _name in net_wm_states:
     PropertyMap[_name] = ('ATOM', 32)
 
+# The (property, type) pairs read while a new client is being managed. These
+# are all requested at once by Window.prefetch so that setting up a client
+# costs a single round trip to the X server.
+PrefetchProperties = (
+    ("QTILE_INTERNAL", "CARDINAL"),
+    ("WM_STATE", xcffib.xproto.GetPropertyType.Any),
+    ("WM_HINTS", xcffib.xproto.GetPropertyType.Any),
+    ("WM_NORMAL_HINTS", xcffib.xproto.GetPropertyType.Any),
+    ("WM_PROTOCOLS", "ATOM"),
+    ("WM_CLASS", "STRING"),
+    ("WM_WINDOW_ROLE", "STRING"),
+    ("WM_TRANSIENT_FOR", "WINDOW"),
+    ("WM_NAME", "UTF8_STRING"),
+    ("WM_NAME", xcffib.xproto.GetPropertyType.Any),
+    ("_NET_WM_NAME", "UTF8_STRING"),
+    ("_NET_WM_VISIBLE_NAME", "UTF8_STRING"),
+    ("_NET_WM_DESKTOP", "CARDINAL"),
+    ("_NET_WM_WINDOW_TYPE", "ATOM"),
+    ("_NET_WM_STATE", "ATOM"),
+    ("_NET_WM_PID", "CARDINAL"),
+    ("_NET_WM_STRUT", "CARDINAL"),
+    ("_NET_WM_STRUT_PARTIAL", "CARDINAL"),
+)
+
 # TODO add everything required here:
 # http://standards.freedesktop.org/wm-spec/latest/ar01s03.html
 SUPPORTED_ATOMS = [
@@ -399,6 +429,91 @@ class XFixes:
                                                   self.selection_mask)
 
 
+def iter_net_wm_icon(raw):
+    """Walk the images of a raw _NET_WM_ICON value without copying it
+
+    Yields (width, height, start) for each image, where start is the index of
+    its first pixel when the value is viewed as 32 bit cardinals.
+    """
+    words = memoryview(raw)[:len(raw) // 4 * 4].cast("I")
+    pos = 0
+    while pos + 2 <= len(words):
+        width, height = words[pos], words[pos + 1]
+        pos += 2
+        if not width or not height or pos + width * height > len(words):
+            break
+        yield width, height, pos
+        pos += width * height
+
+
+def premultiply_argb32(data):
+    """Premultiply the colours of native endian ARGB32 pixels in place
+
+    data must be a writable buffer, e.g. a bytearray, as cairo expects
+    premultiplied alpha for FORMAT_ARGB32 surfaces.
+    """
+    if has_numpy:
+        pixels = numpy.frombuffer(data, dtype=numpy.uint8).reshape(-1, 4)
+        alpha = pixels[:, 3:].astype(numpy.uint16)
+        pixels[:, :3] = pixels[:, :3] * alpha // 255
+        return
+
+    # without numpy, at least skip the opaque pixels which make up most of
+    # a typical icon
+    for i, alpha in enumerate(data[3::4]):
+        if alpha == 255:
+            continue
+        i *= 4
+        data[i] = data[i] * alpha // 255
+        data[i + 1] = data[i + 1] * alpha // 255
+        data[i + 2] = data[i + 2] * alpha // 255
+
+
+class PropertySnapshot:
+    """
+        The replies to a batch of requests about a single window. All of the
+        requests are sent before any reply is waited for, so the whole batch
+        costs one round trip. Errors are kept and raised again when the
+        corresponding reply is asked for.
+    """
+    def __init__(self, window, properties):
+        core = window.conn.conn.core
+        cookies = OrderedDict()
+        cookies["geometry"] = core.GetGeometry(window.wid)
+        cookies["attributes"] = core.GetWindowAttributes(window.wid)
+        for prop, type in properties:
+            key = window._property_key(prop, type)
+            if key not in cookies:
+                cookies[key] = core.GetProperty(
+                    False, window.wid, key[0], key[1], 0, (2 ** 32) - 1
+                )
+
+        self.replies = {}
+        for key, cookie in cookies.items():
+            try:
+                self.replies[key] = cookie.reply()
+            except xcffib.Error as e:
+                self.replies[key] = e
+
+    def __contains__(self, key):
+        return key in self.replies
+
+    def get(self, key):
+        reply = self.replies[key]
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    def discard(self, key):
+        """Forget a reply that is known to be out of date"""
+        self.replies.pop(key, None)
+
+    def discard_property(self, atom):
+        """Forget the replies for a property, whatever type it was read as"""
+        for key in [k for k in self.replies if isinstance(k, tuple) and k[0] == atom]:
+            del self.replies[key]
+
+
 class NetWmState:
     """NetWmState is a descriptor for _NET_WM_STATE_* properties"""
     def __init__(self, prop_name):
@@ -446,6 +561,25 @@ class Window:
     def __init__(self, conn, wid):
         self.conn = conn
         self.wid = wid
+        self.snapshot = None
+
+    def prefetch(self, properties=PrefetchProperties):
+        """Fetch the geometry, attributes and the given properties in one go
+
+        Until ``drop_prefetched`` is called, the getters of this window are
+        answered from the fetched replies rather than from the X server.
+        """
+        self.snapshot = PropertySnapshot(self, properties)
+        return self.snapshot
+
+    def drop_prefetched(self):
+        self.snapshot = None
+
+    def _property_key(self, prop, type):
+        return (
+            self.conn.atoms[prop] if isinstance(prop, str) else prop,
+            self.conn.atoms[type] if isinstance(type, str) else type,
+        )
 
     def _property_string(self, r):
         """Extract a string from a window property reply message"""
@@ -571,6 +705,29 @@ class Window:
         if r:
             return r[0]
 
+    def get_net_wm_icon(self, size=None):
+        """Return the window's icons as premultiplied ARGB32 buffers
+
+        The result maps "WxH" to a bytearray that can be handed to
+        cairocffi.ImageSurface.create_for_data. If size is given, only the
+        image whose width is closest to it is decoded.
+        """
+        r = self.get_property("_NET_WM_ICON", "CARDINAL")
+        if not r:
+            return {}
+
+        raw = r.value.buf()
+        images = list(iter_net_wm_icon(raw))
+        if size is not None and images:
+            images = [min(images, key=lambda i: abs(size - i[0]))]
+
+        icons = {}
+        for width, height, start in images:
+            data = bytearray(raw[start * 4:(start + width * height) * 4])
+            premultiply_argb32(data)
+            icons["%sx%s" % (width, height)] = data
+        return icons
+
     def get_wm_icon_name(self):
         r = self.get_property("_NET_WM_ICON_NAME", "UTF8_STRING")
         if r:
@@ -586,6 +743,8 @@ class Window:
             return self._property_utf8(r)
 
     def get_geometry(self):
+        if self.snapshot is not None and "geometry" in self.snapshot:
+            return self.snapshot.get("geometry")
         q = self.conn.conn.core.GetGeometry(self.wid)
         return q.reply()
 
@@ -621,6 +780,8 @@ class Window:
         Arguments can be: x, y, width, height, border, sibling, stackmode
         """
         mask, values = ConfigureMasks(**kwargs)
+        if self.snapshot is not None:
+            self.snapshot.discard("geometry")
         # older versions of xcb pack everything into unsigned ints "=I"
         # since 1.12, uses switches to pack things sensibly
         if float(".".join(xcffib.__xcb_proto_version__.split(".")[0: 2])) < 1.12:
@@ -675,6 +836,9 @@ class Window:
             # wrap it.
             value = [value]
 
+        if self.snapshot is not None:
+            self.snapshot.discard_property(self.conn.atoms[name])
+
         try:
             self.conn.conn.core.ChangePropertyChecked(
                 xcffib.xproto.PropMode.Replace,
@@ -704,17 +868,14 @@ class Window:
             else:
                 type, _ = PropertyMap[prop]
 
+        key = self._property_key(prop, type)
         try:
-            r = self.conn.conn.core.GetProperty(
-                False, self.wid,
-                self.conn.atoms[prop]
-                if isinstance(prop, str)
-                else prop,
-                self.conn.atoms[type]
-                if isinstance(type, str)
-                else type,
-                0, (2 ** 32) - 1
-            ).reply()
+            if self.snapshot is not None and key in self.snapshot:
+                r = self.snapshot.get(key)
+            else:
+                r = self.conn.conn.core.GetProperty(
+                    False, self.wid, key[0], key[1], 0, (2 ** 32) - 1
+                ).reply()
         except (xcffib.xproto.WindowError, xcffib.xproto.AccessError):
             logger.debug(
                 'X error in GetProperty (wid=%r, prop=%r), ignoring',
@@ -747,6 +908,8 @@ class Window:
         self.conn.conn.core.UnmapWindowUnchecked(self.wid)
 
     def get_attributes(self):
+        if self.snapshot is not None and "attributes" in self.snapshot:
+            return self.snapshot.get("attributes")
         return self.conn.conn.core.GetWindowAttributes(self.wid).reply()
 
     def query_tree(self):
@@ -165,9 +165,14 @@ class Bar(Gap, configurable.Configurable):
         self.window = None
 
         self.queued_draws = 0
+        # widgets waiting to be redrawn, unless the whole bar is
+        self._dirty = set()
+        self._draw_all = True
+        self._lengths = None
 
     def _configure(self, qtile, screen):
         Gap._configure(self, qtile, screen)
+        self._draw_all = True
 
         if self.margin:
             if isinstance(self.margin, int):
@@ -364,15 +369,41 @@ class Bar(Gap, configurable.Configurable):
         if self.saved_focus is not None:
             self.saved_focus.window.set_input_focus()
 
-    def draw(self):
+    def draw(self, widget=None):
+        """Schedule a redraw of the bar
+
+        If widget is given, only that widget is redrawn, unless the length of
+        any widget changed since the last draw and the widgets have to be
+        rearranged. Draws requested before the next loop iteration are
+        coalesced.
+        """
+        if widget is None:
+            self._draw_all = True
+        else:
+            self._dirty.add(widget)
         if self.queued_draws == 0:
             self.qtile.call_soon(self._actual_draw)
         self.queued_draws += 1
 
     def _actual_draw(self):
         self.queued_draws = 0
+        dirty = self._dirty
+        self._dirty = set()
+
+        lengths = [i.length for i in self.widgets if i.length_type != STRETCH]
+        if not self._draw_all and lengths == self._lengths:
+            for i in self.widgets:
+                if i in dirty:
+                    i.draw()
+            return
+
+        self._draw_all = False
+        self._lengths = lengths
         self._resize(self.length, self.widgets)
         for i in self.widgets:
+            # keep each widget's pixmap the size of the widget, not the bar
+            i.drawer.width = i.width
+            i.drawer.height = i.height
             i.draw()
         if self.widgets:
             end = i.offset + i.length
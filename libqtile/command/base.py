@@ -50,10 +50,35 @@ class CommandException(Exception):
     """Error raised while executing a command"""
 
 
+def in_executor(func: Callable) -> Callable:
+    """Run the decorated command in an executor thread when called over IPC
+
+    The IPC server then awaits the command rather than blocking the event loop
+    on it, so it must only do work that is safe outside the main thread, such
+    as file or network I/O. A command that times out can't be stopped, and
+    keeps its thread until it returns.
+    """
+    func.command_in_executor = True  # type: ignore
+    return func
+
+
+def command_timeout(seconds: float) -> Callable[[Callable], Callable]:
+    """Set how long the IPC server waits for the decorated command
+
+    Only commands that are coroutines or run in an executor can time out.
+    """
+    def decorator(func: Callable) -> Callable:
+        func.command_timeout = seconds  # type: ignore
+        return func
+    return decorator
+
+
 class CommandObject(metaclass=abc.ABCMeta):
     """Base class for objects that expose commands
 
     Each command should be a method named `cmd_X`, where X is the command name.
+    Commands that would block for long can be coroutines or be decorated with
+    `in_executor`, and are then awaited by the IPC server.
     A CommandObject should also implement `._items()` and `._select()` methods
     (c.f. docstring for `.items()` and `.select()`).
     """
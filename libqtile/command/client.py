@@ -62,13 +62,26 @@ class CommandClient:
             specified, the command graph root is used.
         """
         if command is None:
-            command = IPCCommandInterface(Client(find_sockfile()))
+            command = IPCCommandInterface(Client(find_sockfile(), persistent=True))
         self._command = command
         if current_node is None:
             self._current_node = CommandGraphRoot()  # type: GraphType
         else:
             self._current_node = current_node
 
+    def close(self) -> None:
+        """Close the connection to qtile
+
+        The connection is shared with every client navigated to from this one.
+        """
+        self._command.close()
+
+    def __enter__(self) -> "CommandClient":
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb) -> None:
+        self.close()
+
     def __call__(self, *args, **kwargs) -> Any:
         """When the client has navigated to a command, execute it"""
         if not isinstance(self._current_node, CommandGraphCall):
@@ -98,7 +111,7 @@ class CommandClient:
         if name not in self.children:
             raise SelectError("Not valid child", name, self._current_node.selectors)
         if selector is not None:
-            if self._command.has_item(self._current_node, name, selector):
+            if not self._command.has_item(self._current_node, name, selector):
                 raise SelectError("Item not available in object", name, self._current_node.selectors)
 
         next_node = self._current_node.navigate(name, selector)
@@ -120,9 +133,7 @@ class CommandClient:
         if not isinstance(self._current_node, CommandGraphNode):
             raise SelectError("Invalid navigation", "", self._current_node.selectors)
 
-        command_call = self._current_node.call("commands")
-        commands = self._command.execute(command_call, (), {})
-        if name not in commands:
+        if not self._command.has_command(self._current_node, name):
             raise SelectError("Not valid child or command", name, self._current_node.selectors)
         next_node = self._current_node.call(name)
         return self.__class__(self._command, current_node=next_node)
@@ -169,13 +180,26 @@ class InteractiveCommandClient:
             specified, the command graph root is used.
         """
         if command is None:
-            command = IPCCommandInterface(Client(find_sockfile()))
+            command = IPCCommandInterface(Client(find_sockfile(), persistent=True))
         self._command = command
         if current_node is None:
             self._current_node = CommandGraphRoot()  # type: GraphType
         else:
             self._current_node = current_node
 
+    def close(self) -> None:
+        """Close the connection to qtile
+
+        The connection is shared with every client navigated to from this one.
+        """
+        self._command.close()
+
+    def __enter__(self) -> "InteractiveCommandClient":
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb) -> None:
+        self.close()
+
     def __call__(self, *args, **kwargs) -> Any:
         """When the client has navigated to a command, execute it"""
         if not isinstance(self._current_node, CommandGraphCall):
@@ -22,11 +22,14 @@
 The interface to execute commands on the command graph
 """
 
+import asyncio
+import inspect
 import traceback
 from abc import ABCMeta, abstractmethod
-from typing import Any, Dict, List, Tuple, Union
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Tuple, Union
 
-from libqtile import ipc
+from libqtile import hook, ipc
 from libqtile.command.base import (
     CommandError,
     CommandException,
@@ -44,6 +47,36 @@ SUCCESS = 0
 ERROR = 1
 EXCEPTION = 2
 
+# seconds the IPC server waits for commands that it awaits, unless they set
+# their own with base.command_timeout
+COMMAND_TIMEOUT = 10
+
+BatchCallType = Tuple[CommandGraphCall, Tuple, Dict]
+
+
+def format_hook_arg(obj: Any) -> Any:
+    """A compact description of an object passed to a hook
+
+    Windows are described by their id and name, screens by their index, and
+    other objects with a name, such as groups and layouts, by their type and
+    name, as sending the objects themselves would be both large and slow.
+    """
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    if isinstance(obj, (list, tuple)):
+        return [format_hook_arg(i) for i in obj]
+    if isinstance(obj, dict):
+        return {str(k): format_hook_arg(v) for k, v in obj.items()}
+    window = getattr(obj, "window", None)
+    if window is not None and hasattr(window, "wid"):
+        return {"type": "window", "id": window.wid, "name": getattr(obj, "name", None)}
+    if isinstance(getattr(obj, "index", None), int) and hasattr(obj, "group"):
+        return {"type": "screen", "index": obj.index}
+    name = getattr(obj, "name", None)
+    if isinstance(name, str):
+        return {"type": type(obj).__name__.lstrip("_").lower(), "name": name}
+    return str(obj)
+
 
 def format_selectors(selectors: List[SelectorType]) -> str:
     """Build the path to the selected command graph node"""
@@ -117,6 +150,37 @@ class CommandInterface(metaclass=ABCMeta):
             True if the item is resolved on the given node
         """
 
+    def close(self) -> None:
+        """Release any connection held by the interface"""
+
+    def execute_batch(self, calls: List[BatchCallType], stop_on_error: bool = False) -> List[Tuple[int, Any]]:
+        """Execute the given calls in order, returning the status and result of each
+
+        Parameters
+        ----------
+        calls:
+            The (call, args, kwargs) tuples to execute.
+        stop_on_error:
+            If True, do not execute any more calls after one fails.
+
+        Returns
+        -------
+        List[Tuple[int, Any]]
+            A (status, result) pair for each call that was executed, where the
+            status is one of SUCCESS, ERROR or EXCEPTION.
+        """
+        results = []
+        for call, args, kwargs in calls:
+            try:
+                results.append((SUCCESS, self.execute(call, args, kwargs)))
+            except (CommandError, SelectError) as err:
+                results.append((ERROR, str(err)))
+            except Exception:
+                results.append((EXCEPTION, traceback.format_exc()))
+            if stop_on_error and results[-1][0] != SUCCESS:
+                break
+        return results
+
 
 class QtileCommandInterface(CommandInterface):
     """Execute the commands via the in process running qtile instance"""
@@ -212,6 +276,10 @@ class IPCCommandInterface(CommandInterface):
         """
         self._client = ipc_client
 
+    def close(self) -> None:
+        """Close the connection of the IPC client"""
+        self._client.close()
+
     def execute(self, call: CommandGraphCall, args: Tuple, kwargs: Dict) -> Any:
         """Execute the given call, returning the result of the execution
 
@@ -236,6 +304,21 @@ class IPCCommandInterface(CommandInterface):
             raise CommandError(result)
         raise CommandException(result)
 
+    def execute_batch(self, calls: List[BatchCallType], stop_on_error: bool = False) -> List[Tuple[int, Any]]:
+        """Execute the given calls in order with a single IPC message
+
+        The server executes all of them before handling anything else, so no
+        intermediate state is drawn. See CommandInterface.execute_batch.
+        """
+        results = self._client.send({
+            "batch": [
+                (call.parent.selectors, call.name, args, kwargs)
+                for call, args, kwargs in calls
+            ],
+            "stop_on_error": stop_on_error,
+        })
+        return [(status, result) for status, result in results]
+
     def has_command(self, node: CommandGraphNode, command: str) -> bool:
         """Check if the given command exists
 
@@ -284,6 +367,36 @@ class IPCCommandInterface(CommandInterface):
         return items is not None and item in items
 
 
+class BatchCommandInterface(CommandInterface):
+    """Record the calls made through it, to execute them together later
+
+    Wrap another command interface in this and use it with a CommandClient or
+    InteractiveCommandClient; calls made through the client then return None
+    and are recorded until flush() executes them all through the wrapped
+    interface, which for IPC means a single round trip. Commands and items
+    are not checked while recording, errors are reported in the results of
+    flush() instead.
+    """
+
+    def __init__(self, command: CommandInterface) -> None:
+        self._command = command
+        self.calls = []  # type: List[BatchCallType]
+
+    def execute(self, call: CommandGraphCall, args: Tuple, kwargs: Dict) -> Any:
+        self.calls.append((call, args, kwargs))
+
+    def has_command(self, node: CommandGraphNode, command: str) -> bool:
+        return True
+
+    def has_item(self, node: CommandGraphNode, object_type: str, item: Union[str, int]) -> bool:
+        return True
+
+    def flush(self, stop_on_error: bool = False) -> List[Tuple[int, Any]]:
+        """Execute the recorded calls, see CommandInterface.execute_batch"""
+        calls, self.calls = self.calls, []
+        return self._command.execute_batch(calls, stop_on_error=stop_on_error)
+
+
 class IPCCommandServer:
     """Execute the object commands for the calls that are sent to it"""
 
@@ -294,9 +407,74 @@ class IPCCommandServer:
         and from the IPCCommandInterface.
         """
         self.qtile = qtile
+        self._forwarders = {}  # type: Dict[str, Callable]
+
+    def subscribe(self, server: ipc.Server, names: List[str]) -> None:
+        """Forward the named hooks to the subscribers of the ipc server"""
+        unknown = [name for name in names if name not in hook.subscribe.hooks]
+        if unknown:
+            raise ValueError("Unknown hooks: {}".format(", ".join(unknown)))
+        for name in names:
+            if name not in self._forwarders:
+                self._forwarders[name] = partial(self._forward, server, name)
+            hook.subscribe._subscribe(name, self._forwarders[name])
+
+    @staticmethod
+    def _forward(server: ipc.Server, name: str, *args) -> None:
+        if server.wants(name):
+            server.publish(name, format_hook_arg(args))
+
+    def call(self, data: Any) -> Any:
+        """Receive and parse the given data
+
+        This is either a single (selectors, name, args, kwargs) call, which
+        returns a (status, result) pair, or a batch as sent by
+        IPCCommandInterface.execute_batch, which returns a list of them.
+
+        Commands that are awaited by dispatch are started in the background,
+        and their result is (SUCCESS, None).
+        """
+        return self._dispatch(data, background=True)
+
+    def dispatch(self, data: Any) -> Any:
+        """Receive and parse the given data, as sent over IPC
 
-    def call(self, data: Tuple[List[SelectorType], str, Tuple, Dict]) -> Tuple[int, Any]:
-        """Receive and parse the given data"""
+        As call, but if a command is a coroutine or runs in an executor, an
+        awaitable of the reply is returned instead, so the event loop isn't
+        blocked waiting for it.
+        """
+        return self._dispatch(data, background=False)
+
+    def _dispatch(self, data: Any, background: bool) -> Any:
+        if isinstance(data, dict):
+            return self._call_batch(data["batch"], bool(data.get("stop_on_error")), background)
+        return self._call(data, background)
+
+    def _call_batch(self, calls: List, stop_on_error: bool, background: bool) -> Any:
+        results = []  # type: List[Tuple[int, Any]]
+        for i, call in enumerate(calls):
+            result = self._call(call, background)
+            if inspect.isawaitable(result):
+                return self._finish_batch(result, calls[i + 1:], results, stop_on_error)
+            results.append(result)
+            if stop_on_error and result[0] != SUCCESS:
+                break
+        return results
+
+    async def _finish_batch(self, pending: Awaitable, calls: List,
+                            results: List[Tuple[int, Any]], stop_on_error: bool) -> List:
+        result = await pending
+        for call in calls:
+            results.append(result)
+            if stop_on_error and result[0] != SUCCESS:
+                return results
+            result = self._call(call, background=False)
+            if inspect.isawaitable(result):
+                result = await result
+        results.append(result)
+        return results
+
+    def _call(self, data: Tuple[List[SelectorType], str, Tuple, Dict], background: bool) -> Any:
         selectors, name, args, kwargs = data
         try:
             obj = self.qtile.select(selectors)
@@ -308,9 +486,38 @@ class IPCCommandServer:
             return ERROR, "No such command"
 
         logger.debug("Command: %s(%s, %s)", name, args, kwargs)
+        if asyncio.iscoroutinefunction(cmd) or getattr(cmd, "command_in_executor", False):
+            reply = self._await_command(name, cmd, args, kwargs)
+            if not background:
+                return reply
+            asyncio.ensure_future(reply).add_done_callback(partial(self._log_reply, name))
+            return SUCCESS, None
         try:
             return SUCCESS, cmd(*args, **kwargs)
         except CommandError as err:
             return ERROR, err.args[0]
         except Exception:
             return EXCEPTION, traceback.format_exc()
+
+    @staticmethod
+    async def _await_command(name: str, cmd: Callable, args: Tuple, kwargs: Dict) -> Tuple[int, Any]:
+        timeout = getattr(cmd, "command_timeout", COMMAND_TIMEOUT)
+        try:
+            if asyncio.iscoroutinefunction(cmd):
+                result = cmd(*args, **kwargs)
+            else:
+                loop = asyncio.get_event_loop()
+                result = loop.run_in_executor(None, partial(cmd, *args, **kwargs))
+            return SUCCESS, await asyncio.wait_for(result, timeout=timeout)
+        except asyncio.TimeoutError:
+            return ERROR, "Command {} timed out after {} seconds".format(name, timeout)
+        except CommandError as err:
+            return ERROR, err.args[0]
+        except Exception:
+            return EXCEPTION, traceback.format_exc()
+
+    @staticmethod
+    def _log_reply(name: str, future: asyncio.Future) -> None:
+        status, val = future.result()
+        if status in (ERROR, EXCEPTION):
+            logger.error("Command error %s: %s", name, val)
@@ -26,6 +26,7 @@
 # SOFTWARE.
 
 import os.path
+import re
 import sys
 import warnings
 from typing import List, Optional
@@ -592,43 +593,46 @@ class Match:
                         str(net_wm_pid)
                 raise utils.QtileError(error)
 
+        self._predicates = [
+            (name, self._get_property_predicate(name, value))
+            for name, value in self._rules.items()
+        ]
+
     @staticmethod
     def _get_property_predicate(name, value):
+        """Build the test of a client's property against the rule value"""
         if name == 'net_wm_pid':
             return lambda other: other == value
-        elif name == 'wm_class':
-            def predicate(other):
-                # match as an "include"-match on any of the received classes
-                match = getattr(other, 'match', lambda v: other in v)
-                return value and any(match(v) for v in value)
-            return predicate
-        else:
-            def predicate(other):
-                # match as an "include"-match
-                match = getattr(other, 'match', lambda v: other in v)
-                return match(value)
-            return predicate
+        # match as an "include"-match, unless the rule value is a regex
+        match = getattr(value, 'match', lambda v: value in v)
+        if name == 'wm_class':
+            # match on any of the received classes
+            return lambda other: bool(other) and any(match(v) for v in other)
+        return match
+
+    @staticmethod
+    def _get_client_property(client, name):
+        """Read the property a rule of the given name is tested against"""
+        if name == 'title':
+            return client.name
+        elif name == "wm_instance_class":
+            wm_class = client.get_wm_class()
+            if not wm_class:
+                return None
+            return wm_class[0]
+        elif name == 'role':
+            return client.get_wm_window_role()
+        return getattr(client, 'get_' + name)()
 
     def compare(self, client):
-        for property_name, rule_value in self._rules.items():
-            if property_name == 'title':
-                value = client.name
-            elif property_name == "wm_instance_class":
-                wm_class = client.window.get_wm_class()
-                if not wm_class:
-                    return False
-                value = wm_class[0]
-            elif property_name == 'role':
-                value = client.window.get_wm_window_role()
-            else:
-                value = getattr(client.window, 'get_' + property_name)()
+        for property_name, predicate in self._predicates:
+            value = self._get_client_property(client, property_name)
 
             # Some of the window.get_...() functions can return None
             if value is None:
                 return False
 
-            match = self._get_property_predicate(property_name, value)
-            if not match(rule_value):
+            if not predicate(value):
                 return False
 
         return True
@@ -679,6 +683,147 @@ class Rule:
         return '<Rule match=%r actions=(%s)>' % (self.matchlist, actions)
 
 
+class MatchIndex:
+    """An index over a list of ``Match`` or ``Rule`` objects
+
+    Rather than testing every item in turn against a client, the matches are
+    bucketed by a single property: ``net_wm_pid`` values go in a dict, plain
+    strings in a dict per property name (pre-filtered by one alternation of
+    all of them) and regular expressions behind one combined alternation per
+    property name. Looking up a client then only needs to fully compare the
+    few matches whose bucket was hit.
+
+    The index is rebuilt whenever the list of items it was given changes.
+
+    Parameters
+    ==========
+    items :
+        The list of ``Match`` or ``Rule`` objects to index, in priority order.
+    """
+    # The property used to bucket a match, most selective first
+    _key_properties = (
+        "net_wm_pid", "wm_type", "wm_class", "wm_instance_class", "role", "title"
+    )
+
+    def __init__(self, items=None):
+        self.items = items if items is not None else []
+        self._indexed = None
+
+    def _build(self):
+        self._indexed = list(self.items)
+        self._owners = {}
+        self._always = []
+        self._pids = {}
+        self._literals = {}
+        self._patterns = {}
+
+        for position, item in enumerate(self._indexed):
+            matchlist = item.matchlist if isinstance(item, Rule) else [item]
+            for match in matchlist:
+                self._owners.setdefault(id(match), (match, []))[1].append(position)
+                self._add_match(match)
+
+        self._literal_filters = {
+            name: re.compile("|".join(re.escape(literal) for literal in literals))
+            for name, literals in self._literals.items()
+        }
+        self._pattern_filters = {}
+        for name, patterns in self._patterns.items():
+            combinable = [
+                p for p in patterns if p.groups == 0 and p.flags == re.UNICODE
+            ]
+            if len(combinable) < len(patterns):
+                # Flags and groups don't survive being joined with other
+                # patterns, so these have to be tried one by one
+                continue
+            self._pattern_filters[name] = re.compile(
+                "|".join("(?:%s)" % p.pattern for p in combinable)
+            )
+
+    def _add_match(self, match):
+        if type(match).compare is not Match.compare:
+            # we can't know what a custom compare looks at
+            self._always.append(match)
+            return
+
+        for name in self._key_properties:
+            if name not in match._rules:
+                continue
+            value = match._rules[name]
+            if name == "net_wm_pid":
+                self._pids.setdefault(value, []).append(match)
+            elif isinstance(value, str):
+                self._literals.setdefault(name, {}).setdefault(value, []).append(match)
+            elif isinstance(value, re.Pattern) and isinstance(value.pattern, str):
+                self._patterns.setdefault(name, {}).setdefault(value, []).append(match)
+            else:
+                self._always.append(match)
+            return
+
+        # A Match without any rules matches everything
+        self._always.append(match)
+
+    def _candidates(self, client):
+        candidates = list(self._always)
+
+        if self._pids:
+            candidates.extend(self._pids.get(client.get_net_wm_pid(), []))
+
+        for name in self._key_properties[1:]:
+            literals = self._literals.get(name)
+            patterns = self._patterns.get(name)
+            if not literals and not patterns:
+                continue
+
+            value = Match._get_client_property(client, name)
+            if value is None:
+                continue
+            values = value if name == "wm_class" else (value, )
+
+            if literals:
+                literal_filter = self._literal_filters[name]
+                if any(literal_filter.search(v) for v in values):
+                    for literal, matches in literals.items():
+                        if any(literal in v for v in values):
+                            candidates.extend(matches)
+
+            if patterns:
+                pattern_filter = self._pattern_filters.get(name)
+                if pattern_filter is None or any(pattern_filter.match(v) for v in values):
+                    for pattern, matches in patterns.items():
+                        if any(pattern.match(v) for v in values):
+                            candidates.extend(matches)
+
+        return candidates
+
+    def compare(self, client):
+        """Return every item that matches the client, in priority order
+
+        Like ``Match.compare``, this reads the client's properties directly;
+        use ``matches`` unless the client is already handling errors.
+        """
+        if self._indexed != self.items:
+            self._build()
+
+        positions = set()
+        for match in self._candidates(client):
+            match, owners = self._owners[id(match)]
+            if positions.issuperset(owners):
+                continue
+            if match.compare(client):
+                positions.update(owners)
+
+        return [self._indexed[i] for i in sorted(positions)]
+
+    def matches(self, client):
+        """Return every item that matches the client, in priority order
+
+        The client checks the index like it checks a single ``Match``, so a
+        window that goes away while it is checked matches nothing.
+        """
+        return client.match(self) or []
+
+
 class DropDown(configurable.Configurable):
     """
     Configure a specified command and its associated window for the ScratchPad.
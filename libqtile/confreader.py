@@ -49,6 +49,8 @@ class Config:
         "extension_defaults",
         "bring_front_click",
         "wmname",
+        "dbus_glib_fallback",
+        "executors",
     ]
 
     def __init__(self, file_path=None, kore=None, **settings):
@@ -121,3 +123,6 @@ class Config:
             for m in ms.modifiers:
                 if m not in valid_mods:
                     raise ConfigError("No such modifier: %s" % m)
+        for name, size in self.executors.items():  # type: ignore
+            if not isinstance(size, int) or size < 1:
+                raise ConfigError("Invalid size for executor %s: %r" % (name, size))
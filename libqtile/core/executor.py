@@ -0,0 +1,109 @@
+"""Named thread pools for blocking work
+
+Widget polls that block (network requests, other programs, ...) run in one of
+these rather than in the event loop's default executor, so that a poll which
+hangs can only hold up the polls sharing its pool.
+"""
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from libqtile.log_utils import logger
+
+DEFAULT_EXECUTOR = "io"
+
+# the pools that always exist, and their sizes unless configured otherwise
+DEFAULT_SIZES = {
+    # network requests and file reads
+    "io": 8,
+    # waiting on other programs
+    "subprocess": 4,
+    # computation, which holds the GIL for most of its time anyway
+    "cpu": 2,
+}
+
+
+class Executor:
+    """A thread pool which keeps count of the tasks given to it"""
+    def __init__(self, name: str, max_workers: int) -> None:
+        self.name = name
+        self.max_workers = max_workers
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers, thread_name_prefix="qtile-" + name
+        )
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+
+    def run(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        func: Callable,
+        *args,
+        timeout: Optional[float] = None,
+    ) -> asyncio.Future:
+        """Run func(*args) in the pool, returning an asyncio future for its result
+
+        If the call hasn't finished timeout seconds after being made, the
+        future fails with asyncio.TimeoutError. A call still waiting for a
+        worker is then dropped, but one that has started keeps its worker
+        until it returns, as threads can't be interrupted.
+        """
+        with self._lock:
+            self.queued += 1
+        future = self._pool.submit(self._call, func, args)
+        future.add_done_callback(self._done)
+        wrapped = asyncio.wrap_future(future, loop=loop)
+        if timeout is None:
+            return wrapped
+        return loop.create_task(self._wait(wrapped, func, timeout))
+
+    def _call(self, func: Callable, args: tuple) -> Any:
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    def _done(self, future: concurrent.futures.Future) -> None:
+        with self._lock:
+            if future.cancelled():
+                # dropped before a worker picked it up
+                self.queued -= 1
+            elif future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    async def _wait(self, future: asyncio.Future, func: Callable, timeout: float) -> Any:
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timed_out += 1
+            logger.warning(
+                "%r didn't finish within %s seconds in the %s executor",
+                func, timeout, self.name,
+            )
+            raise
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(
+                workers=self.max_workers,
+                queued=self.queued,
+                running=self.running,
+                completed=self.completed,
+                failed=self.failed,
+                timed_out=self.timed_out,
+            )
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False)
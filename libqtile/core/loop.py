@@ -4,15 +4,18 @@ import signal
 from typing import Awaitable, Callable, Dict, Optional
 
 from libqtile.log_utils import logger
+from libqtile.utils import has_dbus_next
 
 
 class LoopContext(contextlib.AbstractAsyncContextManager):
     def __init__(
         self,
         signals: Optional[Dict[signal.Signals, Callable]] = None,
+        glib_fallback: bool = False,
     ) -> None:
         super().__init__()
         self._signals = signals or {}
+        self._glib_fallback = glib_fallback
         self._stopped = False
         self._glib_loop: Optional[Awaitable] = None
 
@@ -23,11 +26,13 @@ class LoopContext(contextlib.AbstractAsyncContextManager):
         for sig, handler in self._signals.items():
             loop.add_signal_handler(sig, handler)
 
-        with contextlib.suppress(ImportError):
-            self._glib_loop = self._setup_glib_loop()
-
-        if self._glib_loop is None:
-            logger.warning('importing dbus/gobject failed, dbus will not work.')
+        # dbus-python, used when dbus-next isn't installed, only dispatches
+        # from GLib's main loop; glib_fallback runs that loop regardless
+        if self._glib_fallback or not has_dbus_next:
+            with contextlib.suppress(ImportError):
+                self._glib_loop = self._setup_glib_loop()
+            if self._glib_loop is None:
+                logger.warning('importing dbus/gobject failed, dbus will not work.')
         return self
 
     async def __aexit__(self, *args) -> None:
@@ -55,6 +60,8 @@ class LoopContext(contextlib.AbstractAsyncContextManager):
                 await task
 
     def _setup_glib_loop(self):
+        # dbus-next reads the bus in this loop, so this is only a fallback for
+        # dbus-python, which is used when dbus-next isn't installed.
         # This is a little strange. python-dbus internally depends on gobject,
         # so gobject's threads need to be running, and a gobject 'main loop
         # thread' needs to be spawned, but we try to let it only interact with
@@ -29,7 +29,7 @@ import subprocess
 import tempfile
 import time
 import warnings
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
 import xcffib
 import xcffib.xinerama
@@ -39,14 +39,21 @@ import libqtile
 from libqtile import confreader, hook, ipc, utils, window
 from libqtile.backend.x11 import xcbq
 from libqtile.command import interface
-from libqtile.command.base import CommandError, CommandException, CommandObject
+from libqtile.command.base import (
+    CommandError,
+    CommandException,
+    CommandObject,
+    in_executor,
+)
 from libqtile.command.client import InteractiveCommandClient
 from libqtile.command.interface import IPCCommandServer, QtileCommandInterface
 from libqtile.config import Click, Drag, Key, KeyChord, Match, Rule
 from libqtile.config import ScratchPad as ScratchPadConfig
 from libqtile.config import Screen
+from libqtile.core.executor import DEFAULT_EXECUTOR, DEFAULT_SIZES, Executor
 from libqtile.core.lifecycle import lifecycle
 from libqtile.core.loop import LoopContext
+from libqtile.core.scheduler import Scheduler
 from libqtile.core.state import QtileState
 from libqtile.dgroups import DGroups
 from libqtile.extension.base import _Extension
@@ -93,12 +100,22 @@ class Qtile(CommandObject):
         libqtile.init(self)
 
         self._eventloop: Optional[asyncio.AbstractEventLoop] = None
+        # widget timers, see libqtile.core.scheduler
+        self.scheduler: Optional[Scheduler] = None
+        # processes started by cmd_spawn that haven't been reaped yet
+        self._spawned_pids: Set[int] = set()
         self._stopped_event: Optional[asyncio.Event] = None
 
         self.server = IPCCommandServer(self)
         self.config = config
         self.load_config()
 
+        sizes = dict(DEFAULT_SIZES)
+        sizes.update(self.config.executors)
+        self.executors: Dict[str, Executor] = {
+            name: Executor(name, size) for name, size in sizes.items()
+        }
+
     def load_config(self):
         try:
             self.config.load()
@@ -229,20 +246,28 @@ class Qtile(CommandObject):
         Finalizes the Qtile instance on exit.
         """
         self._eventloop = asyncio.get_running_loop()
+        self.scheduler = Scheduler(self._eventloop, self._flush)
         self._stopped_event = asyncio.Event()
         self.core.setup_listener(self)
         try:
-            async with LoopContext({
+            signals = {
                 signal.SIGTERM: self.stop,
                 signal.SIGINT: self.stop,
-            }), ipc.Server(
+            }
+            if hasattr(os, "posix_spawnp"):
+                signals[signal.SIGCHLD] = self.reap_children
+            async with LoopContext(
+                signals, glib_fallback=self.config.dbus_glib_fallback
+            ), ipc.Server(
                 self._prepare_socket_path(self.socket_path),
-                self.server.call,
+                self.server.dispatch,
+                self.server.subscribe,
             ):
                 self._configure()
                 await self._stopped_event.wait()
         finally:
             self.finalize()
+            self.scheduler.close()
             self.core.remove_listener()
 
     def stop(self):
@@ -280,6 +305,9 @@ class Qtile(CommandObject):
         except:  # noqa: E722
             logger.exception('exception during finalize')
 
+        for executor in self.executors.values():
+            executor.shutdown()
+
     def _process_fake_screens(self):
         """
         Since Xephyr and Xnest don't really support offset screens, we'll fake
@@ -521,6 +549,18 @@ class Qtile(CommandObject):
         self.unmanage(window_id)
 
     def manage(self, w):
+        if w.wid in self.windows_map:
+            return self._manage(w)
+
+        # Request everything we need to know about the new client up front,
+        # rather than waiting on the X server for each property in turn.
+        w.prefetch()
+        try:
+            return self._manage(w)
+        finally:
+            w.drop_prefetched()
+
+    def _manage(self, w):
         try:
             attrs = w.get_attributes()
             internal = w.get_property("QTILE_INTERNAL")
@@ -542,7 +582,7 @@ class Qtile(CommandObject):
                 except (xcffib.xproto.WindowError, xcffib.xproto.AccessError):
                     return
 
-                if w.get_wm_type() == "dock" or c.strut:
+                if c.get_wm_type() == "dock" or c.strut:
                     c.cmd_static(self.current_screen.index)
                 else:
                     hook.fire("client_new", c)
@@ -587,7 +627,7 @@ class Qtile(CommandObject):
             if not isinstance(win, window.Window):
                 return None
             try:
-                return win.window.get_net_wm_pid()
+                return win.get_net_wm_pid()
             except Exception:
                 logger.exception("Got an exception in getting the window pid")
                 return None
@@ -870,6 +910,9 @@ class Qtile(CommandObject):
                 return i
         return None
 
+    def _flush(self):
+        self.conn.flush()
+
     def call_soon(self, func, *args):
         """ A wrapper for the event loop's call_soon which also flushes the X
         event queue to the server after func is called. """
@@ -892,10 +935,18 @@ class Qtile(CommandObject):
             self.conn.flush()
         return self._eventloop.call_later(delay, f)
 
-    def run_in_executor(self, func, *args):
-        """ A wrapper for running a function in the event loop's default
-        executor. """
-        return self._eventloop.run_in_executor(None, func, *args)
+    def run_in_executor(self, func, *args, executor=DEFAULT_EXECUTOR, timeout=None):
+        """ Run func(*args) in one of the named thread pools configured by the
+        executors config variable, returning an asyncio future for its result.
+        See `Executor.run` for timeout. """
+        try:
+            pool = self.executors[executor]
+        except KeyError:
+            logger.warning(
+                "No executor named %s, using %s", executor, DEFAULT_EXECUTOR
+            )
+            pool = self.executors[DEFAULT_EXECUTOR]
+        return pool.run(self._eventloop, func, *args, timeout=timeout)
 
     def cmd_debug(self):
         """Set log level to DEBUG"""
@@ -1132,6 +1183,46 @@ class Qtile(CommandObject):
         else:
             args = list(cmd)
 
+        if not hasattr(os, "posix_spawnp"):
+            return self._spawn_forked(cmd, args)
+
+        env = dict(os.environ)
+        # if qtile was installed in a virutal env, we don't necessarily want
+        # to propagate that to children applications, since it may change e.g.
+        # the behavior of shells that spawn python applications
+        env.pop("VIRTUAL_ENV", None)
+        # don't let the called process pollute our xsession-errors
+        file_actions = [
+            (os.POSIX_SPAWN_OPEN, fd, os.devnull, os.O_RDWR, 0) for fd in (0, 1, 2)
+        ]
+        try:
+            pid = os.posix_spawnp(args[0], args, env, file_actions=file_actions, setsid=True)
+        except OSError as e:
+            logger.error("failed spawn: \"{0}\"\n{1}".format(cmd, e))
+            return -1
+        self._spawned_pids.add(pid)
+        return pid
+
+    def reap_children(self):
+        """Collect the exit status of the processes started by cmd_spawn
+
+        They are our children, unlike with _spawn_forked, so they would be left
+        as zombies otherwise. This runs on SIGCHLD.
+        """
+        for pid in list(self._spawned_pids):
+            try:
+                exited, _ = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                exited = pid
+            if exited:
+                self._spawned_pids.discard(pid)
+
+    def _spawn_forked(self, cmd, args):
+        """Start the process from a double fork, where posix_spawn is missing
+
+        This blocks waiting for the intermediate child, and forking copies
+        the page tables of the whole process.
+        """
         r, w = os.pipe()
         pid = os.fork()
         if pid < 0:
@@ -1512,6 +1603,7 @@ class Qtile(CommandObject):
         else:
             tracemalloc.stop()
 
+    @in_executor
     def cmd_tracemalloc_dump(self):
         """Dump tracemalloc snapshot"""
         import tracemalloc
@@ -1523,6 +1615,15 @@ class Qtile(CommandObject):
         tracemalloc.take_snapshot().dump(malloc_dump)
         return [True, malloc_dump]
 
+    def cmd_executor_stats(self):
+        """Get the size and load of each executor that widgets poll in
+
+        For each executor name, returns the number of worker threads, the
+        number of tasks waiting for a worker and running, and how many tasks
+        have completed, failed and timed out so far.
+        """
+        return {name: executor.stats() for name, executor in self.executors.items()}
+
     def cmd_get_test_data(self):
         """
         Returns any content arbitrarily set in the self.test_data attribute.
@@ -1531,5 +1632,9 @@ class Qtile(CommandObject):
         return self.test_data
 
     def cmd_run_extension(self, extension):
-        """Run extensions"""
+        """Run extensions
+
+        Extensions that wait for a menu, such as WindowList, do so in the
+        background, so this returns straight away.
+        """
         extension.run()
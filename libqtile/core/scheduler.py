@@ -0,0 +1,91 @@
+"""Timers for widgets, run together on whole seconds of the wall clock
+
+Widgets re-arm a timer after every update, so each bar used to wake qtile at
+as many unaligned moments as it has widgets, and their intervals drifted. The
+scheduler rounds timers of a second or more to the nearest whole second of the
+wall clock, and runs all the timers for a second in one wakeup, after which
+the bars coalesce the redraws they asked for. Shorter timers, which are used
+for animations, run when asked unless they fall on a whole second anyway.
+"""
+import asyncio
+import time
+from typing import Callable, Dict, List, Union
+
+from libqtile.log_utils import logger
+
+# timers at least this long are run in slots
+ALIGN_THRESHOLD = 1.0
+
+# shorter timers that fall this close to a slot are run in it
+SLOT_TOLERANCE = 0.01
+
+
+class _Timer:
+    def __init__(self, scheduler: "Scheduler", slot: int, func: Callable, args: tuple) -> None:
+        self._scheduler = scheduler
+        self.slot = slot
+        self.func = func
+        self.args = args
+
+    def cancel(self) -> None:
+        self._scheduler._cancel(self)
+
+
+class Scheduler:
+    def __init__(self, loop: asyncio.AbstractEventLoop, flush: Callable[[], None]) -> None:
+        self._loop = loop
+        # called after timers run, to send what they drew to the X server
+        self._flush = flush
+        self._slots: Dict[int, List[_Timer]] = {}
+        self._handles: Dict[int, asyncio.TimerHandle] = {}
+
+    def call_later(
+        self, delay: float, func: Callable, *args
+    ) -> Union[_Timer, asyncio.TimerHandle]:
+        """Call func(*args) in about delay seconds
+
+        Returns a handle with a cancel method.
+        """
+        now = time.time()
+        target = now + delay
+        slot = round(target)
+        if delay < ALIGN_THRESHOLD and abs(target - slot) > SLOT_TOLERANCE:
+            def f():
+                func(*args)
+                self._flush()
+            return self._loop.call_later(delay, f)
+
+        timer = _Timer(self, slot, func, args)
+        timers = self._slots.get(slot)
+        if timers is None:
+            timers = self._slots[slot] = []
+            self._handles[slot] = self._loop.call_at(
+                self._loop.time() + slot - now, self._run, slot
+            )
+        timers.append(timer)
+        return timer
+
+    def _cancel(self, timer: _Timer) -> None:
+        timers = self._slots.get(timer.slot)
+        if timers is None or timer not in timers:
+            return
+        timers.remove(timer)
+        if not timers:
+            del self._slots[timer.slot]
+            self._handles.pop(timer.slot).cancel()
+
+    def _run(self, slot: int) -> None:
+        timers = self._slots.pop(slot, [])
+        del self._handles[slot]
+        for timer in timers:
+            try:
+                timer.func(*timer.args)
+            except Exception:
+                logger.exception("got exception from timer %r", timer.func)
+        self._flush()
+
+    def close(self) -> None:
+        for handle in self._handles.values():
+            handle.cancel()
+        self._handles.clear()
+        self._slots.clear()
@@ -38,6 +38,7 @@ class QtileState:
         self.current_screen = 0
         self.scratchpads = {}
         self.orphans = []
+        self.spawned_pids = sorted(qtile._spawned_pids)
 
         for group in qtile.groups:
             if isinstance(group, ScratchPad):
@@ -82,11 +83,15 @@ class QtileState:
 
         qtile.focus_screen(self.current_screen)
 
+        # processes spawned before the restart are still our children
+        qtile._spawned_pids.update(getattr(self, "spawned_pids", ()))
+        qtile.reap_children()
+
     def handle_orphan_dropdowns(self, client):
         """
         Remove any windows from now non-existent scratchpad groups.
         """
-        client_pid = client.window.get_net_wm_pid()
+        client_pid = client.get_net_wm_pid()
         if client_pid in self.orphans:
             self.orphans.remove(client_pid)
             client.group = None
@@ -29,7 +29,7 @@ import collections
 
 import libqtile.hook
 from libqtile.command import lazy
-from libqtile.config import Group, Key, Match, Rule
+from libqtile.config import Group, Key, Match, MatchIndex, Rule
 from libqtile.log_utils import logger
 
 
@@ -76,6 +76,7 @@ class DGroups:
         self.groups_map = {}
 
         self.rules = []
+        self.rules_index = MatchIndex(self.rules)
         self.rules_map = {}
         self.last_rule_id = 0
 
@@ -164,43 +165,42 @@ class DGroups:
         group_set = False
         intrusive = False
 
-        for rule in self.rules:
-            # Matching Rules
-            if rule.matches(client):
-                if rule.group:
-                    if rule.group in self.groups_map:
-                        layout = self.groups_map[rule.group].layout
-                        layouts = self.groups_map[rule.group].layouts
-                        label = self.groups_map[rule.group].label
-                    else:
-                        layout = None
-                        layouts = None
-                        label = None
-                    group_added = self.qtile.add_group(rule.group, layout, layouts, label)
-                    client.togroup(rule.group)
-
-                    group_set = True
-
-                    group_obj = self.qtile.groups_map[rule.group]
-                    group = self.groups_map.get(rule.group)
-                    if group and group_added:
-                        for k, v in list(group.layout_opts.items()):
-                            if isinstance(v, collections.Callable):
-                                v(group_obj.layout)
-                            else:
-                                setattr(group_obj.layout, k, v)
-                        affinity = group.screen_affinity
-                        if affinity and len(self.qtile.screens) > affinity:
-                            self.qtile.screens[affinity].set_group(group_obj)
-
-                if rule.float:
-                    client.enablefloating()
-
-                if rule.intrusive:
-                    intrusive = rule.intrusive
-
-                if rule.break_on_match:
-                    break
+        # Matching Rules, in priority order
+        for rule in self.rules_index.matches(client):
+            if rule.group:
+                if rule.group in self.groups_map:
+                    layout = self.groups_map[rule.group].layout
+                    layouts = self.groups_map[rule.group].layouts
+                    label = self.groups_map[rule.group].label
+                else:
+                    layout = None
+                    layouts = None
+                    label = None
+                group_added = self.qtile.add_group(rule.group, layout, layouts, label)
+                client.togroup(rule.group)
+
+                group_set = True
+
+                group_obj = self.qtile.groups_map[rule.group]
+                group = self.groups_map.get(rule.group)
+                if group and group_added:
+                    for k, v in list(group.layout_opts.items()):
+                        if isinstance(v, collections.Callable):
+                            v(group_obj.layout)
+                        else:
+                            setattr(group_obj.layout, k, v)
+                    affinity = group.screen_affinity
+                    if affinity and len(self.qtile.screens) > affinity:
+                        self.qtile.screens[affinity].set_group(group_obj)
+
+            if rule.float:
+                client.enablefloating()
+
+            if rule.intrusive:
+                intrusive = rule.intrusive
+
+            if rule.break_on_match:
+                break
 
         # If app doesn't have a group
         if not group_set:
@@ -209,7 +209,7 @@ class DGroups:
                     self.groups_map[current_group].exclusive and \
                     not intrusive:
 
-                wm_class = client.window.get_wm_class()
+                wm_class = client.get_wm_class()
 
                 if wm_class:
                     if len(wm_class) > 1:
@@ -30,6 +30,7 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 import collections
+import functools
 import math
 
 import cairocffi
@@ -37,6 +38,43 @@ import xcffib.xproto
 
 from libqtile import pangocffi, utils
 
+# pixmap widths are rounded up to a multiple of this
+PIXMAP_STEP = 32
+
+# how many text sizes are remembered, across all drawers
+TEXT_SIZE_CACHE_SIZE = 1024
+
+# how many layouts each drawer keeps for measuring text, one per font
+LAYOUT_POOL_SIZE = 8
+
+# (text, font_family, font_size, markup) -> (width, height) in pixels
+_text_sizes = collections.OrderedDict()  # type: collections.OrderedDict
+
+
+@functools.lru_cache(maxsize=64)
+def font_description(font_family, font_size):
+    """Get the font description for a font, which is parsed once
+
+    Layouts copy the descriptions they're given, so the one returned is
+    shared and mustn't be changed.
+    """
+    desc = pangocffi.FontDescription.from_string(font_family)
+    desc.set_absolute_size(pangocffi.units_from_double(float(font_size)))
+    return desc
+
+
+@functools.lru_cache(maxsize=64)
+def gradient(colours, height):
+    """Get a vertical gradient through colours, which is built once
+
+    The pattern is shared between drawers, so it mustn't be changed.
+    """
+    linear = cairocffi.LinearGradient(0.0, 0.0, 0.0, height)
+    step_size = 1.0 / (len(colours) - 1)
+    for i, c in enumerate(colours):
+        linear.add_color_stop_rgba(i * step_size, *utils.rgb(c))
+    return linear
+
 
 class TextLayout:
     def __init__(self, drawer, text, colour, font_family, font_size,
@@ -46,9 +84,10 @@ class TextLayout:
         layout.set_alignment(pangocffi.ALIGN_CENTER)
         if not wrap:  # pango wraps by default
             layout.set_ellipsize(pangocffi.ELLIPSIZE_END)
-        desc = pangocffi.FontDescription.from_string(font_family)
-        desc.set_absolute_size(pangocffi.units_from_double(float(font_size)))
-        layout.set_font_description(desc)
+        layout.set_font_description(font_description(font_family, font_size))
+        # what the font was last set to, to skip setting it to the same again
+        self._font_family = font_family
+        self._font_size = font_size
         self.font_shadow = font_shadow
         self.layout = layout
         self.markup = markup
@@ -103,6 +142,9 @@ class TextLayout:
 
     @font_family.setter
     def font_family(self, font):
+        if font == self._font_family:
+            return
+        self._font_family = font
         d = self.fontdescription()
         d.set_family(font)
         self.layout.set_font_description(d)
@@ -114,6 +156,9 @@ class TextLayout:
 
     @font_size.setter
     def font_size(self, size):
+        if size == self._font_size:
+            return
+        self._font_size = size
         d = self.fontdescription()
         d.set_size(size)
         d.set_absolute_size(pangocffi.units_from_double(size))
@@ -211,24 +256,34 @@ class Drawer:
     surface is an XCBSurface backed by a pixmap. We draw to the pixmap
     starting at offset 0, 0, and when the time comes to display to the window
     (on draw()), we copy the appropriate portion of the pixmap onto the window.
-    In the event that our drawing area is resized, we invalidate the underlying
-    surface and pixmap and recreate them when we need them again with the new
-    geometry.
+    In the event that our drawing area grows beyond the pixmap, or shrinks to
+    less than half of it, we invalidate the underlying surface and pixmap and
+    recreate them when we need them again with the new geometry. Widgets'
+    drawers are sized to the widget by the bar, so the X server only holds
+    pixmaps as large as the widgets rather than one bar-sized pixmap each.
     """
-    def __init__(self, qtile, wid, width, height):
+    def __init__(self, qtile, wid, width, height) -> None:
         self.qtile = qtile
         self.wid, self._width, self._height = wid, width, height
         self._surface = None
         self._pixmap = None
+        self._pixmap_width = 0
+        self._pixmap_height = 0
         self._gc = None
 
         self.surface = None
         self.ctx = None
 
+        # layouts for measuring text, by (font_family, font_size, markup)
+        self._layouts = collections.OrderedDict()  # type: collections.OrderedDict
+
         self._reset_surface()
         self.clear((0, 0, 1))
 
     def finalize(self):
+        for layout in self._layouts.values():
+            layout.finalize()
+        self._layouts.clear()
         self.surface.finish()
         self.surface = None
         self._free_xcb_surface()
@@ -267,8 +322,8 @@ class Drawer:
             self.qtile.conn.conn,
             self._pixmap,
             self.find_root_visual(),
-            self.width,
-            self.height,
+            self._pixmap_width,
+            self._pixmap_height,
         )
         return surface
 
@@ -292,8 +347,8 @@ class Drawer:
             self.qtile.conn.default_screen.root_depth,
             pixmap,
             self.wid,
-            self.width,
-            self.height,
+            self._pixmap_width,
+            self._pixmap_height,
         )
         return pixmap
 
@@ -302,13 +357,34 @@ class Drawer:
             self.qtile.conn.conn.core.FreePixmap(self._pixmap)
             self._pixmap = None
 
+    def _pixmap_fits(self, width, height):
+        """Whether the current pixmap is a sensible size for width x height"""
+        return (
+            width <= self._pixmap_width <= max(2 * width, PIXMAP_STEP) and
+            height <= self._pixmap_height <= max(2 * height, PIXMAP_STEP)
+        )
+
+    def _ensure_pixmap(self, width, height):
+        if self._surface is not None and width <= self._pixmap_width and \
+                height <= self._pixmap_height:
+            return
+        self._free_xcb_surface()
+        self._free_pixmap()
+        # round up, so that a drawer growing a few pixels at a time doesn't
+        # reallocate every time
+        width = max(self.width, width, 1)
+        self._pixmap_width = (width + PIXMAP_STEP - 1) // PIXMAP_STEP * PIXMAP_STEP
+        self._pixmap_height = max(self.height, height, 1)
+        self._pixmap = self._create_pixmap()
+        self._surface = self._create_xcb_surface()
+
     @property
     def width(self):
         return self._width
 
     @width.setter
     def width(self, width):
-        if width > self._width:
+        if not self._pixmap_fits(width, self._height):
             self._free_xcb_surface()
             self._free_pixmap()
         self._width = width
@@ -319,7 +395,7 @@ class Drawer:
 
     @height.setter
     def height(self, height):
-        if height > self._height:
+        if not self._pixmap_fits(self._width, height):
             self._free_xcb_surface()
             self._free_pixmap()
         self._height = height
@@ -398,14 +474,18 @@ class Drawer:
         height :
             the Y portion of the canvas to draw at the starting point.
         """
+        if width is None:
+            width = self.width
+        if height is None:
+            height = self.height
+
         # If this is our first draw, create the gc
         if self._gc is None:
             self._gc = self._create_gc()
 
-        # If the Drawer has been resized/invalidated we need to recreate these
-        if self._surface is None:
-            self._pixmap = self._create_pixmap()
-            self._surface = self._create_xcb_surface()
+        # If the Drawer has been resized/invalidated, or the area to draw
+        # doesn't suit the current pixmap, we need to recreate these
+        self._ensure_pixmap(width, height)
 
         # paint stored operations(if any) to XCBSurface
         self._paint()
@@ -417,8 +497,8 @@ class Drawer:
             self._gc,
             0, 0,  # srcx, srcy
             offsetx, offsety,  # dstx, dsty
-            self.width if width is None else width,
-            self.height if height is None else height
+            width,
+            height
         )
 
     def find_root_visual(self):
@@ -430,26 +510,30 @@ class Drawer:
     def new_ctx(self):
         return pangocffi.patch_cairo_context(cairocffi.Context(self.surface))
 
-    def set_source_rgb(self, colour):
+    def source(self, colour):
+        """Get the cairo source for a colour
+
+        This is an RGBA tuple, or a gradient pattern for a list of colours.
+        Both are cached, so they can be looked up ahead of drawing to check
+        the colour.
+        """
         if type(colour) == list:
             if len(colour) == 0:
                 # defaults to black
-                self.ctx.set_source_rgba(*utils.rgb("#000000"))
+                return utils.rgb("#000000")
             elif len(colour) == 1:
-                self.ctx.set_source_rgba(*utils.rgb(colour[0]))
-            else:
-                linear = cairocffi.LinearGradient(0.0, 0.0, 0.0, self.height)
-                step_size = 1.0 / (len(colour) - 1)
-                step = 0.0
-                for c in colour:
-                    rgb_col = utils.rgb(c)
-                    if len(rgb_col) < 4:
-                        rgb_col[3] = 1
-                    linear.add_color_stop_rgba(step, *rgb_col)
-                    step += step_size
-                self.ctx.set_source(linear)
+                return utils.rgb(colour[0])
+            # stops may be lists of numbers, which can't be cache keys
+            stops = tuple(tuple(c) if isinstance(c, list) else c for c in colour)
+            return gradient(stops, self.height)
+        return utils.rgb(colour)
+
+    def set_source_rgb(self, colour):
+        source = self.source(colour)
+        if isinstance(source, tuple):
+            self.ctx.set_source_rgba(*source)
         else:
-            self.ctx.set_source_rgba(*utils.rgb(colour))
+            self.ctx.set_source(source)
 
     def clear(self, colour):
         self.set_source_rgb(colour)
@@ -463,14 +547,44 @@ class Drawer:
         return TextLayout(self, text, colour, font_family, font_size,
                           font_shadow, markup=markup, **kw)
 
-    def max_layout_size(self, texts, font_family, font_size):
-        sizelayout = self.textlayout(
-            "", "ffffff", font_family, font_size, None)
+    def _measuring_layout(self, font_family, font_size, markup):
+        key = (font_family, font_size, markup)
+        layout = self._layouts.get(key)
+        if layout is None:
+            layout = self.textlayout(
+                "", "ffffff", font_family, font_size, None, markup=markup)
+            self._layouts[key] = layout
+            if len(self._layouts) > LAYOUT_POOL_SIZE:
+                self._layouts.popitem(last=False)[1].finalize()
+        else:
+            self._layouts.move_to_end(key)
+        return layout
+
+    def text_size(self, text, font_family, font_size, markup=False):
+        """Get the width and height of text in pixels
+
+        Sizes are remembered, so each text is only laid out once per font.
+        """
+        key = (text, font_family, font_size, markup)
+        size = _text_sizes.get(key)
+        if size is not None:
+            _text_sizes.move_to_end(key)
+            return size
+
+        layout = self._measuring_layout(font_family, font_size, markup)
+        layout.text = text
+        size = layout.layout.get_pixel_size()
+        _text_sizes[key] = size
+        if len(_text_sizes) > TEXT_SIZE_CACHE_SIZE:
+            _text_sizes.popitem(last=False)
+        return size
+
+    def max_layout_size(self, texts, font_family, font_size, markup=False):
         widths, heights = [], []
         for i in texts:
-            sizelayout.text = i
-            widths.append(sizelayout.width)
-            heights.append(sizelayout.height)
+            width, height = self.text_size(i, font_family, font_size, markup)
+            widths.append(width)
+            heights.append(height)
         return max(widths), max(heights)
 
     # Old text layout functions, to be deprecated.
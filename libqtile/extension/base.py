@@ -18,11 +18,17 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import asyncio
 import shlex
 from subprocess import PIPE, Popen
-from typing import Any, List, Tuple  # noqa: F401
+from typing import Any, List, Set, Tuple  # noqa: F401
 
 from libqtile import configurable
+from libqtile.log_utils import logger
+
+# menu items are written to the process in chunks of this many lines, so a
+# long list doesn't hold up the event loop while it is being read
+CHUNK_LINES = 256
 
 
 class _Extension(configurable.Configurable):
@@ -75,6 +81,7 @@ class RunCommand(_Extension):
     def __init__(self, **config):
         _Extension.__init__(self, **config)
         self.add_defaults(RunCommand.defaults)
+        self._tasks = set()  # type: Set[asyncio.Future]
 
     def _configure(self, qtile):
         _Extension._configure(self, qtile)
@@ -92,11 +99,68 @@ class RunCommand(_Extension):
 
             def run(self):
                 process = super(Subclass, self).run()
+
+        Waiting for the process here blocks the event loop, so extensions that
+        need its output should use run_async or run_with instead.
         """
+        return Popen(self._get_command(), stdout=PIPE, stdin=PIPE)
+
+    def _get_command(self, items=None):
+        """Return the command line to run, to show the given items if any"""
         if self.configured_command:
             if isinstance(self.configured_command, str):
                 self.configured_command = shlex.split(self.configured_command)
             # Else assume that self.configured_command is already a sequence
         else:
             self.configured_command = self.command
-        return Popen(self.configured_command, stdout=PIPE, stdin=PIPE)
+        return self.configured_command
+
+    async def run_async(self, items=None):
+        """Run the command without blocking the event loop
+
+        The items, if any, are written to its standard input one per line.
+        Returns what the command wrote to its standard output.
+        """
+        if items is not None:
+            items = list(items)
+        proc = await asyncio.create_subprocess_exec(
+            *self._get_command(items), stdout=PIPE, stdin=PIPE
+        )
+        try:
+            for i in range(0, len(items or ()), CHUNK_LINES):
+                lines = "".join(item + "\n" for item in items[i:i + CHUNK_LINES])
+                proc.stdin.write(lines.encode())
+                await proc.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            # it exited before reading everything, e.g. the menu was cancelled
+            pass
+        proc.stdin.close()
+        out = await proc.stdout.read()
+        await proc.wait()
+        return out.decode()
+
+    def run_with(self, callback, items=None):
+        """Run the command in the background, then call callback with its output
+
+        The callback can be a function or a coroutine function. Returns the
+        task, which is also kept until it is done.
+        """
+        async def run():
+            out = await self.run_async(items)
+            result = callback(out)
+            if asyncio.iscoroutine(result):
+                await result
+
+        return self._run_in_background(run())
+
+    def _run_in_background(self, coro):
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Error running %s", self.__class__.__name__,
+                         exc_info=task.exception())
@@ -18,7 +18,7 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from os import system
+import asyncio
 
 from libqtile.extension.dmenu import Dmenu
 
@@ -62,21 +62,21 @@ class CommandSet(Dmenu):
         if not self.commands:
             return
 
+        self._run_in_background(self._select_and_run())
+
+    async def _select_and_run(self):
         if self.pre_commands:
             for cmd in self.pre_commands:
-                system(cmd)
-
-        out = super(CommandSet, self).run(items=self.commands.keys())
-
-        try:
-            sout = out.rstrip('\n')
-        except AttributeError:
-            # out is not a string (for example it's a Popen object returned
-            # by super(WindowList, self).run() when there are no menu items to
-            # list
-            return
+                await self._system(cmd)
 
+        out = await self.run_async(items=self.commands.keys())
+        sout = out.rstrip('\n')
         if sout not in self.commands:
             return
 
-        system(self.commands[sout])
+        await self._system(self.commands[sout])
+
+    @staticmethod
+    async def _system(cmd):
+        proc = await asyncio.create_subprocess_shell(cmd)
+        await proc.wait()
@@ -19,6 +19,7 @@
 # SOFTWARE.
 
 import shlex
+from subprocess import PIPE, Popen
 
 from libqtile.extension import base
 
@@ -88,12 +89,22 @@ class Dmenu(base.RunCommand):
         if self.dmenu_height:
             self.configured_command.extend(("-h", str(self.dmenu_height)))
 
-    def run(self, items=None):
+    def _get_command(self, items=None):
+        command = base.RunCommand._get_command(self)
         if items and self.dmenu_lines:
             lines = min(len(items), int(self.dmenu_lines))
-            self.configured_command.extend(("-l", str(lines)))
+            command = list(command) + ["-l", str(lines)]
+        return command
+
+    def run(self, items=None):
+        """Run dmenu, waiting for the selection if items are given
 
-        proc = super().run()
+        This blocks the event loop while the menu is open; run_async and
+        run_with don't.
+        """
+        if items:
+            items = list(items)
+        proc = Popen(self._get_command(items), stdout=PIPE, stdin=PIPE)
 
         if items:
             input_str = "\n".join([i for i in items]) + "\n"
@@ -58,22 +58,23 @@ class WindowList(Dmenu):
 
     def run(self):
         self.list_windows()
-        out = super().run(items=self.item_to_win.keys())
+        if self.item_to_win:
+            self.run_with(self._focus_selected, items=self.item_to_win.keys())
 
+    def _focus_selected(self, out):
         try:
-            sout = out.rstrip('\n')
-        except AttributeError:
-            # out is not a string (for example it's a Popen object returned
-            # by super(WindowList, self).run() when there are no menu items to
-            # list
-            return
-
-        try:
-            win = self.item_to_win[sout]
+            win = self.item_to_win[out.rstrip('\n')]
         except KeyError:
-            # The selected window got closed while the menu was open?
+            # Nothing from the menu was selected
             return
 
+        # call_soon flushes the requests to the X server afterwards
+        self.qtile.call_soon(self._focus_window, win)
+
+    def _focus_window(self, win):
+        if win.group is None:
+            # The selected window got closed while the menu was open
+            return
         screen = self.qtile.current_screen
         screen.set_group(win.group)
         win.group.focus(win)
@@ -60,12 +60,14 @@ class _Group(CommandObject):
         self.focus_history = []
         self.screen = None
         self.current_layout = None
+        self._layout_dirty = True
 
     def _configure(self, layouts, floating_layout, qtile):
         self.screen = None
         self.current_layout = 0
         self.focus_history = []
         self.windows = set()
+        self._layout_dirty = True
         self.qtile = qtile
         self.layouts = [i.clone(self) for i in layouts]
         self.floating_layout = floating_layout
@@ -147,6 +149,7 @@ class _Group(CommandObject):
         to it.
         """
         if self.screen and self.windows:
+            self._layout_dirty = False
             with self.disable_mask(xcffib.xproto.EventMask.EnterWindow):
                 normal = [x for x in self.windows if not x.floating]
                 floating = [
@@ -203,7 +206,8 @@ class _Group(CommandObject):
 
         If win is in the group, blur any windows and call ``focus`` on the
         layout (in case it wants to track anything), fire focus_change hook and
-        invoke layout_all.
+        invoke layout_all, or only reconfigure the previously and newly focused
+        windows if the layout says focus does not change its geometry.
 
         Parameters
         ==========
@@ -222,6 +226,7 @@ class _Group(CommandObject):
         if win:
             if win not in self.windows:
                 return
+            previous = self.current_window
             self.current_window = win
             if win.floating:
                 for layout in self.layouts:
@@ -232,7 +237,46 @@ class _Group(CommandObject):
                 for layout in self.layouts:
                     layout.focus(win)
             hook.fire("focus_change")
-            self.layout_all(warp)
+            if self._focus_keeps_geometry(previous, win):
+                self._refocus(previous, win, warp)
+            else:
+                self.layout_all(warp)
+
+    def _focus_keeps_geometry(self, previous, win):
+        """Whether moving focus from previous to win only changes borders"""
+        return (
+            self.screen is not None and
+            not self._layout_dirty and
+            not self.layout.focus_changes_geometry and
+            previous is not None and
+            previous in self.windows and
+            not previous.floating and
+            not win.floating
+        )
+
+    def _refocus(self, previous, win, warp):
+        """Reconfigure only the windows whose focus state changed
+
+        This is the fast path of ``focus`` for layouts that declare that focus
+        does not change geometry: nothing moves, so only the borders of the
+        previously and newly focused windows need repainting.
+        """
+        changed = [previous] if previous is win else [previous, win]
+        for i in changed:
+            i._disable_mask(xcffib.xproto.EventMask.EnterWindow)
+        try:
+            screen_rect = self.screen.get_rect()
+            for i in changed:
+                try:
+                    self.layout.configure(i, screen_rect)
+                except Exception:
+                    logger.exception("Exception in layout %s",
+                                     self.layout.name)
+            if self.screen == self.qtile.current_screen:
+                win.focus(warp)
+        finally:
+            for i in changed:
+                i._reset_mask()
 
     def info(self):
         return dict(
@@ -250,6 +294,7 @@ class _Group(CommandObject):
     def add(self, win, focus=True, force=False):
         hook.fire("group_window_add", self, win)
         self.windows.add(win)
+        self._layout_dirty = True
         win.group = self
         try:
             if 'fullscreen' in win.window.get_net_wm_state() and \
@@ -272,6 +317,7 @@ class _Group(CommandObject):
 
     def remove(self, win, force=False):
         self.windows.remove(win)
+        self._layout_dirty = True
         hadfocus = self._remove_from_focus_history(win)
         win.group = None
 
@@ -304,6 +350,7 @@ class _Group(CommandObject):
             self.layout_all()
 
     def mark_floating(self, win, floating):
+        self._layout_dirty = True
         if floating:
             if win in self.floating_layout.find_clients(self):
                 # already floating
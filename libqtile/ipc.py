@@ -23,15 +23,49 @@
     use marshal to serialize data - this means that both client and server must
     run the same Python version, and that clients must be trusted (as
     un-marshalling untrusted data can result in arbitrary code execution).
+
+    By default a client opens a connection per message, sends it and closes its
+    end, and the server replies and closes the connection. A persistent client
+    instead starts with MUX_MAGIC and a format byte, which the server echoes,
+    after which both sides exchange frames of a FRAMEFORMAT header (payload
+    length and request id) and the payload. Replies carry the id of the request
+    they answer, so many requests can be in flight on one connection.
+
+    The format byte picks the codec: marshal, json or, when the msgpack module
+    is installed, msgpack, which unlike marshal is safe to decode from
+    untrusted clients. One-shot messages can be sent as FORMAT_MAGIC, the
+    format byte and the payload, and are replied to in that format. Messages
+    without it are told apart by their header, as marshalled messages start
+    with their length, which json text can't.
+
+    A persistent client can also subscribe to events with a {"subscribe":
+    [names]} request. The server acknowledges it, then sends each event as
+    another frame carrying the id of that request, until the client sends
+    {"unsubscribe": id} or closes the connection. Events are queued per
+    subscription, so a slow reader only loses its own oldest events.
 """
 import asyncio
+import collections
 import fcntl
+import inspect
 import json
 import marshal
 import os.path
 import socket
 import struct
-from typing import Any, Optional, Tuple
+from functools import partial
+from typing import (
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
 
 from libqtile.log_utils import logger
 from libqtile.utils import get_cache_dir
@@ -39,8 +73,53 @@ from libqtile.utils import get_cache_dir
 HDRFORMAT = "!L"
 HDRLEN = struct.calcsize(HDRFORMAT)
 
+FRAMEFORMAT = "!LL"
+FRAMELEN = struct.calcsize(FRAMEFORMAT)
+
+MUX_MAGIC = b"QTMX"
+FORMAT_MAGIC = b"QTFM"
+FORMAT_MARSHAL = b"m"
+FORMAT_JSON = b"j"
+FORMAT_MSGPACK = b"p"
+FORMAT_UNSUPPORTED = b"\0"
+
+MAX_FRAME_SIZE = 2 ** 28
+
+SUBSCRIPTION_QUEUE_SIZE = 256
+
 SOCKBASE = "qtilesocket.%s"
 
+try:
+    import msgpack
+    has_msgpack = True
+except ImportError:
+    has_msgpack = False
+
+
+def _msgpack_default(obj: Any) -> Any:
+    """Convert what msgpack can't serialize but marshal can"""
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError("Can not serialize {!r}".format(obj))
+
+
+# format byte -> (encode, decode), where decode takes any bytes-like object
+CODECS: Dict[bytes, Tuple[Callable[[Any], bytes], Callable[[Any], Any]]] = {
+    FORMAT_MARSHAL: (marshal.dumps, marshal.loads),
+    FORMAT_JSON: (lambda msg: json.dumps(msg).encode(), lambda data: json.loads(bytes(data))),
+}
+if has_msgpack:
+    CODECS[FORMAT_MSGPACK] = (
+        partial(msgpack.packb, use_bin_type=True, default=_msgpack_default),
+        partial(msgpack.unpackb, raw=False, strict_map_key=False),
+    )
+
+CODEC_NAMES = {
+    "marshal": FORMAT_MARSHAL,
+    "json": FORMAT_JSON,
+    "msgpack": FORMAT_MSGPACK,
+}
+
 
 def find_sockfile(display: str = None):
     """Finds the appropriate socket file for the given display"""
@@ -67,8 +146,8 @@ class _IPC:
         data : bytes
             The incoming message to unpack
         is_json : Optional[bool]
-            If the message should be unpacked as json.  By default, try to
-            unpack json and fallback gracefully to marshalled bytes.
+            If the message should be unpacked as json.  By default, tell
+            marshalled bytes from json by their length header.
 
         Returns
         -------
@@ -77,23 +156,35 @@ class _IPC:
             message was deserialized using json.  If True, the return message
             should be packed as json.
         """
-        if is_json is None or is_json:
+        if is_json is None:
+            is_json = not _IPC.is_marshalled(data)
+        if is_json:
             try:
-                return json.loads(data.decode()), True
+                return json.loads(data), True
             except ValueError as e:
-                if is_json:
-                    raise IPCError("Unable to decode json data") from e
+                raise IPCError("Unable to decode json data") from e
 
         try:
             assert len(data) >= HDRLEN
             size = struct.unpack(HDRFORMAT, data[:HDRLEN])[0]
-            assert size >= len(data[HDRLEN:])
-            return marshal.loads(data[HDRLEN:HDRLEN + size]), False
-        except AssertionError as e:
+            assert size >= len(data) - HDRLEN
+            return marshal.loads(memoryview(data)[HDRLEN:HDRLEN + size]), False
+        except (AssertionError, ValueError, EOFError, TypeError) as e:
             raise IPCError(
                 "error reading reply! (probably the socket was disconnected)"
             ) from e
 
+    @staticmethod
+    def is_marshalled(data: bytes) -> bool:
+        """Whether the message is marshalled rather than json
+
+        A marshalled message starts with the length of the rest, while json
+        text can't start with the zero byte every message under 16MB would.
+        """
+        if len(data) < HDRLEN:
+            return False
+        return struct.unpack(HDRFORMAT, data[:HDRLEN])[0] == len(data) - HDRLEN
+
     @staticmethod
     def pack(msg: Any, *, is_json: bool = False) -> bytes:
         """Pack the object into a message to pass"""
@@ -105,9 +196,154 @@ class _IPC:
         size = struct.pack(HDRFORMAT, len(msg_bytes))
         return size + msg_bytes
 
+    @staticmethod
+    def encode(msg: Any, fmt: bytes) -> bytes:
+        """Serialize the object in the given format"""
+        return CODECS[fmt][0](msg)
+
+    @staticmethod
+    def decode(data: Any, fmt: bytes) -> Any:
+        """Deserialize the bytes-like object in the given format"""
+        try:
+            decode = CODECS[fmt][1]
+        except KeyError:
+            raise IPCError("Unsupported format {!r}".format(fmt))
+        try:
+            return decode(data)
+        except (ValueError, EOFError, TypeError) as e:
+            raise IPCError("Unable to decode message") from e
+
+    @staticmethod
+    def pack_frame(msg: Any, request_id: int, *, fmt: bytes = FORMAT_MARSHAL) -> bytes:
+        """Pack the object into a frame of a persistent connection"""
+        payload = _IPC.encode(msg, fmt)
+        return struct.pack(FRAMEFORMAT, len(payload), request_id) + payload
+
+    @staticmethod
+    def unpack_frame(payload: bytes, *, fmt: bytes = FORMAT_MARSHAL) -> Any:
+        """Unpack the payload of a frame of a persistent connection"""
+        return _IPC.decode(payload, fmt)
+
+    @staticmethod
+    async def read_frame(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+        """Read the next frame, returning its request id and payload"""
+        header = await reader.readexactly(FRAMELEN)
+        size, request_id = struct.unpack(FRAMEFORMAT, header)
+        if size > MAX_FRAME_SIZE:
+            raise IPCError("Frame of {} bytes is too large".format(size))
+        return request_id, await reader.readexactly(size)
+
+
+class _Connection:
+    """A persistent connection to the server
+
+    Requests are sent as soon as they are made, and each waits for the reply
+    carrying its id, so any number of them can share the connection.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                 fmt: bytes) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.fmt = fmt
+        self.loop = asyncio.get_event_loop()
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.streams: Dict[int, asyncio.Queue] = {}
+        self.next_id = 0
+        self.closed = False
+        self.reply_reader = self.loop.create_task(self._read_replies())
+
+    def _new_id(self) -> int:
+        if self.closed:
+            raise IPCError("Connection to server lost")
+        request_id = self.next_id
+        self.next_id = (self.next_id + 1) % 2 ** 32
+        return request_id
+
+    async def request(self, msg: Any, timeout: float) -> Any:
+        request_id = self._new_id()
+        future = self.loop.create_future()
+        self.pending[request_id] = future
+        try:
+            self.writer.write(_IPC.pack_frame(msg, request_id, fmt=self.fmt))
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            raise IPCError("Server not responding")
+        finally:
+            self.pending.pop(request_id, None)
+
+    async def subscribe(self, names: List[str], timeout: float) -> AsyncGenerator[Tuple[str, Any], None]:
+        """Subscribe to the named events, yielding (name, payload) pairs"""
+        request_id = self._new_id()
+        queue = asyncio.Queue()  # type: asyncio.Queue
+        self.streams[request_id] = queue
+        try:
+            self.writer.write(
+                _IPC.pack_frame({"subscribe": names}, request_id, fmt=self.fmt)
+            )
+            try:
+                ack = await asyncio.wait_for(queue.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                raise IPCError("Server not responding")
+            if isinstance(ack, IPCError):
+                raise ack
+            if "error" in ack:
+                raise IPCError(ack["error"])
+            while True:
+                event = await queue.get()
+                if isinstance(event, IPCError):
+                    raise event
+                name, payload = event
+                yield name, payload
+        finally:
+            del self.streams[request_id]
+            if not self.closed:
+                self.writer.write(_IPC.pack_frame(
+                    {"unsubscribe": request_id}, self._new_id(), fmt=self.fmt
+                ))
+
+    async def _read_replies(self) -> None:
+        try:
+            while True:
+                request_id, payload = await _IPC.read_frame(self.reader)
+                queue = self.streams.get(request_id)
+                if queue is not None:
+                    try:
+                        queue.put_nowait(_IPC.unpack_frame(payload, fmt=self.fmt))
+                    except IPCError as e:
+                        queue.put_nowait(e)
+                    continue
+                future = self.pending.get(request_id)
+                if future is None or future.done():
+                    continue
+                try:
+                    future.set_result(_IPC.unpack_frame(payload, fmt=self.fmt))
+                except IPCError as e:
+                    future.set_exception(e)
+        except (asyncio.IncompleteReadError, ConnectionError, IPCError):
+            pass
+        finally:
+            self.closed = True
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(IPCError("Connection to server lost"))
+            for queue in self.streams.values():
+                queue.put_nowait(IPCError("Connection to server lost"))
+
+    async def close(self) -> None:
+        self.closed = True
+        self.writer.close()
+        await self.writer.wait_closed()
+        await self.reply_reader
+
+
+# servers that don't answer the persistent handshake, by socket and inode
+_single_message_servers = set()  # type: Set[Tuple[str, int]]
+
 
 class Client:
-    def __init__(self, socket_path: str, is_json=False) -> None:
+    def __init__(self, socket_path: str, is_json=False, persistent=False,
+                 codec: Optional[str] = None) -> None:
         """Create a new IPC client
 
         Parameters
@@ -117,9 +353,24 @@ class Client:
             the running IPC server.
         is_json : bool
             Pack and unpack messages as json
+        persistent : bool
+            Keep one connection open and send every message over it, rather
+            than connecting for each message. Falls back to a connection per
+            message if the server doesn't support it.
+        codec : Optional[str]
+            Pack and unpack messages with "marshal", "json" or "msgpack", the
+            last needing the msgpack module. Overrides is_json.
         """
+        if codec is None:
+            codec = "json" if is_json else "marshal"
+        if CODEC_NAMES.get(codec) not in CODECS:
+            raise IPCError("Unsupported IPC codec: {}".format(codec))
         self.socket_path = socket_path
-        self.is_json = is_json
+        self.fmt = CODEC_NAMES[codec]
+        self.is_json = self.fmt == FORMAT_JSON
+        self.persistent = persistent
+        self._connection = None  # type: Optional[_Connection]
+        self._loop = None  # type: Optional[asyncio.AbstractEventLoop]
 
     def call(self, data: Any) -> Any:
         return self.send(data)
@@ -130,24 +381,136 @@ class Client:
         If any exception is raised by the server, that will propogate out of
         this call.
         """
-        return asyncio.run(self.async_send(msg))
+        if not self.persistent:
+            return asyncio.run(self.async_send(msg))
 
-    async def async_send(self, msg: Any) -> Any:
-        """Send the message to the server
+        # the connection belongs to the loop it was made in, so keep that
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(self.async_send(msg))
 
-        Connect to the server, then pack and send the message to the server,
-        then wait for and return the response from the server.
+    def __enter__(self) -> "Client":
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the persistent connection, if any"""
+        if self._loop is not None:
+            if self._connection is not None:
+                self._loop.run_until_complete(self._connection.close())
+                self._connection = None
+            self._loop.close()
+            self._loop = None
+
+    async def async_close(self) -> None:
+        """Close the persistent connection made by async_send, if any"""
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+    def subscribe(self, names: List[str]) -> Iterator[Tuple[str, Any]]:
+        """Subscribe to the named events, yielding (name, payload) pairs
+
+        Blocks waiting for each event. Needs a persistent client.
+        """
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        events = self.async_subscribe(names)
+        try:
+            while True:
+                try:
+                    yield self._loop.run_until_complete(events.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            if self._loop is not None:
+                self._loop.run_until_complete(events.aclose())
+
+    async def async_subscribe(self, names: List[str]) -> AsyncGenerator[Tuple[str, Any], None]:
+        """Subscribe to the named events, yielding (name, payload) pairs
+
+        The events arrive over the persistent connection, which can be used for
+        other messages in the meantime.
         """
+        connection = None
+        if self.persistent:
+            connection = await self._get_connection()
+        if connection is None:
+            raise IPCError("Subscribing needs a persistent connection")
+        async for event in connection.subscribe(names, timeout=10):
+            yield event
+
+    async def _connect(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
         try:
-            reader, writer = await asyncio.wait_for(
+            return await asyncio.wait_for(
                 asyncio.open_unix_connection(path=self.socket_path), timeout=3
             )
         except (ConnectionRefusedError, FileNotFoundError):
             raise IPCError("Could not open {}".format(self.socket_path))
 
+    def _server_key(self) -> Optional[Tuple[str, int]]:
+        # the socket is made anew when the server starts, so a restarted
+        # server has another inode
         try:
-            send_data = _IPC.pack(msg, is_json=self.is_json)
-            writer.write(send_data)
+            return (self.socket_path, os.stat(self.socket_path).st_ino)
+        except OSError:
+            return None
+
+    async def _get_connection(self) -> Optional[_Connection]:
+        """Return the persistent connection, opening it if needed"""
+        loop = asyncio.get_event_loop()
+        connection = self._connection
+        if connection is not None and not connection.closed and connection.loop is loop:
+            return connection
+
+        server = self._server_key()
+        if server in _single_message_servers:
+            self.persistent = False
+            return None
+
+        reader, writer = await self._connect()
+        writer.write(MUX_MAGIC + self.fmt)
+        try:
+            ack = await asyncio.wait_for(reader.readexactly(len(MUX_MAGIC) + 1), timeout=1)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            ack = None
+        if ack == MUX_MAGIC + FORMAT_UNSUPPORTED:
+            writer.close()
+            raise IPCError("The server does not support the {!r} format".format(self.fmt))
+        if ack != MUX_MAGIC + self.fmt:
+            # an older server, which waits for the end of a single message;
+            # remember it, so other clients don't wait for the handshake too
+            writer.close()
+            if server is not None:
+                _single_message_servers.add(server)
+            self.persistent = False
+            return None
+
+        self._connection = _Connection(reader, writer, self.fmt)
+        return self._connection
+
+    async def async_send(self, msg: Any) -> Any:
+        """Send the message to the server
+
+        Connect to the server, then pack and send the message to the server,
+        then wait for and return the response from the server. Persistent
+        clients reuse their connection, and can have many messages in flight.
+        """
+        if self.persistent:
+            connection = await self._get_connection()
+            if connection is not None:
+                return await connection.request(msg, timeout=10)
+
+        reader, writer = await self._connect()
+
+        try:
+            if self.fmt == FORMAT_MSGPACK:
+                writer.write(FORMAT_MAGIC + self.fmt + _IPC.encode(msg, self.fmt))
+            else:
+                # the formats every server version understands without a header
+                writer.write(_IPC.pack(msg, is_json=self.is_json))
             writer.write_eof()
 
             read_data = await asyncio.wait_for(reader.read(), timeout=10)
@@ -158,15 +521,83 @@ class Client:
             writer.close()
             await writer.wait_closed()
 
+        if self.fmt == FORMAT_MSGPACK:
+            return _IPC.decode(read_data, self.fmt)
         data, _ = _IPC.unpack(read_data, is_json=self.is_json)
 
         return data
 
 
+class _Subscription:
+    """The events a persistent connection subscribed to, waiting to be sent
+
+    Events that are identical to one already waiting are dropped, and when more
+    than maxsize are waiting the oldest are, so a reader that can't keep up
+    loses events rather than holding memory without bound.
+    """
+
+    def __init__(self, writer: asyncio.StreamWriter, request_id: int, names: Set[str],
+                 fmt: bytes, maxsize: int = SUBSCRIPTION_QUEUE_SIZE) -> None:
+        self.writer = writer
+        self.request_id = request_id
+        self.names = names
+        self.fmt = fmt
+        self.maxsize = maxsize
+        self.dropped = 0
+        self.queue = collections.OrderedDict()  # type: collections.OrderedDict
+        self.ready = asyncio.Event()
+        self.sender = asyncio.ensure_future(self._send())
+
+    def push(self, name: str, payload: Any) -> None:
+        frame = _IPC.pack_frame((name, payload), self.request_id, fmt=self.fmt)
+        if frame in self.queue:
+            return
+        self.queue[frame] = None
+        if len(self.queue) > self.maxsize:
+            self.queue.popitem(last=False)
+            self.dropped += 1
+        self.ready.set()
+
+    async def _send(self) -> None:
+        while True:
+            await self.ready.wait()
+            self.ready.clear()
+            while self.queue:
+                frame, _ = self.queue.popitem(last=False)
+                self.writer.write(frame)
+                try:
+                    await self.writer.drain()
+                except ConnectionError:
+                    return
+
+    def cancel(self) -> None:
+        self.sender.cancel()
+        if self.dropped:
+            logger.info("IPC subscriber dropped %d events", self.dropped)
+
+
 class Server:
-    def __init__(self, socket_path: str, handler) -> None:
+    def __init__(self, socket_path: str, handler, subscribe_handler=None) -> None:
+        """Create a new IPC server
+
+        Parameters
+        ----------
+        socket_path : str
+            The file path to listen on.
+        handler : Callable
+            Called with each message, returning the reply or an awaitable of
+            it. Replies on a persistent connection are sent as they are ready,
+            so they needn't be in the order of the requests.
+        subscribe_handler : Optional[Callable]
+            Called with the server and the event names a client subscribes to,
+            so events with those names can be passed to publish(). Raising a
+            ValueError rejects the subscription. Without it, subscriptions are
+            refused.
+        """
         self.socket_path = socket_path
         self.handler = handler
+        self.subscribe_handler = subscribe_handler
+        self.subscriptions = set()  # type: Set[_Subscription]
         self.server = None  # type: Optional[asyncio.AbstractServer]
 
         if os.path.exists(socket_path):
@@ -187,16 +618,34 @@ class Server:
         """
         try:
             logger.debug("Connection made to server")
-            data = await reader.read()
+            try:
+                data = await reader.readexactly(len(MUX_MAGIC) + 1)
+            except asyncio.IncompleteReadError as e:
+                data = e.partial
+            else:
+                if data.startswith(MUX_MAGIC):
+                    await self._serve_persistent(reader, writer, data[len(MUX_MAGIC):])
+                    return
+                data += await reader.read()
             logger.debug("EOF received by server")
 
-            req, is_json = _IPC.unpack(data)
+            fmt = None  # type: Optional[bytes]
+            if data.startswith(FORMAT_MAGIC):
+                fmt = data[len(FORMAT_MAGIC):len(FORMAT_MAGIC) + 1]
+                req = _IPC.decode(memoryview(data)[len(FORMAT_MAGIC) + 1:], fmt)
+            else:
+                req, is_json = _IPC.unpack(data)
         except IPCError:
             logger.warn("Invalid data received, closing connection")
         else:
             rep = self.handler(req)
+            if inspect.isawaitable(rep):
+                rep = await rep
 
-            result = _IPC.pack(rep, is_json=is_json)
+            if fmt is not None:
+                result = _IPC.encode(rep, fmt)
+            else:
+                result = _IPC.pack(rep, is_json=is_json)
 
             logger.debug("Sending result on receive EOF")
             writer.write(result)
@@ -206,6 +655,104 @@ class Server:
             writer.close()
             await writer.wait_closed()
 
+    async def _serve_persistent(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, fmt: bytes
+    ) -> None:
+        """Answer the frames of a persistent connection until it is closed"""
+        if fmt not in CODECS:
+            logger.warning("Unsupported IPC format %r, closing connection", fmt)
+            writer.write(MUX_MAGIC + FORMAT_UNSUPPORTED)
+            return
+
+        logger.debug("Persistent connection made to server")
+        writer.write(MUX_MAGIC + fmt)
+        subscriptions: Dict[int, _Subscription] = {}
+        replies = set()  # type: Set[asyncio.Future]
+        try:
+            while True:
+                try:
+                    request_id, payload = await _IPC.read_frame(reader)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    logger.debug("Persistent connection closed by client")
+                    return
+                except IPCError as e:
+                    logger.warning("%s, closing connection", e)
+                    return
+                try:
+                    req = _IPC.unpack_frame(payload, fmt=fmt)
+                except IPCError:
+                    logger.warning("Invalid data received, closing connection")
+                    return
+
+                if isinstance(req, dict) and "subscribe" in req:
+                    try:
+                        subscriptions[request_id] = self._subscribe(
+                            writer, request_id, req["subscribe"], fmt
+                        )
+                    except ValueError as e:
+                        rep = {"error": str(e)}  # type: Any
+                    else:
+                        rep = {"subscribed": req["subscribe"]}
+                elif isinstance(req, dict) and "unsubscribe" in req:
+                    subscription = subscriptions.pop(req["unsubscribe"], None)
+                    if subscription is not None:
+                        self._unsubscribe(subscription)
+                    rep = {}
+                else:
+                    rep = self.handler(req)
+                    if inspect.isawaitable(rep):
+                        # reply when it's ready, answering other requests meanwhile
+                        task = asyncio.ensure_future(self._reply_later(writer, request_id, fmt, rep))
+                        replies.add(task)
+                        task.add_done_callback(replies.discard)
+                        continue
+                writer.write(_IPC.pack_frame(rep, request_id, fmt=fmt))
+                try:
+                    await writer.drain()
+                except ConnectionError:
+                    logger.debug("Persistent connection closed by client")
+                    return
+        finally:
+            for subscription in subscriptions.values():
+                self._unsubscribe(subscription)
+            for reply in replies:
+                reply.cancel()
+
+    @staticmethod
+    async def _reply_later(writer: asyncio.StreamWriter, request_id: int, fmt: bytes,
+                           rep: Awaitable) -> None:
+        writer.write(_IPC.pack_frame(await rep, request_id, fmt=fmt))
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    def _subscribe(self, writer: asyncio.StreamWriter, request_id: int, names: List[str],
+                   fmt: bytes) -> _Subscription:
+        if self.subscribe_handler is None:
+            raise ValueError("This server does not support subscriptions")
+        self.subscribe_handler(self, names)
+        subscription = _Subscription(writer, request_id, set(names), fmt)
+        self.subscriptions.add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: _Subscription) -> None:
+        self.subscriptions.discard(subscription)
+        subscription.cancel()
+
+    def wants(self, name: str) -> bool:
+        """Whether any client is subscribed to the named event"""
+        return any(name in s.names for s in self.subscriptions)
+
+    def publish(self, name: str, payload: Any) -> None:
+        """Queue the named event for every client subscribed to it
+
+        The payload must be serializable in the format of each client.
+        """
+        for subscription in self.subscriptions:
+            if name in subscription.names:
+                subscription.push(name, payload)
+
     async def __aenter__(self) -> "Server":
         """Start and return the server"""
         await self.start()
@@ -94,6 +94,16 @@ class Layout(CommandObject, configurable.Configurable, metaclass=ABCMeta):
         """Called when layout is being hidden"""
         pass
 
+    @property
+    def focus_changes_geometry(self):
+        """Whether moving focus between clients can move or resize windows
+
+        Layouts where focus only affects border colours can return False, so
+        that a focus change only reconfigures the previously and newly focused
+        windows instead of laying out the whole group.
+        """
+        return True
+
     def focus(self, client):
         """Called whenever the focus changes"""
         pass
@@ -459,7 +469,6 @@ class _SimpleLayoutBase(Layout):
 
     def focus(self, client):
         self.clients.current_client = client
-        self.group.layout_all()
 
     def focus_first(self):
         return self.clients.focus_first()
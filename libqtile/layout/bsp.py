@@ -147,6 +147,8 @@ class Bsp(Layout):
         Key([mod, "shift"], "n", lazy.layout.normalize()),
         Key([mod], "Return", lazy.layout.toggle_split()),
     """
+    focus_changes_geometry = False
+
     defaults = [
         ("name", "bsp", "Name of this layout."),
         ("border_focus", "#881111", "Border colour for the focused window."),
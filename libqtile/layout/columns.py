@@ -163,6 +163,11 @@ class Columns(Layout):
                 self.current = i
                 break
 
+    @property
+    def focus_changes_geometry(self):
+        # a stacked column only shows its current client
+        return any(not c.split and len(c) > 1 for c in self.columns)
+
     @property
     def cc(self):
         return self.columns[self.current]
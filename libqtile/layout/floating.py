@@ -30,7 +30,7 @@
 
 import warnings
 
-from libqtile.config import Match
+from libqtile.config import Match, MatchIndex
 from libqtile.layout.base import Layout
 from libqtile.log_utils import logger
 
@@ -120,9 +120,17 @@ class Floating(Layout):
         self.no_reposition_rules = no_reposition_rules or []
         self.add_defaults(Floating.defaults)
 
+    @property
+    def float_rules(self):
+        return self._float_index.items
+
+    @float_rules.setter
+    def float_rules(self, rules):
+        self._float_index = MatchIndex(rules)
+
     def match(self, win):
         """Used to default float some windows"""
-        return any(win.match(rule) for rule in self.float_rules)
+        return bool(self._float_index.matches(win))
 
     def find_clients(self, group):
         """Find all clients belonging to a given group"""
@@ -262,7 +270,7 @@ class Floating(Layout):
 
         # 'sun-awt-X11-XWindowPeer' is a dropdown used in Java application,
         # don't reposition it anywhere, let Java app to control it
-        cls = client.window.get_wm_class() or ''
+        cls = client.get_wm_class() or ''
         is_java_dropdown = 'sun-awt-X11-XWindowPeer' in cls
         if is_java_dropdown:
             client.paint_borders(bc, bw)
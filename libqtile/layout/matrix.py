@@ -36,6 +36,8 @@ class Matrix(_SimpleLayoutBase):
     can also be changed interactively.
     """
 
+    focus_changes_geometry = False
+
     defaults = [
         ("border_focus", "#0000ff", "Border colour for the focused window."),
         ("border_normal", "#000000", "Border colour for un-focused windows."),
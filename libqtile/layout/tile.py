@@ -44,6 +44,8 @@ class Tile(_SimpleLayoutBase):
     if shift_windows is set to True, individually.
     """
 
+    focus_changes_geometry = False
+
     defaults = [
         ("border_focus", "#0000ff", "Border colour for the focused window."),
         ("border_normal", "#000000", "Border colour for un-focused windows."),
@@ -470,6 +470,7 @@ class TreeTab(Layout):
         self._panel.handle_ButtonPress = self._handle_ButtonPress
         self.group.qtile.windows_map[self._panel.window.wid] = self._panel
         hook.subscribe.client_name_updated(self.draw_panel)
+        hook.subscribe.client_urgent_hint_changed(self.draw_panel)
         hook.subscribe.focus_change(self.draw_panel)
 
     def _handle_Expose(self, e):  # noqa: N802
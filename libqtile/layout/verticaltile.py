@@ -83,6 +83,8 @@ class VerticalTile(_SimpleLayoutBase):
         Key([modkey], 'n', lazy.layout.normalize()),
     """
 
+    focus_changes_geometry = False
+
     defaults = [
         ('border_focus', '#FF0000', 'Border color for the focused window.'),
         ('border_normal', '#FFFFFF', 'Border color for un-focused windows.'),
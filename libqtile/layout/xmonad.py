@@ -144,6 +144,8 @@ class MonadTall(_SimpleLayoutBase):
     _right = 1
     _med_ratio = 0.5
 
+    focus_changes_geometry = False
+
     defaults = [
         ("border_focus", "#ff0000", "Border colour for the focused window."),
         ("border_normal", "#000000", "Border colour for un-focused windows."),
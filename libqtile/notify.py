@@ -25,40 +25,107 @@
 """
     If dbus is available, this module implements a
     org.freedesktop.Notifications service.
+
+    The service uses dbus-next, reading the bus from qtile's event loop. Only
+    when that isn't installed does it fall back to dbus-python, which is
+    dispatched from the GLib main loop thread qtile then runs.
+
+    Only the latest MAX_NOTIFICATIONS notifications are kept. Notifications
+    which replace an earlier one take its place, and those with a timeout are
+    closed when it runs out.
 """
+import asyncio
+import heapq
+import itertools
+from collections import deque
+
+import libqtile
+from libqtile import hook
 from libqtile.log_utils import logger
 
 try:
-    import dbus
-    from dbus import service
-    from dbus.mainloop.glib import DBusGMainLoop
-    DBusGMainLoop(set_as_default=True)
-    has_dbus = True
+    from dbus_next import Variant
+    from dbus_next.aio import MessageBus
+    from dbus_next.service import ServiceInterface, method, signal
+    has_dbus_next = True
 except ImportError:
-    has_dbus = False
+    has_dbus_next = False
+
+has_dbus = False
+if not has_dbus_next:
+    try:
+        import dbus
+        from dbus import service
+        from dbus.mainloop.glib import DBusGMainLoop
+        from gi.repository import GLib  # type: ignore # noqa: F401
+        DBusGMainLoop(set_as_default=True)
+        has_dbus = True
+    except ImportError:
+        pass
 
 BUS_NAME = 'org.freedesktop.Notifications'
 SERVICE_PATH = '/org/freedesktop/Notifications'
 
-if has_dbus:
-    class NotificationService(service.Object):
+MAX_NOTIFICATIONS = 100
+
+# reasons given with the NotificationClosed signal
+CLOSED_EXPIRED = 1
+CLOSED_DISMISSED = 2
+CLOSED_BY_CALL = 3
+
+if has_dbus_next:
+    class NotificationService(ServiceInterface):
+        def __init__(self, manager):
+            super().__init__(BUS_NAME)
+            self.manager = manager
+
+        async def start(self):
+            bus = await MessageBus().connect()
+            bus.export(SERVICE_PATH, self)
+            await bus.request_name(BUS_NAME)
+
+        @method()
+        def GetCapabilities(self) -> 'as':  # type: ignore  # noqa: N802, F722
+            return list(self.manager.capabilities)
+
+        @method()
+        def Notify(self, app_name: 's', replaces_id: 'u',  # type: ignore  # noqa: N802, F821
+                   app_icon: 's', summary: 's', body: 's',  # type: ignore  # noqa: F821
+                   actions: 'as', hints: 'a{sv}', timeout: 'i') -> 'u':  # type: ignore  # noqa: F722, F821
+            hints = {
+                k: v.value if isinstance(v, Variant) else v for k, v in hints.items()
+            }
+            notif = Notification(
+                summary, body, timeout, hints, app_name, replaces_id, app_icon, actions
+            )
+            return self.manager.add(notif)
+
+        @method()
+        def CloseNotification(self, id: 'u'):  # type: ignore  # noqa: N802, F821
+            self.manager.close(id, CLOSED_BY_CALL)
+
+        @signal()
+        def NotificationClosed(self, id_in, reason_in) -> 'uu':  # type: ignore  # noqa: N802, F821
+            return [id_in, reason_in]
+
+        @method()
+        def GetServerInformation(self) -> 'ssss':  # type: ignore  # noqa: N802, F821
+            return ["qtile-notify-daemon", "qtile", "1.0", "1"]
+
+elif has_dbus:
+    class NotificationService(service.Object):  # type: ignore
         def __init__(self, manager):
             bus = dbus.SessionBus()
             bus.request_name(BUS_NAME)
             bus_name = service.BusName(BUS_NAME, bus=bus)
             service.Object.__init__(self, bus_name, SERVICE_PATH)
             self.manager = manager
-            self._capabilities = {'body'}
 
         @service.method(BUS_NAME, in_signature='', out_signature='as')
         def GetCapabilities(self):  # noqa: N802
-            return list(self._capabilities)
+            return list(self.manager.capabilities)
 
-        def register_capabilities(self, capabilities):
-            if isinstance(capabilities, str):
-                self._capabilities.add(capabilities)
-            elif isinstance(capabilities, (tuple, list, set)):
-                self._capabilities.update(set(capabilities))
+        # these are called in the GLib thread, so hand the work to the event loop
 
         @service.method(BUS_NAME, in_signature='susssasa{sv}i', out_signature='u')
         def Notify(self, app_name, replaces_id, app_icon, summary,  # noqa: N802
@@ -66,11 +133,13 @@ if has_dbus:
             notif = Notification(
                 summary, body, timeout, hints, app_name, replaces_id, app_icon, actions
             )
-            return self.manager.add(notif)
+            notif.id = self.manager.reserve_id(replaces_id)
+            libqtile.qtile.call_soon_threadsafe(self.manager.add, notif)
+            return notif.id
 
         @service.method(BUS_NAME, in_signature='u', out_signature='')
         def CloseNotification(self, id):  # noqa: N802
-            pass
+            libqtile.qtile.call_soon_threadsafe(self.manager.close, id, CLOSED_BY_CALL)
 
         @service.signal(BUS_NAME, signature='uu')
         def NotificationClosed(self, id_in, reason_in):  # noqa: N802
@@ -92,40 +161,164 @@ class Notification:
         self.replaces_id = replaces_id
         self.app_icon = app_icon
         self.actions = actions
+        self.id = None
 
 
 class NotificationManager:
-    def __init__(self):
-        self.notifications = []
+    def __init__(self, maxlen=MAX_NOTIFICATIONS):
+        # oldest first, notifications which replace another take its place
+        self.notifications = deque(maxlen=maxlen)
+        self._by_id = {}
+        self._ids = itertools.count(1)
         self.callbacks = []
+        self.close_callbacks = []
+        self.capabilities = {'body'}
         self._service = None
+        self._started = False
+        # connecting to the bus with dbus-next, until it's done
+        self._starting = None
+        # expiry times by id, with a heap of (time, id) to find the next one;
+        # entries for replaced or closed notifications are skipped when popped
+        self._deadlines = {}
+        self._expiry = []
+        self._timer = None
 
     @property
     def service(self):
-        if has_dbus and self._service is None:
-            try:
-                self._service = NotificationService(self)
-            except Exception:
-                logger.exception('Dbus connection failed')
-                self._service = None
         return self._service
 
-    def register(self, callback, capabilities=None):
-        if not self.service:
+    def _start(self):
+        if self._started:
+            return
+        self._started = True
+        if not has_dbus_next and not has_dbus:
             logger.warning(
-                'Registering %s without any dbus connection existing',
-                callback.__name__,
+                'Neither dbus-next nor dbus-python with GLib is installed, '
+                'so no notifications will be received.'
             )
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # widgets register while the config is read, before the loop runs
+            hook.subscribe.startup(self._start_service)
+        else:
+            self._start_service()
+
+    def _start_service(self):
+        if has_dbus_next:
+            self._service = NotificationService(self)
+            self._starting = asyncio.ensure_future(self._service.start())
+            self._starting.add_done_callback(self._service_started)
+            return
+
+        try:
+            self._service = NotificationService(self)
+        except Exception:
+            logger.exception('Dbus connection failed')
+
+    def _service_started(self, task):
+        self._starting = None
+        if task.exception() is not None:
+            logger.error('Dbus connection failed', exc_info=task.exception())
+            self._service = None
+
+    def register(self, callback, capabilities=None, on_close=None):
+        self._start()
         self.callbacks.append(callback)
-        if capabilities:
-            self._service.register_capabilities(capabilities)
+        if on_close is not None:
+            self.close_callbacks.append(on_close)
+        if isinstance(capabilities, str):
+            self.capabilities.add(capabilities)
+        elif capabilities:
+            self.capabilities.update(capabilities)
+
+    def get(self, id):
+        return self._by_id.get(id)
+
+    def reserve_id(self, replaces_id=None):
+        """Get the id that a notification replacing replaces_id will have"""
+        if replaces_id and replaces_id in self._by_id:
+            return replaces_id
+        return next(self._ids)
 
     def add(self, notif):
-        self.notifications.append(notif)
-        notif.id = len(self.notifications)
+        """Store and announce notif, returning its id
+
+        This must be called from the event loop.
+        """
+        if notif.id is None:
+            notif.id = self.reserve_id(notif.replaces_id)
+
+        old = self._by_id.get(notif.id)
+        if old is not None:
+            self.notifications[self.notifications.index(old)] = notif
+        else:
+            if len(self.notifications) == self.notifications.maxlen:
+                self._forget(self.notifications[0])
+            self.notifications.append(notif)
+        self._by_id[notif.id] = notif
+        self._expire_later(notif)
+
         for callback in self.callbacks:
             callback(notif)
-        return len(self.notifications)
+        return notif.id
+
+    def close(self, id, reason=CLOSED_DISMISSED):
+        """Close the notification with the given id, if it's still open"""
+        notif = self._by_id.get(id)
+        if notif is None:
+            return
+        self.notifications.remove(notif)
+        self._forget(notif)
+
+        for callback in self.close_callbacks:
+            callback(notif)
+        if self._service is not None:
+            self._service.NotificationClosed(id, reason)
+
+    def _forget(self, notif):
+        del self._by_id[notif.id]
+        self._deadlines.pop(notif.id, None)
+
+    def _expire_later(self, notif):
+        self._deadlines.pop(notif.id, None)
+        if not notif.timeout or notif.timeout < 0:
+            # never, or whenever we like, which is also never
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # nothing can be shown before the loop runs anyway
+            return
+
+        deadline = loop.time() + notif.timeout / 1000
+        self._deadlines[notif.id] = deadline
+        if len(self._expiry) > 2 * self.notifications.maxlen:
+            self._expiry = [(t, id) for id, t in self._deadlines.items()]
+            heapq.heapify(self._expiry)
+        else:
+            heapq.heappush(self._expiry, (deadline, notif.id))
+        self._schedule_expiry(loop)
+
+    def _schedule_expiry(self, loop):
+        if not self._expiry:
+            return
+        deadline = self._expiry[0][0]
+        if self._timer is not None:
+            if self._timer.when() <= deadline:
+                return
+            self._timer.cancel()
+        self._timer = loop.call_at(deadline, self._expire, loop)
+
+    def _expire(self, loop):
+        self._timer = None
+        now = loop.time()
+        while self._expiry and self._expiry[0][0] <= now:
+            deadline, id = heapq.heappop(self._expiry)
+            if self._deadlines.get(id) == deadline:
+                self.close(id, CLOSED_EXPIRED)
+        self._schedule_expiry(loop)
 
     def show(self, *args, **kwargs):
         notif = Notification(*args, **kwargs)
@@ -24,7 +24,7 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from typing import List  # noqa: F401
+from typing import Dict, List  # noqa: F401
 
 from libqtile import bar, layout, widget
 from libqtile.config import Click, Drag, Group, Key, Match, Screen
@@ -175,6 +175,13 @@ floating_layout = layout.Floating(float_rules=[
 auto_fullscreen = True
 focus_on_window_activation = "smart"
 
+# Run GLib's main loop for dbus-python even when dbus-next is installed
+dbus_glib_fallback = False
+
+# Thread pool sizes for blocking widget polls, added to or overriding the
+# defaults of {"io": 8, "subprocess": 4, "cpu": 2}
+executors = {}  # type: Dict[str, int]
+
 # XXX: Gasp! We're lying here. In fact, nobody really uses or cares about this
 # string besides java UI toolkits; you can see several discussions on the
 # mailing lists, GitHub issues, and other WM documentation that suggest setting
@@ -169,19 +169,19 @@ def cmd_obj(args) -> None:
 
     if args.obj_spec:
         sock_file = args.socket or find_sockfile()
-        ipc_client = Client(sock_file)
-        cmd_object = IPCCommandInterface(ipc_client)
-        cmd_client = InteractiveCommandClient(cmd_object)
-        obj = get_object(cmd_client, args.obj_spec)
-
-        if args.function == "help":
-            print_commands("-o " + " ".join(args.obj_spec), obj)
-        elif args.info:
-            print(get_formated_info(obj, args.function, args=True, short=False))
-        else:
-            ret = run_function(obj, args.function, args.args)
-            if ret is not None:
-                pprint.pprint(ret)
+        with Client(sock_file, persistent=True) as ipc_client:
+            cmd_object = IPCCommandInterface(ipc_client)
+            cmd_client = InteractiveCommandClient(cmd_object)
+            obj = get_object(cmd_client, args.obj_spec)
+
+            if args.function == "help":
+                print_commands("-o " + " ".join(args.obj_spec), obj)
+            elif args.info:
+                print(get_formated_info(obj, args.function, args=True, short=False))
+            else:
+                ret = run_function(obj, args.function, args.args)
+                if ret is not None:
+                    pprint.pprint(ret)
     else:
         print_base_objects()
         sys.exit(1)
@@ -27,13 +27,13 @@ def qshell(args) -> None:
         socket = ipc.find_sockfile()
     else:
         socket = args.socket
-    client = ipc.Client(socket, is_json=args.is_json)
-    cmd_object = interface.IPCCommandInterface(client)
-    qsh = sh.QSh(cmd_object)
-    if args.command is not None:
-        qsh.process_line(args.command)
-    else:
-        qsh.loop()
+    with ipc.Client(socket, is_json=args.is_json, persistent=True) as client:
+        cmd_object = interface.IPCCommandInterface(client)
+        qsh = sh.QSh(cmd_object)
+        if args.command is not None:
+            qsh.process_line(args.command)
+        else:
+            qsh.loop()
 
 
 def add_subcommand(subparsers):
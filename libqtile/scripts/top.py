@@ -149,30 +149,29 @@ def top(opts):
         socket = ipc.find_sockfile()
     else:
         socket = opts.socket
-    c = client.InteractiveCommandClient(
+    with client.InteractiveCommandClient(
         interface.IPCCommandInterface(
-            ipc.Client(socket),
+            ipc.Client(socket, persistent=True),
         ),
-    )
-
-    try:
-        if not opts.raw:
-            curses.wrapper(get_stats, c, limit=lines, seconds=seconds,
-                           force_start=force_start)
-        else:
+    ) as c:
+        try:
+            if not opts.raw:
+                curses.wrapper(get_stats, c, limit=lines, seconds=seconds,
+                               force_start=force_start)
+            else:
+                raw_stats(c, limit=lines, force_start=force_start)
+        except TraceNotStarted:
+            print("tracemalloc not started on qtile, start by setting "
+                  "PYTHONTRACEMALLOC=1 before starting qtile")
+            print("or force start tracemalloc now, but you'll lose early traces")
+            exit(1)
+        except TraceCantStart:
+            print("Can't start tracemalloc on qtile, check the logs")
+        except KeyboardInterrupt:
+            exit(-1)
+        except curses.error:
+            print("Terminal too small for curses interface.")
             raw_stats(c, limit=lines, force_start=force_start)
-    except TraceNotStarted:
-        print("tracemalloc not started on qtile, start by setting "
-              "PYTHONTRACEMALLOC=1 before starting qtile")
-        print("or force start tracemalloc now, but you'll lose early traces")
-        exit(1)
-    except TraceCantStart:
-        print("Can't start tracemalloc on qtile, check the logs")
-    except KeyboardInterrupt:
-        exit(-1)
-    except curses.error:
-        print("Terminal too small for curses interface.")
-        raw_stats(c, limit=lines, force_start=force_start)
 
 
 def add_subcommand(subparsers):
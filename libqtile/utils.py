@@ -42,6 +42,13 @@ try:
 except ImportError as e:
     logger.warning("Failed to import dependencies for notifications: %s" % e)
 
+try:
+    from dbus_next import BusType, Message, MessageType
+    from dbus_next.aio import MessageBus
+    has_dbus_next = True
+except ImportError:
+    has_dbus_next = False
+
 
 class QtileError(Exception):
     pass
@@ -80,7 +87,14 @@ def rgb(x):
             (255, 0, 0)
             with alpha: (255, 0, 0, 0.5)
     """
-    if isinstance(x, (tuple, list)):
+    if isinstance(x, list):
+        x = tuple(x)
+    return _rgb(x)
+
+
+@functools.lru_cache(maxsize=256)
+def _rgb(x):
+    if isinstance(x, tuple):
         if len(x) == 4:
             alpha = x[3]
         else:
@@ -96,11 +110,14 @@ def rgb(x):
             alpha = 1
         if len(x) not in (6, 8):
             raise ValueError("RGB specifier must be 6 or 8 characters long.")
-        vals = [int(i, 16) for i in (x[0:2], x[2:4], x[4:6])]
         if len(x) == 8:
             alpha = int(x[6:8], 16) / 255.0
-        vals.append(alpha)
-        return rgb(vals)
+        return (
+            int(x[0:2], 16) / 255.0,
+            int(x[2:4], 16) / 255.0,
+            int(x[4:6], 16) / 255.0,
+            alpha,
+        )
     raise ValueError("Invalid RGB specifier.")
 
 
@@ -310,3 +327,49 @@ def scan_files(dirpath, *names):
         files[name].extend(found)
 
     return files
+
+
+async def add_signal_receiver(callback, session_bus=False, signal_name=None,
+                              dbus_interface=None, bus_name=None, path=None):
+    """Call callback with the arguments of each matching dbus signal
+
+    This is the dbus-next counterpart of dbus-python's bus.add_signal_receiver.
+    The receiver gets a connection of its own, which the running event loop
+    reads, so the callback is called from the event loop. Returns whether the
+    receiver could be added.
+    """
+    if not has_dbus_next:
+        return False
+
+    bus_type = BusType.SESSION if session_bus else BusType.SYSTEM
+    try:
+        bus = await MessageBus(bus_type=bus_type).connect()
+    except Exception:
+        logger.exception("Unable to connect to dbus")
+        return False
+
+    # the bus only sends this connection the signals matching its rules
+    rule = ["type='signal'"]
+    for key, value in (("member", signal_name), ("interface", dbus_interface),
+                       ("sender", bus_name), ("path", path)):
+        if value is not None:
+            rule.append("{}='{}'".format(key, value))
+    reply = await bus.call(Message(
+        destination="org.freedesktop.DBus",
+        path="/org/freedesktop/DBus",
+        interface="org.freedesktop.DBus",
+        member="AddMatch",
+        signature="s",
+        body=[",".join(rule)],
+    ))
+    if reply.message_type == MessageType.ERROR:
+        logger.warning("Unable to add dbus signal receiver: %s", reply.body)
+        bus.disconnect()
+        return False
+
+    def handler(message):
+        if message.message_type == MessageType.SIGNAL:
+            callback(*message.body)
+
+    bus.add_message_handler(handler)
+    return True
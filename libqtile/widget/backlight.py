@@ -146,4 +146,10 @@ class Backlight(base.InLoopPollText):
         elif direction is ChangeDirection.UP:
             new = min(now + step, 100)
         if new != now:
-            self._future = self.qtile.run_in_executor(self._change_backlight, new)
+            if self.change_command is None:
+                executor = "io"
+            else:
+                executor = "subprocess"
+            self._future = self.qtile.run_in_executor(
+                self._change_backlight, new, executor=executor
+            )
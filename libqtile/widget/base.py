@@ -29,6 +29,7 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import asyncio
 import subprocess
 from typing import Any, List, Tuple
 
@@ -199,10 +200,34 @@ class _Widget(CommandObject, configurable.Configurable):
             self.bar.width,
             self.bar.height
         )
+        self._prepare_colours()
         if not self.configured:
             self.configured = True
             self.qtile.call_soon(self.timer_setup)
 
+    def _prepare_colours(self):
+        """Look up the widget's colours, so that drawing finds them cached
+
+        A bad colour is reported once, when the bar is configured, and replaced
+        with the default for the option rather than failing every draw.
+        """
+        for name in self._variable_defaults:
+            if not (name.endswith(("colour", "color")) or
+                    name in ("background", "foreground")):
+                continue
+            colour = getattr(self, name)
+            if colour is None:
+                continue
+            try:
+                self.drawer.source(colour)
+            except (TypeError, ValueError, IndexError):
+                default = self._variable_defaults[name]
+                logger.warning(
+                    "Invalid colour for %s.%s: %r, using %r",
+                    self.name, name, colour, default
+                )
+                setattr(self, name, default)
+
     def finalize(self):
         if hasattr(self, 'layout') and self.layout:
             self.layout.finalize()
@@ -278,10 +303,12 @@ class _Widget(CommandObject, configurable.Configurable):
 
     def timeout_add(self, seconds, method, method_args=()):
         """
-            This method calls either ``.call_later`` with given arguments.
+            This method calls ``.call_later`` on qtile's scheduler with given
+            arguments. Timers of a second or more run on whole seconds of the
+            wall clock, together with the other widgets' timers.
         """
-        return self.qtile.call_later(seconds, self._wrapper, method,
-                                     *method_args)
+        return self.qtile.scheduler.call_later(seconds, self._wrapper, method,
+                                               *method_args)
 
     def call_process(self, command, **kwargs):
         """
@@ -515,16 +542,31 @@ class ThreadPoolText(_TextBox):
     defaults = [
         ("update_interval", 600, "Update interval in seconds, if none, the "
             "widget updates whenever it's done'."),
+        ("executor", "io", "Name of the thread pool to poll in, see the "
+            "``executors`` config variable."),
+        ("poll_timeout", None, "Seconds to wait for a poll before giving up on "
+            "it until the next update, if none, wait for as long as it takes."),
     ]  # type: List[Tuple[str, Any, str]]
 
     def __init__(self, text, **config):
         super().__init__(text, width=bar.CALCULATED, **config)
         self.add_defaults(ThreadPoolText.defaults)
+        # set by the worker thread while poll() runs
+        self._polling = False
 
     def timer_setup(self):
+        if self._polling:
+            # a poll that timed out still holds its worker, don't queue
+            # another one up behind it
+            self.timeout_add(self._retry_delay(), self.timer_setup)
+            return
+
         def on_done(future):
             try:
                 result = future.result()
+            except asyncio.TimeoutError:
+                self.timeout_add(self._retry_delay(), self.timer_setup)
+                return
             except Exception:
                 result = None
                 logger.exception('poll() raised exceptions, not rescheduling')
@@ -543,9 +585,22 @@ class ThreadPoolText(_TextBox):
             else:
                 logger.warning('poll() returned None, not rescheduling')
 
-        future = self.qtile.run_in_executor(self.poll)
+        future = self.qtile.run_in_executor(
+            self._run_poll, executor=self.executor, timeout=self.poll_timeout
+        )
         future.add_done_callback(on_done)
 
+    def _run_poll(self):
+        self._polling = True
+        try:
+            return self.poll()
+        finally:
+            self._polling = False
+
+    def _retry_delay(self):
+        """How long to wait after a poll timed out, before trying again"""
+        return max(self.update_interval or 0, self.poll_timeout)
+
     def update(self, text):
         old_width = self.layout.width
         if self.text == text:
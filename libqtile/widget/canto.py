@@ -36,6 +36,7 @@ class Canto(base.ThreadPoolText):
         ("feeds", [], "List of feeds to display, empty for all"),
         ("one_format", "{name}: {number}", "One feed display format"),
         ("all_format", "{number}", "All feeds display format"),
+        ("executor", "subprocess", "Name of the thread pool to poll in."),
     ]
 
     def __init__(self, **config):
@@ -29,7 +29,10 @@ class CapsNumLockIndicator(base.ThreadPoolText):
     """Really simple widget to show the current Caps/Num Lock state."""
 
     orientations = base.ORIENTATION_HORIZONTAL
-    defaults = [('update_interval', 0.5, 'Update Time in seconds.')]
+    defaults = [
+        ('update_interval', 0.5, 'Update Time in seconds.'),
+        ('executor', 'subprocess', 'Name of the thread pool to poll in.'),
+    ]
 
     def __init__(self, **config):
         base.ThreadPoolText.__init__(self, "", **config)
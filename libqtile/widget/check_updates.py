@@ -37,7 +37,8 @@ class CheckUpdates(base.ThreadPoolText):
         ("colour_no_updates", "ffffff", "Colour when there's no updates."),
         ("colour_have_updates", "ffffff", "Colour when there are updates."),
         ("restart_indicator", "", "Indicator to represent reboot is required. (Ubuntu only)"),
-        ("no_update_string", "", "String to display if no updates available")
+        ("no_update_string", "", "String to display if no updates available"),
+        ("executor", "subprocess", "Name of the thread pool to poll in."),
     ]
 
     def __init__(self, **config):
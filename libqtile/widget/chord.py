@@ -54,11 +54,11 @@ class Chord(base._TextBox):
             if chord_name in self.chords_colors:
                 (self.background, self.foreground) = self.chords_colors.get(chord_name)
 
-            self.bar.draw()
+            self.bar.draw(self)
 
         hook.subscribe.enter_chord(hook_enter_chord)
         hook.subscribe.leave_chord(self.clear)
 
     def clear(self, *args):
         self.text = ""
-        self.bar.draw()
+        self.bar.draw(self)
@@ -57,7 +57,7 @@ class Clipboard(base._TextBox):
 
     def clear(self, *args):
         self.text = ""
-        self.bar.draw()
+        self.bar.draw(self)
 
     def is_blacklisted(self, owner_id):
         if not self.blacklist:
@@ -96,7 +96,7 @@ class Clipboard(base._TextBox):
 
             if self.timeout:
                 self.timeout_id = self.timeout_add(self.timeout, self.clear)
-            self.bar.draw()
+            self.bar.draw(self)
 
         def hook_notify(name, selection):
             if name != self.selection:
@@ -109,7 +109,7 @@ class Clipboard(base._TextBox):
             # only clear if don't change don't apply in .5 seconds
             if self.timeout:
                 self.timeout_id = self.timeout_add(self.timeout, self.clear)
-            self.bar.draw()
+            self.bar.draw(self)
 
         hook.subscribe.selection_notify(hook_notify)
         hook.subscribe.selection_change(hook_change)
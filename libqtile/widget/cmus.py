@@ -37,7 +37,8 @@ class Cmus(base.ThreadPoolText):
         ('play_color', '00ff00', 'Text colour when playing.'),
         ('noplay_color', 'cecece', 'Text colour when not playing.'),
         ('max_chars', 0, 'Maximum number of characters to display in widget.'),
-        ('update_interval', 0.5, 'Update Time in seconds.')
+        ('update_interval', 0.5, 'Update Time in seconds.'),
+        ('executor', 'subprocess', 'Name of the thread pool to poll in.'),
     ]
 
     def __init__(self, **config):
@@ -116,7 +117,7 @@ class Cmus(base.ThreadPoolText):
         if self.layout.width == old_width:
             self.draw()
         else:
-            self.bar.draw()
+            self.bar.draw(self)
 
     def play(self):
         """Play music if stopped, else toggle pause."""
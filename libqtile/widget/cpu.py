@@ -18,12 +18,11 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-import psutil
-
 from libqtile.widget import base
+from libqtile.widget.sampler import SampledText, cpu_percent, sampler
 
 
-class CPU(base.ThreadPoolText):
+class CPU(SampledText):
     orientations = base.ORIENTATION_HORIZONTAL
 
     defaults = [
@@ -35,15 +34,20 @@ class CPU(base.ThreadPoolText):
         ),
     ]
 
+    sources = ("cpu_times", "cpu_freq")
+
     def __init__(self, **config):
-        super().__init__("", **config)
+        super().__init__(**config)
         self.add_defaults(CPU.defaults)
+        self._times = None
 
     def poll(self):
         variables = dict()
 
-        variables["load_percent"] = round(psutil.cpu_percent(), 1)
-        freq = psutil.cpu_freq()
+        times = sampler.get("cpu_times").value
+        variables["load_percent"] = round(cpu_percent(self._times, times), 1)
+        self._times = times
+        freq = sampler.get("cpu_freq").value
         variables["freq_current"] = round(freq.current / 1000, 1)
         variables["freq_max"] = round(freq.max / 1000, 1)
         variables["freq_min"] = round(freq.min / 1000, 1)
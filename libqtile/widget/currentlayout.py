@@ -58,7 +58,7 @@ class CurrentLayout(base._TextBox):
         def hook_response(layout, group):
             if group.screen is not None and group.screen == self.bar.screen:
                 self.text = layout.name
-                self.bar.draw()
+                self.bar.draw(self)
         hook.subscribe.layout_change(hook_response)
 
 
@@ -131,7 +131,7 @@ class CurrentLayoutIcon(base._TextBox):
         def hook_response(layout, group):
             if group.screen is not None and group.screen == self.bar.screen:
                 self.current_layout = layout.name
-                self.bar.draw()
+                self.bar.draw(self)
         hook.subscribe.layout_change(hook_response)
 
     def draw(self):
@@ -62,6 +62,6 @@ class DebugInfo(base._TextBox):
                          % (level, section_index, node_index))
 
         if self.layout.width != old_layout_width:
-            self.bar.draw()
+            self.bar.draw(self)
         else:
             self.draw()
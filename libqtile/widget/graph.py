@@ -33,13 +33,15 @@
 
 import operator
 import time
-from os import statvfs
+from array import array
+from collections import deque
+from typing import Deque, Tuple  # noqa: F401
 
 import cairocffi
-import psutil
 
 from libqtile.log_utils import logger
 from libqtile.widget import base
+from libqtile.widget.sampler import sampler
 
 __all__ = [
     'CPUGraph',
@@ -51,8 +53,57 @@ __all__ = [
 ]
 
 
+class _RingBuffer:
+    """A fixed number of samples, indexed newest first, and their maximum
+
+    The maximum is found from a queue of (sequence number, value) pairs with
+    decreasing values, which takes constant time per sample on average.
+    """
+    def __init__(self, size, value=0):
+        self.size = size
+        self.fill(value)
+
+    def fill(self, value: float) -> None:
+        self._data = array('d', [value]) * self.size
+        self._head = self.size - 1
+        self._seq = self.size
+        self._peaks = deque([(self.size - 1, value)])  # type: Deque[Tuple[int, float]]
+
+    def push(self, value):
+        self._head = (self._head + 1) % self.size
+        self._data[self._head] = value
+        seq = self._seq
+        self._seq += 1
+        while self._peaks and self._peaks[-1][1] <= value:
+            self._peaks.pop()
+        self._peaks.append((seq, value))
+        if self._peaks[0][0] <= seq - self.size:
+            self._peaks.popleft()
+
+    @property
+    def max(self):
+        return self._peaks[0][1]
+
+    def oldest_first(self):
+        return self._data[self._head + 1:] + self._data[:self._head + 1]
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if not -self.size <= index < self.size:
+            raise IndexError("ring buffer index out of range")
+        return self._data[(self._head - index) % self.size]
+
+    def __iter__(self):
+        for index in range(self.size):
+            yield self[index]
+
+
 class _Graph(base._Widget):
     fixed_upper_bound = False
+    # the sampler sources that update_graph reads
+    sources = ()  # type: Tuple
     defaults = [
         ("graph_color", "18BAEB", "Graph color"),
         ("fill_color", "1667EB.3", "Fill color for linefill graph"),
@@ -70,10 +121,14 @@ class _Graph(base._Widget):
     def __init__(self, width=100, **config):
         base._Widget.__init__(self, width, **config)
         self.add_defaults(_Graph.defaults)
-        self.values = [0] * self.samples
+        self.values = _RingBuffer(self.samples)
         self.maxvalue = 0
         self.oldtime = time.time()
         self.lag_cycles = 0
+        self._subscription = None
+        # x coordinates of the samples, for the step they were worked out for
+        self._xs_key = None
+        self._xs = []
 
     def _configure(self, qtile, bar):
         super()._configure(qtile, bar)
@@ -81,7 +136,14 @@ class _Graph(base._Widget):
             self.drawer.ctx.set_antialias(cairocffi.ANTIALIAS_NONE)
 
     def timer_setup(self):
-        self.timeout_add(self.frequency, self.update)
+        self._subscription = sampler.subscribe(
+            self.sources, self.frequency, self.update
+        )
+
+    def finalize(self):
+        if self._subscription is not None:
+            sampler.unsubscribe(self._subscription)
+        base._Widget.finalize(self)
 
     @property
     def graphwidth(self):
@@ -91,22 +153,35 @@ class _Graph(base._Widget):
     def graphheight(self):
         return self.bar.height - self.margin_y * 2 - self.border_width * 2
 
+    def _x_coordinates(self, x, step):
+        key = (x, step, self.samples)
+        if key != self._xs_key:
+            self._xs_key = key
+            self._xs = [x + index * step for index in range(self.samples)]
+        return self._xs
+
+    def _line_path(self, x, y, step, values):
+        xs = self._x_coordinates(x, step)
+        line_to = cairocffi.PATH_LINE_TO
+        return [(line_to, (px, y - val)) for px, val in zip(xs, values)]
+
+    # the values passed to these are already scaled, and negated for graphs
+    # starting at the top
+
     def draw_box(self, x, y, values):
         step = int(self.graphwidth / float(self.samples))
         self.drawer.set_source_rgb(self.graph_color)
-        for val in values:
-            val = self.val(val)
-            self.drawer.fillrect(x, y - val, step, val)
-            x += step
+        ctx = self.drawer.ctx
+        for px, val in zip(self._x_coordinates(x, step), values):
+            ctx.rectangle(px, y - val, step, val)
+        ctx.fill()
 
     def draw_line(self, x, y, values):
         step = int(self.graphwidth / float(self.samples - 1))
         self.drawer.ctx.set_line_join(cairocffi.LINE_JOIN_ROUND)
         self.drawer.set_source_rgb(self.graph_color)
         self.drawer.ctx.set_line_width(self.line_width)
-        for val in values:
-            self.drawer.ctx.line_to(x, y - self.val(val))
-            x += step
+        self.drawer.ctx.append_path(self._line_path(x, y, step, values))
         self.drawer.ctx.stroke()
 
     def draw_linefill(self, x, y, values):
@@ -114,8 +189,7 @@ class _Graph(base._Widget):
         self.drawer.ctx.set_line_join(cairocffi.LINE_JOIN_ROUND)
         self.drawer.set_source_rgb(self.graph_color)
         self.drawer.ctx.set_line_width(self.line_width)
-        for index, val in enumerate(values):
-            self.drawer.ctx.line_to(x + index * step, y - self.val(val))
+        self.drawer.ctx.append_path(self._line_path(x, y, step, values))
         self.drawer.ctx.stroke_preserve()
         self.drawer.ctx.line_to(
             x + (len(values) - 1) * step,
@@ -151,8 +225,10 @@ class _Graph(base._Widget):
             y += self.graphheight
         elif not self.start_pos == 'top':
             raise ValueError("Unknown starting position: %s." % self.start_pos)
-        k = 1.0 / (self.maxvalue or 1)
-        scaled = [self.graphheight * val * k for val in reversed(self.values)]
+        k = self.graphheight / (self.maxvalue or 1)
+        if self.start_pos == 'top':
+            k = -k
+        scaled = [val * k for val in self.values.oldest_first()]
 
         if self.type == "box":
             self.draw_box(x, y, scaled)
@@ -171,24 +247,23 @@ class _Graph(base._Widget):
             # the graph samples limit
             self.lag_cycles = 1
 
-        self.values = ([value] * min(self.samples, self.lag_cycles)) + self.values
-        self.values = self.values[:self.samples]
+        for _ in range(max(self.lag_cycles, 1)):
+            self.values.push(value)
 
         if not self.fixed_upper_bound:
-            self.maxvalue = max(self.values)
+            self.maxvalue = self.values.max
         self.draw()
 
     def update(self):
-        # lag detection
+        # lag detection, where the sampler may call us a little early
         newtime = time.time()
-        self.lag_cycles = int((newtime - self.oldtime) / self.frequency)
+        self.lag_cycles = round((newtime - self.oldtime) / self.frequency)
         self.oldtime = newtime
 
         self.update_graph()
-        self.timeout_add(self.frequency, self.update)
 
     def fulfill(self, value):
-        self.values = [value] * len(self.values)
+        self.values.fill(value)
 
 
 class CPUGraph(_Graph):
@@ -204,16 +279,25 @@ class CPUGraph(_Graph):
         _Graph.__init__(self, **config)
         self.add_defaults(CPUGraph.defaults)
         self.maxvalue = 100
+        if isinstance(self.core, int):
+            self.sources = ("cpu_times_percpu",)
+        else:
+            self.sources = ("cpu_times",)
+        self.oldvalues = None
+
+    def timer_setup(self):
         self.oldvalues = self._getvalues()
+        _Graph.timer_setup(self)
 
     def _getvalues(self):
 
         if isinstance(self.core, int):
-            if self.core > psutil.cpu_count() - 1:
+            cpus = sampler.get("cpu_times_percpu").value
+            if self.core > len(cpus) - 1:
                 raise ValueError("No such core: {}".format(self.core))
-            cpu = psutil.cpu_times(percpu=True)[self.core]
+            cpu = cpus[self.core]
         else:
-            cpu = psutil.cpu_times()
+            cpu = sampler.get("cpu_times").value
 
         user = cpu.user * 100
         nice = cpu.nice * 100
@@ -243,18 +327,19 @@ class MemoryGraph(_Graph):
     """Displays a memory usage graph"""
     orientations = base.ORIENTATION_HORIZONTAL
     fixed_upper_bound = True
+    sources = ("virtual_memory",)
 
-    def __init__(self, **config):
-        _Graph.__init__(self, **config)
+    def timer_setup(self):
         val = self._getvalues()
         self.maxvalue = val['MemTotal']
 
         mem = val['MemTotal'] - val['MemFree'] - val['Buffers'] - val['Cached']
         self.fulfill(mem)
+        _Graph.timer_setup(self)
 
     def _getvalues(self):
         val = {}
-        mem = psutil.virtual_memory()
+        mem = sampler.get("virtual_memory").value
         val['MemTotal'] = int(mem.total / 1024 / 1024)
         val['MemFree'] = int(mem.free / 1024 / 1024)
         val['Buffers'] = int(mem.buffers / 1024 / 1024)
@@ -272,17 +357,18 @@ class SwapGraph(_Graph):
     """Display a swap info graph"""
     orientations = base.ORIENTATION_HORIZONTAL
     fixed_upper_bound = True
+    sources = ("swap_memory",)
 
-    def __init__(self, **config):
-        _Graph.__init__(self, **config)
+    def timer_setup(self):
         val = self._getvalues()
         self.maxvalue = val['SwapTotal']
         swap = val['SwapTotal'] - val['SwapFree']
         self.fulfill(swap)
+        _Graph.timer_setup(self)
 
     def _getvalues(self):
         val = {}
-        swap = psutil.swap_memory()
+        swap = sampler.get("swap_memory").value
         val['SwapTotal'] = int(swap.total / 1024 / 1024)
         val['SwapFree'] = int(swap.free / 1024 / 1024)
         return val
@@ -310,10 +396,16 @@ class NetGraph(_Graph):
         ),
         ("bandwidth_type", "down", "down(load)/up(load)"),
     ]
+    sources = ("net_io_counters",)
 
     def __init__(self, **config):
         _Graph.__init__(self, **config)
         self.add_defaults(NetGraph.defaults)
+        if self.bandwidth_type != "down" and self.bandwidth_type != "up":
+            raise ValueError("bandwidth type {} not known!".format(self.bandwidth_type))
+        self.bytes = 0
+
+    def timer_setup(self):
         if self.interface == "auto":
             try:
                 self.interface = self.get_main_iface()
@@ -323,13 +415,11 @@ class NetGraph(_Graph):
                     "falling back to 'eth0'"
                 )
                 self.interface = "eth0"
-        if self.bandwidth_type != "down" and self.bandwidth_type != "up":
-            raise ValueError("bandwidth type {} not known!".format(self.bandwidth_type))
-        self.bytes = 0
         self.bytes = self._get_values()
+        _Graph.timer_setup(self)
 
     def _get_values(self):
-        net = psutil.net_io_counters(pernic=True)
+        net = sampler.get("net_io_counters").value
         if self.bandwidth_type == "up":
             return net[self.interface].bytes_sent
         if self.bandwidth_type == "down":
@@ -351,7 +441,7 @@ class NetGraph(_Graph):
         #
         # Oh. and there is probably a better way to do this.
 
-        net = psutil.net_io_counters(pernic=True)
+        net = sampler.get("net_io_counters").value
         iface = {}
         for entry in net:
             iface[entry] = net[entry].bytes_recv
@@ -370,13 +460,17 @@ class HDDGraph(_Graph):
     def __init__(self, **config):
         _Graph.__init__(self, **config)
         self.add_defaults(HDDGraph.defaults)
-        stats = statvfs(self.path)
+        self.sources = (("statvfs", self.path),)
+
+    def timer_setup(self):
+        stats = sampler.get(self.sources[0]).value
         self.maxvalue = stats.f_blocks * stats.f_frsize
         values = self._get_values()
         self.fulfill(values)
+        _Graph.timer_setup(self)
 
     def _get_values(self):
-        stats = statvfs(self.path)
+        stats = sampler.get(self.sources[0]).value
         if self.space_type == 'used':
             return (stats.f_blocks - stats.f_bfree) * stats.f_frsize
         else:
@@ -405,14 +499,12 @@ class HDDBusyGraph(_Graph):
         self.path = '/sys/block/{dev}/stat'.format(
             dev=self.device
         )
+        self.sources = (("io_ticks", self.device),)
         self._prev = 0
 
     def _get_values(self):
-        try:
-            # io_ticks is field number 9
-            with open(self.path) as f:
-                io_ticks = int(f.read().split()[9])
-        except IOError:
+        io_ticks = sampler.get(self.sources[0]).value
+        if io_ticks is None:
             return 0
         activity = io_ticks - self._prev
         self._prev = io_ticks
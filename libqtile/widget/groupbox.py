@@ -76,7 +76,7 @@ class _GroupBase(base._TextBox, base.PaddingMixin, base.MarginMixin):
 
     def setup_hooks(self):
         def hook_response(*args, **kwargs):
-            self.bar.draw()
+            self.bar.draw(self)
         hook.subscribe.client_managed(hook_response)
         hook.subscribe.client_urgent_hint_changed(hook_response)
         hook.subscribe.client_killed(hook_response)
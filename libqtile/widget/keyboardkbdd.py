@@ -19,14 +19,17 @@
 # SOFTWARE.
 
 
+import asyncio
 import re
 
-import dbus
-from dbus.mainloop.glib import DBusGMainLoop
-
 from libqtile.log_utils import logger
+from libqtile.utils import add_signal_receiver, has_dbus_next
 from libqtile.widget import base
 
+if not has_dbus_next:
+    import dbus
+    from dbus.mainloop.glib import DBusGMainLoop
+
 
 class KeyboardKbdd(base.ThreadPoolText):
     """Widget for changing keyboard layouts per window, using kbdd
@@ -54,7 +57,20 @@ class KeyboardKbdd(base.ThreadPoolText):
         if not self.is_kbdd_running:
             logger.error('Please check if kbdd is running')
             self.keyboard = "N/A"
-        self._dbus_init()
+        self.dbus_connected = False
+        if not has_dbus_next:
+            self._dbus_init()
+            self.dbus_connected = True
+
+    def _configure(self, qtile, bar):
+        base.ThreadPoolText._configure(self, qtile, bar)
+        if not self.dbus_connected:
+            # dbus-next needs the event loop, which is running by now
+            asyncio.ensure_future(add_signal_receiver(
+                self._layout_changed, session_bus=True,
+                signal_name='layoutChanged', dbus_interface='ru.gentoo.kbdd'
+            ))
+            self.dbus_connected = True
 
     def _check_kbdd(self):
         running_list = self.call_process(["ps", "axw"])
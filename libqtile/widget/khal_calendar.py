@@ -69,6 +69,7 @@ class KhalCalendar(base.ThreadPoolText):
         ('foreground', 'FFFF33', 'default foreground color'),
         ('remindertime', 10, 'reminder time in minutes'),
         ('lookahead', 7, 'days to look ahead in the calendar'),
+        ('executor', 'subprocess', 'Name of the thread pool to poll in.'),
     ]
 
     def __init__(self, **config):
@@ -18,14 +18,13 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
-import psutil
-
 from libqtile.widget import base
+from libqtile.widget.sampler import SampledText, sampler
 
 __all__ = ["Memory"]
 
 
-class Memory(base.ThreadPoolText):
+class Memory(SampledText):
     """Displays memory/swap usage
 
     MemUsed: Returns memory in use
@@ -53,17 +52,15 @@ class Memory(base.ThreadPoolText):
         ("update_interval", 1.0, "Update interval for the Memory"),
     ]
 
+    sources = ("virtual_memory", "swap_memory")
+
     def __init__(self, **config):
-        super().__init__("", **config)
+        super().__init__(**config)
         self.add_defaults(Memory.defaults)
 
-    def tick(self):
-        self.update(self.poll())
-        return self.update_interval
-
     def poll(self):
-        mem = psutil.virtual_memory()
-        swap = psutil.swap_memory()
+        mem = sampler.get("virtual_memory").value
+        swap = sampler.get("swap_memory").value
         val = {}
         val["MemUsed"] = mem.used // 1024 // 1024
         val["MemTotal"] = mem.total // 1024 // 1024
@@ -21,11 +21,28 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-import dbus
-from dbus.mainloop.glib import DBusGMainLoop
+import asyncio
 
+from libqtile.utils import add_signal_receiver, has_dbus_next
 from libqtile.widget import base
 
+if has_dbus_next:
+    from dbus_next import Variant
+else:
+    import dbus
+    from dbus.mainloop.glib import DBusGMainLoop
+
+
+def _unwrap(value):
+    """Replace the dbus-next Variants in a property value with their values"""
+    if has_dbus_next and isinstance(value, Variant):
+        return _unwrap(value.value)
+    if isinstance(value, dict):
+        return {k: _unwrap(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_unwrap(v) for v in value]
+    return value
+
 
 class Mpris2(base._TextBox):
     """An MPRIS 2 widget
@@ -69,13 +86,23 @@ class Mpris2(base._TextBox):
         self.scroll_timer = None
         self.scroll_counter = None
         self.dbus_loop = None
+        self.dbus_connected = False
 
     def _configure(self, qtile, bar):
         base._TextBox._configure(self, qtile, bar)
 
         # we don't need to reconnect all the dbus stuff if we already
         # connected it.
-        if self.dbus_loop is not None:
+        if self.dbus_connected:
+            return
+        self.dbus_connected = True
+
+        if has_dbus_next:
+            asyncio.ensure_future(add_signal_receiver(
+                self.update, session_bus=True, signal_name='PropertiesChanged',
+                dbus_interface='org.freedesktop.DBus.Properties',
+                bus_name=self.objname, path='/org/mpris/MediaPlayer2'
+            ))
             return
 
         # we need a main loop to get event signals
@@ -94,14 +121,15 @@ class Mpris2(base._TextBox):
             return True
         olddisplaytext = self.displaytext
         self.displaytext = ''
+        changed_properties = _unwrap(changed_properties)
 
         metadata = changed_properties.get('Metadata')
         if metadata:
             self.is_playing = True
             self.displaytext = ' - '.join([
                 metadata.get(x)
-                if isinstance(metadata.get(x), dbus.String)
-                else ' + '.join(y for y in metadata.get(x) if isinstance(y, dbus.String))
+                if isinstance(metadata.get(x), str)
+                else ' + '.join(y for y in metadata.get(x) if isinstance(y, str))
                 for x in self.display_metadata if metadata.get(x)
             ])
             self.displaytext.replace('\n', '')
@@ -140,12 +168,12 @@ class Mpris2(base._TextBox):
             return
         if self.text != self.displaytext:
             self.text = self.displaytext
-            self.bar.draw()
+            self.bar.draw(self)
 
     def scroll_text(self):
         if self.text != self.scrolltext[:self.scroll_chars]:
             self.text = self.scrolltext[:self.scroll_chars]
-            self.bar.draw()
+            self.bar.draw(self)
         if self.scroll_counter:
             self.scroll_counter -= 1
             if self.scroll_counter:
@@ -158,7 +186,7 @@ class Mpris2(base._TextBox):
             self.timeout_add(self.scroll_interval, self.scroll_text)
             return
         self.text = ''
-        self.bar.draw()
+        self.bar.draw(self)
 
     def cmd_info(self):
         """What's the current state of the widget?"""
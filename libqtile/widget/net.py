@@ -20,13 +20,12 @@
 from math import log
 from typing import Tuple
 
-import psutil
-
 from libqtile.log_utils import logger
 from libqtile.widget import base
+from libqtile.widget.sampler import SampledText, sampler
 
 
-class Net(base.ThreadPoolText):
+class Net(SampledText):
     """
     Displays interface down and up speed
 
@@ -45,8 +44,10 @@ class Net(base.ThreadPoolText):
         ('use_bits', False, 'Use bits instead of bytes per second?'),
     ]
 
+    sources = ("net_io_counters",)
+
     def __init__(self, **config):
-        base.ThreadPoolText.__init__(self, "", **config)
+        SampledText.__init__(self, **config)
         self.add_defaults(Net.defaults)
         if not isinstance(self.interface, list):
             if self.interface is None:
@@ -55,7 +56,13 @@ class Net(base.ThreadPoolText):
                 self.interface = [self.interface]
             else:
                 raise AttributeError("Invalid Argument passed: %s\nAllowed Types: List, String, None" % self.interface)
+        self.stats = None
+        self.stats_time = None
+
+    def timer_setup(self):
         self.stats = self.get_stats()
+        self.stats_time = sampler.get("net_io_counters").time
+        SampledText.timer_setup(self)
 
     def convert_b(self, num_bytes: float) -> Tuple[float, str]:
         """Converts the number of bytes to the correct unit"""
@@ -80,12 +87,14 @@ class Net(base.ThreadPoolText):
 
     def get_stats(self):
         interfaces = {}
+        net = sampler.get("net_io_counters").value
         if self.interface == ["all"]:
-            net = psutil.net_io_counters(pernic=False)
-            interfaces["all"] = {'down': net[1], 'up': net[0]}
+            interfaces["all"] = {
+                'down': sum(nic.bytes_recv for nic in net.values()),
+                'up': sum(nic.bytes_sent for nic in net.values()),
+            }
             return interfaces
         else:
-            net = psutil.net_io_counters(pernic=True)
             for iface in net:
                 down = net[iface].bytes_recv
                 up = net[iface].bytes_sent
@@ -102,6 +111,10 @@ class Net(base.ThreadPoolText):
     def poll(self):
         ret_stat = []
         try:
+            new_time = sampler.get("net_io_counters").time
+            # the first poll sees the same sample, so there's nothing to divide
+            interval = (new_time - self.stats_time) or 1
+            self.stats_time = new_time
             for intf in self.interface:
                 new_stats = self.get_stats()
                 down = new_stats[intf]['down'] - \
@@ -109,8 +122,8 @@ class Net(base.ThreadPoolText):
                 up = new_stats[intf]['up'] - \
                     self.stats[intf]['up']
 
-                down = down / self.update_interval
-                up = up / self.update_interval
+                down = down / interval
+                up = up / interval
                 down, down_letter = self.convert_b(down)
                 up, up_letter = self.convert_b(up)
                 down, up = self._format(down, down_letter, up, up_letter)
@@ -50,7 +50,7 @@ class Notify(base._TextBox):
     def __init__(self, width=bar.CALCULATED, **config):
         base._TextBox.__init__(self, "", width, **config)
         self.add_defaults(Notify.defaults)
-        notifier.register(self.update)
+        notifier.register(self.update, on_close=self.closed)
         self.current_id = 0
 
         self.add_callbacks({
@@ -93,31 +93,48 @@ class Notify(base._TextBox):
 
     def real_update(self, notif):
         self.set_notif_text(notif)
-        self.current_id = notif.id - 1
-        if notif.timeout and notif.timeout > 0:
-            self.timeout_add(notif.timeout / 1000, self.clear)
-        elif self.default_timeout:
+        self.current_id = notif.id
+        # notifications with their own timeout are cleared when they close
+        if not (notif.timeout and notif.timeout > 0) and self.default_timeout:
             self.timeout_add(self.default_timeout, self.clear)
-        self.bar.draw()
+        self.bar.draw(self)
         return True
 
+    def closed(self, notif):
+        if notif.id == self.current_id and self.text:
+            self.clear()
+
     def display(self):
-        self.set_notif_text(notifier.notifications[self.current_id])
-        self.bar.draw()
+        notif = notifier.get(self.current_id)
+        if notif is not None:
+            self.set_notif_text(notif)
+            self.bar.draw(self)
 
     def clear(self):
         self.text = ''
-        self.current_id = len(notifier.notifications) - 1
-        self.bar.draw()
+        if notifier.notifications:
+            self.current_id = notifier.notifications[-1].id
+        self.bar.draw(self)
+
+    def _step(self, step):
+        ids = [notif.id for notif in notifier.notifications]
+        if not ids:
+            return False
+        if self.current_id in ids:
+            index = ids.index(self.current_id) + step
+        else:
+            index = len(ids) - 1
+        if not 0 <= index < len(ids):
+            return False
+        self.current_id = ids[index]
+        return True
 
     def prev(self):
-        if self.current_id > 0:
-            self.current_id -= 1
+        self._step(-1)
         self.display()
 
     def next(self):
-        if self.current_id < len(notifier.notifications) - 1:
-            self.current_id += 1
+        if self._step(1):
             self.display()
 
     def cmd_display(self):
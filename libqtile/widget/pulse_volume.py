@@ -239,7 +239,7 @@ class PulseVolume(Volume):
             # Update the underlying canvas size before actually attempting
             # to figure out how big it is and draw it.
             self._update_drawer()
-            self.bar.draw()
+            self.bar.draw(self)
 
     def get_volume(self):
         if self.default_sink:
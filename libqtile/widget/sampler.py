@@ -0,0 +1,198 @@
+"""
+A shared sampler for the system metrics that widgets display
+
+Widgets subscribe to sources, such as "cpu_times" or ("statvfs", "/"), with
+the interval they want to update at. The sampler ticks at the shortest
+interval asked for, reads each source that a due subscriber needs once, and
+then calls those subscribers, which find the sample with `Sampler.get`. Every
+widget showing a source so sees the same readings, however many bars they're
+on, and the cost of reading stays the same.
+"""
+import os
+import time
+from collections import deque, namedtuple
+from functools import partial
+from typing import Any, Callable, Deque, Dict, List, Optional, Set  # noqa: F401
+
+import psutil
+
+import libqtile
+from libqtile.log_utils import logger
+from libqtile.widget import base
+
+__all__ = ["Sample", "Sampler", "SampledText", "sampler", "cpu_percent"]
+
+# how many samples of each source are kept
+HISTORY_LENGTH = 16
+
+Sample = namedtuple("Sample", "time value")
+
+
+def _read_io_ticks(device):
+    try:
+        # io_ticks is field number 9
+        with open("/sys/block/{}/stat".format(device)) as f:
+            return int(f.read().split()[9])
+    except IOError:
+        return None
+
+
+READERS = {
+    "cpu_times": psutil.cpu_times,
+    "cpu_times_percpu": partial(psutil.cpu_times, percpu=True),
+    "cpu_freq": psutil.cpu_freq,
+    "virtual_memory": psutil.virtual_memory,
+    "swap_memory": psutil.swap_memory,
+    "net_io_counters": partial(psutil.net_io_counters, pernic=True),
+    # these take an argument: ("statvfs", path) and ("io_ticks", device)
+    "statvfs": os.statvfs,
+    "io_ticks": _read_io_ticks,
+}  # type: Dict[str, Callable]
+
+
+def cpu_percent(old, new):
+    """The percentage of time a CPU was busy between two cpu_times samples"""
+    if old is None:
+        return 0.0
+    # as psutil.cpu_percent, where guest time is included in user time
+    total_old = sum(old) - getattr(old, "guest", 0) - getattr(old, "guest_nice", 0)
+    total_new = sum(new) - getattr(new, "guest", 0) - getattr(new, "guest_nice", 0)
+    idle_old = old.idle + getattr(old, "iowait", 0)
+    idle_new = new.idle + getattr(new, "iowait", 0)
+    total = total_new - total_old
+    if total <= 0:
+        return 0.0
+    busy = total - (idle_new - idle_old)
+    return min(max(busy * 100 / total, 0.0), 100.0)
+
+
+class _Subscription:
+    def __init__(self, sources, interval, callback):
+        self.sources = sources
+        self.interval = interval
+        self.callback = callback
+        self.due = 0.0
+
+
+class Sampler:
+    """Reads metric sources on behalf of all the widgets that show them"""
+    def __init__(self) -> None:
+        self._subscriptions = []  # type: List[_Subscription]
+        self._history = {}  # type: Dict[Any, Deque[Sample]]
+        self._period = None  # type: Optional[float]
+        self._timer = None
+
+    def subscribe(self, sources, interval, callback):
+        """Call callback every interval seconds, after sampling sources
+
+        Returns a handle for `unsubscribe`. This must be called from the event
+        loop.
+        """
+        subscription = _Subscription(tuple(sources), interval, callback)
+        subscription.due = time.monotonic() + interval
+        self._subscriptions.append(subscription)
+        self._reschedule()
+        return subscription
+
+    def unsubscribe(self, subscription: _Subscription) -> None:
+        if subscription not in self._subscriptions:
+            return
+        self._subscriptions.remove(subscription)
+        wanted = set()  # type: Set[Any]
+        for sub in self._subscriptions:
+            wanted.update(sub.sources)
+        for source in list(self._history):
+            if source not in wanted:
+                del self._history[source]
+        self._reschedule()
+
+    def get(self, source):
+        """The latest sample of source, which is read now if it hasn't been yet"""
+        history = self._history.get(source)
+        if not history:
+            self._sample(source, time.monotonic())
+            history = self._history[source]
+        return history[-1]
+
+    def history(self, source):
+        """The recent samples of source, oldest first"""
+        return list(self._history.get(source, ()))
+
+    def _sample(self, source, now):
+        if isinstance(source, tuple):
+            value = READERS[source[0]](*source[1:])
+        else:
+            value = READERS[source]()
+        history = self._history.get(source)
+        if history is None:
+            history = self._history[source] = deque(maxlen=HISTORY_LENGTH)
+        history.append(Sample(now, value))
+
+    def _reschedule(self):
+        period = min((sub.interval for sub in self._subscriptions), default=None)
+        if period == self._period:
+            return
+        self._period = period
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if period is not None:
+            self._timer = libqtile.qtile.scheduler.call_later(period, self._tick)
+
+    def _tick(self):
+        self._timer = None
+        now = time.monotonic()
+        # subscribers whose interval doesn't divide the period are called a
+        # little early rather than a whole period late
+        slack = self._period / 10
+        due = [sub for sub in self._subscriptions if sub.due - slack <= now]
+
+        failed = set()
+        for source in {source for sub in due for source in sub.sources}:
+            try:
+                self._sample(source, now)
+            except Exception:
+                logger.exception("Failed to sample %s", source)
+                failed.add(source)
+
+        for sub in due:
+            sub.due = now + sub.interval
+            if failed.intersection(sub.sources):
+                continue
+            try:
+                sub.callback()
+            except Exception:
+                logger.exception("got exception from sampler subscriber")
+
+        # a subscriber may have changed the period, and so the timer, already
+        if self._timer is None and self._period is not None:
+            self._timer = libqtile.qtile.scheduler.call_later(self._period, self._tick)
+
+
+sampler = Sampler()
+
+
+class SampledText(base.InLoopPollText):
+    """A text widget showing metrics from the shared sampler
+
+    Subclasses list the sources they need in ``sources``, and their poll
+    method reads them from the sampler.
+    """
+    sources = ()  # type: tuple
+
+    def __init__(self, **config):
+        base.InLoopPollText.__init__(self, "", **config)
+        self._subscription = None
+
+    def timer_setup(self):
+        self.tick()
+        # as for any InLoopPollText, no update_interval means no polling
+        if self.update_interval is not None:
+            self._subscription = sampler.subscribe(
+                self.sources, self.update_interval, self.tick
+            )
+
+    def finalize(self):
+        if self._subscription is not None:
+            sampler.unsubscribe(self._subscription)
+        base.InLoopPollText.finalize(self)
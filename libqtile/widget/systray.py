@@ -78,7 +78,7 @@ class Icon(window._Window):
         if name == "_XEMBED_INFO":
             info = self.window.get_property('_XEMBED_INFO', unpack=int)
             if info and info[1]:
-                self.systray.bar.draw()
+                self.systray.bar.draw(self.systray)
 
         return False
 
@@ -173,11 +173,11 @@ class Systray(window._Window, base._Widget):
             info = icon.window.get_property('_XEMBED_INFO', unpack=int)
 
             if not info:
-                self.bar.draw()
+                self.bar.draw(self)
                 return False
 
             if info[1]:
-                self.bar.draw()
+                self.bar.draw(self)
 
         return False
 
@@ -302,7 +302,7 @@ class TaskList(base._Widget, base.PaddingMixin, base.MarginMixin):
 
     def update(self, window=None):
         if not window or window in self.windows:
-            self.bar.draw()
+            self.bar.draw(self)
 
     def remove_icon_cache(self, window):
         wid = window.window.wid
@@ -381,18 +381,15 @@ class TaskList(base._Widget, base.PaddingMixin, base.MarginMixin):
                 window.toggle_minimize()
 
     def get_window_icon(self, window):
-        if not window.icons:
-            return None
-
         cache = self._icons_cache.get(window.window.wid)
         if cache:
             return cache
 
-        icons = sorted(
-            iter(window.icons.items()),
-            key=lambda x: abs(self.icon_size - int(x[0].split("x")[0]))
-        )
-        icon = icons[0]
+        icons = window.get_icons(self.icon_size)
+        if not icons:
+            return None
+
+        icon = next(iter(icons.items()))
         width, height = map(int, icon[0].split("x"))
 
         img = cairocffi.ImageSurface.create_for_data(
@@ -45,7 +45,7 @@ class TextBox(base._TextBox):
 
     def update(self, text):
         self.text = text
-        self.bar.draw()
+        self.bar.draw(self)
 
     def cmd_update(self, text):
         """Update the text in a TextBox widget"""
@@ -111,7 +111,7 @@ class Volume(base._TextBox):
             # Update the underlying canvas size before actually attempting
             # to figure out how big it is and draw it.
             self._update_drawer()
-            self.bar.draw()
+            self.bar.draw(self)
         self.timeout_add(self.update_interval, self.update)
 
     def _update_drawer(self):
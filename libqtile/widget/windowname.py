@@ -67,4 +67,4 @@ class WindowName(base._TextBox):
                 state = 'V '
         unescaped = "%s%s" % (state, w.name if w and w.name else self.empty_group_string)
         self.text = pangocffi.markup_escape_text(unescaped)
-        self.bar.draw()
+        self.bar.draw(self)
@@ -17,7 +17,6 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
-import array
 import contextlib
 import inspect
 import traceback
@@ -93,6 +92,18 @@ _NET_WM_STATE_REMOVE = 0
 _NET_WM_STATE_ADD = 1
 _NET_WM_STATE_TOGGLE = 2
 
+# Properties that are set by clients and only ever read by us, so their values
+# can be cached on the client until a PropertyNotify tells us they changed.
+# Maps the property name to the xcbq.Window getter used to read it.
+CACHED_PROPERTIES = {
+    "WM_CLASS": "get_wm_class",
+    "WM_WINDOW_ROLE": "get_wm_window_role",
+    "WM_PROTOCOLS": "get_wm_protocols",
+    "WM_TRANSIENT_FOR": "get_wm_transient_for",
+    "_NET_WM_WINDOW_TYPE": "get_wm_type",
+    "_NET_WM_PID": "get_net_wm_pid",
+}
+
 
 def _geometry_getter(attr):
     def get_attr(self):
@@ -145,7 +156,7 @@ class _Window(CommandObject):
         self.window, self.qtile = window, qtile
         self.hidden = True
         self.group = None
-        self.icons = {}
+        self._property_cache = {}
         window.set_attribute(eventmask=self._window_mask)
 
         self._float_info = {
@@ -172,6 +183,10 @@ class _Window(CommandObject):
 
         self.borderwidth = 0
         self.bordercolor = None
+        # what was last sent to the X server by place() and paint_borders()
+        self._placed = None
+        self._painted_borderwidth = None
+        self._painted_bordercolor = None
         self.name = "<no name>"
         self.strut = None
         self.state = NormalState
@@ -243,6 +258,36 @@ class _Window(CommandObject):
             pass
         return False
 
+    def _get_cached_property(self, name):
+        try:
+            return self._property_cache[name]
+        except KeyError:
+            value = getattr(self.window, CACHED_PROPERTIES[name])()
+            self._property_cache[name] = value
+            return value
+
+    def invalidate_property(self, name):
+        """Forget the cached value of a property after it has changed"""
+        self._property_cache.pop(name, None)
+
+    def get_wm_class(self):
+        return self._get_cached_property("WM_CLASS")
+
+    def get_wm_window_role(self):
+        return self._get_cached_property("WM_WINDOW_ROLE")
+
+    def get_wm_protocols(self):
+        return self._get_cached_property("WM_PROTOCOLS")
+
+    def get_wm_transient_for(self):
+        return self._get_cached_property("WM_TRANSIENT_FOR")
+
+    def get_wm_type(self):
+        return self._get_cached_property("_NET_WM_WINDOW_TYPE")
+
+    def get_net_wm_pid(self):
+        return self._get_cached_property("_NET_WM_PID")
+
     def update_name(self):
         try:
             self.name = self.window.get_name()
@@ -280,6 +325,7 @@ class _Window(CommandObject):
         #                  'IconPixmapHint']),
         # }
 
+        size_changed = False
         if normh:
             normh['min_width'] = max(0, normh.get('min_width', 0))
             normh['min_height'] = max(0, normh.get('min_height', 0))
@@ -297,10 +343,15 @@ class _Window(CommandObject):
                 normh['base_height'] = (
                     normh['min_height'] % normh['height_inc']
                 )
+            size_changed = any(
+                self.hints.get(k) != v for k, v in normh.items()
+            )
             self.hints.update(normh)
 
+        # urgency and input only matter to hooks and focus handling, so only
+        # a change in the size hints requires the group to be laid out again
         if h and 'UrgencyHint' in h['flags']:
-            if self.qtile.current_window != self:
+            if self.qtile.current_window != self and not self.hints['urgent']:
                 self.hints['urgent'] = True
                 hook.fire('client_urgent_hint_changed', self)
         elif self.urgent:
@@ -310,7 +361,7 @@ class _Window(CommandObject):
         if h and 'InputHint' in h['flags']:
             self.hints['input'] = h['input']
 
-        if getattr(self, 'group', None):
+        if size_changed and getattr(self, 'group', None):
             self.group.layout_all()
 
         return
@@ -389,7 +440,7 @@ class _Window(CommandObject):
     opacity = property(get_opacity, set_opacity)
 
     def kill(self):
-        if "WM_DELETE_WINDOW" in self.window.get_wm_protocols():
+        if "WM_DELETE_WINDOW" in self.get_wm_protocols():
             data = [
                 self.qtile.conn.atoms["WM_DELETE_WINDOW"],
                 xcffib.xproto.Time.CurrentTime,
@@ -441,10 +492,13 @@ class _Window(CommandObject):
         )
 
     def place(self, x, y, width, height, borderwidth, bordercolor,
-              above=False, margin=None):
+              above=False, margin=None, notify=False):
         """
         Places the window at the specified location with the given size.
 
+        Only what changed since the last call is sent to the X server, so
+        placing a window where it already is costs nothing.
+
         Parameters
         ==========
         x : int
@@ -456,22 +510,11 @@ class _Window(CommandObject):
         above : bool, optional
         margin : int or list, optional
             space around window as int or list of ints [N E S W]
+        notify : bool, optional
+            always send the client a synthetic ConfigureNotify, e.g. when
+            answering its ConfigureRequest
         """
 
-        # TODO: self.x/y/height/width are updated BEFORE
-        # place is called, so there's no way to know if only
-        # the position is changed, so we are sending
-        # the ConfigureNotify every time place is called
-        #
-        # # if position change and size don't
-        # # send a configure notify. See ICCCM 4.2.3
-        # send_notify = False
-        # if (self.x != x or self.y != y) and \
-        #    (self.width == width and self.height == height):
-        #       send_notify = True
-        # #for now, we just:
-        send_notify = True
-
         # Adjust the placement to account for layout margins, if there are any.
         if margin is not None:
             if isinstance(margin, int):
@@ -491,26 +534,43 @@ class _Window(CommandObject):
         self.width = width
         self.height = height
 
-        kwarg = dict(
-            x=x,
-            y=y,
-            width=width,
-            height=height,
-        )
+        # self.x/y/width/height are often updated before place is called, so
+        # compare against what was last sent to the server instead
+        first_place = self._placed is None
+        if first_place:
+            moved = resized = True
+        else:
+            moved = self._placed[:2] != (x, y)
+            resized = self._placed[2:] != (width, height)
+
+        kwarg = {}
+        if moved or resized:
+            kwarg.update(x=x, y=y, width=width, height=height)
+            self._placed = (x, y, width, height)
         if above:
             kwarg['stackmode'] = StackMode.Above
+        if kwarg:
+            self.window.configure(**kwarg)
 
-        self.window.configure(**kwarg)
         self.paint_borders(bordercolor, borderwidth)
 
-        if send_notify:
+        # The server sends a real ConfigureNotify whenever the size changes.
+        # Clients must also be told about moves without a resize and about
+        # ConfigureRequests we did not act on (see ICCCM 4.1.5 and 4.2.3).
+        # We don't know what the client saw before our first placement, so
+        # tell it then too.
+        if notify or first_place or (moved and not resized):
             self.send_configure_notify(x, y, width, height)
 
     def paint_borders(self, borderpixel, borderwidth):
         self.borderwidth = borderwidth
         self.bordercolor = borderpixel
-        self.window.configure(borderwidth=borderwidth)
-        self.window.paint_borders(borderpixel)
+        if borderwidth != self._painted_borderwidth:
+            self.window.configure(borderwidth=borderwidth)
+            self._painted_borderwidth = borderwidth
+        if borderpixel and borderpixel != self._painted_bordercolor:
+            self.window.paint_borders(borderpixel)
+            self._painted_bordercolor = borderpixel
 
     def send_configure_notify(self, x, y, width, height):
         """Send a synthetic ConfigureNotify"""
@@ -534,7 +594,7 @@ class _Window(CommandObject):
         self.window.send_event(event, mask=EventMask.StructureNotify)
 
     def can_steal_focus(self):
-        return self.window.get_wm_type() != 'notification'
+        return self.get_wm_type() != 'notification'
 
     def _do_focus(self):
         """
@@ -553,7 +613,7 @@ class _Window(CommandObject):
             return True
 
         # does the window want us to ask it about focus?
-        if "WM_TAKE_FOCUS" in self.window.get_wm_protocols():
+        if "WM_TAKE_FOCUS" in self.get_wm_protocols():
             data = [
                 self.qtile.conn.atoms["WM_TAKE_FOCUS"],
                 # The timestamp here must be a valid timestamp, not CurrentTime.
@@ -750,7 +810,8 @@ class Static(_Window):
             self.width,
             self.height,
             self.borderwidth,
-            self.bordercolor
+            self.bordercolor,
+            notify=True,
         )
         return False
 
@@ -769,6 +830,7 @@ class Static(_Window):
 
     def handle_PropertyNotify(self, e):  # noqa: N802
         name = self.qtile.conn.atoms.get_name(e.atom)
+        self.invalidate_property(name)
         if name in ("_NET_WM_STRUT_PARTIAL", "_NET_WM_STRUT"):
             self.update_strut()
 
@@ -787,6 +849,7 @@ class Window(_Window):
     def __init__(self, window, qtile):
         _Window.__init__(self, window, qtile)
         self._group = None
+        self._icons = {}
         self.update_name()
         # add to group by position according to _NET_WM_DESKTOP property
         group = None
@@ -794,7 +857,7 @@ class Window(_Window):
         if index is not None and index < len(qtile.groups):
             group = qtile.groups[index]
         elif index is None:
-            transient_for = window.get_wm_transient_for()
+            transient_for = self.get_wm_transient_for()
             win = qtile.windows_map.get(transient_for)
             if win is not None:
                 group = win._group
@@ -806,7 +869,6 @@ class Window(_Window):
 
         # add window to the save-set, so it gets mapped when qtile dies
         qtile.conn.conn.core.ChangeSaveSet(SetMode.Insert, self.window.wid)
-        self.update_wm_net_icon()
 
     @property
     def group(self):
@@ -1074,7 +1136,7 @@ class Window(_Window):
         Parameters
         ==========
         match:
-            a config.Match object
+            a config.Match object, or a config.MatchIndex
         """
         try:
             return match.compare(self)
@@ -1109,43 +1171,44 @@ class Window(_Window):
                 x, y,
                 width, height,
                 self.borderwidth, self.bordercolor,
+                notify=True,
             )
         self.update_state()
         return False
 
-    def update_wm_net_icon(self):
-        """Set a dict with the icons of the window"""
-
-        icon = self.window.get_property('_NET_WM_ICON', 'CARDINAL')
-        if not icon:
-            return
-        icon = list(map(ord, icon.value))
-
-        icons = {}
-        while True:
-            if not icon:
-                break
-            size = icon[:8]
-            if len(size) != 8 or not size[0] or not size[4]:
-                break
-
-            icon = icon[8:]
+    @property
+    def icons(self):
+        """All of the window's icons, see get_icons"""
+        return self.get_icons()
 
-            width = size[0]
-            height = size[4]
+    def get_icons(self, size=None):
+        """Return the window's icons, decoding them on first use
 
-            next_pix = width * height * 4
-            data = icon[:next_pix]
+        The result maps "WxH" to premultiplied ARGB32 data. If size is given,
+        only the icon whose width is closest to it is decoded. Icons are cached
+        until the client changes its _NET_WM_ICON.
+        """
+        icons = self._icons.get(size)
+        if icons is not None:
+            return icons
+
+        if None in self._icons:
+            # everything is decoded already, pick the closest one from there
+            icons = self._icons[None]
+            if icons:
+                name = min(icons, key=lambda x: abs(size - int(x.split("x")[0])))
+                icons = {name: icons[name]}
+        else:
+            try:
+                icons = self.window.get_net_wm_icon(size)
+            except (xcffib.xproto.WindowError, xcffib.xproto.AccessError):
+                icons = {}
+        self._icons[size] = icons
+        return icons
 
-            arr = array.array("B", data)
-            for i in range(0, len(arr), 4):
-                mult = arr[i + 3] / 255.
-                arr[i + 0] = int(arr[i + 0] * mult)
-                arr[i + 1] = int(arr[i + 1] * mult)
-                arr[i + 2] = int(arr[i + 2] * mult)
-            icon = icon[next_pix:]
-            icons["%sx%s" % (width, height)] = arr
-        self.icons = icons
+    def update_wm_net_icon(self):
+        """Forget the decoded icons, they are decoded again when next used"""
+        self._icons.clear()
         hook.fire("net_wm_icon_change", self)
 
     def handle_ClientMessage(self, event):  # noqa: N802
@@ -1213,6 +1276,7 @@ class Window(_Window):
     def handle_PropertyNotify(self, e):  # noqa: N802
         name = self.qtile.conn.atoms.get_name(e.atom)
         logger.debug("PropertyNotifyEvent: %s", name)
+        self.invalidate_property(name)
         if name == "WM_TRANSIENT_FOR":
             pass
         elif name == "WM_HINTS":
@@ -1251,6 +1315,9 @@ class Window(_Window):
             if not self.qtile.config.follow_mouse_focus and \
                     self.group.current_window != self:
                 self.group.focus(self, False)
+        elif name in CACHED_PROPERTIES:
+            # the cached value was dropped above and is read again on demand
+            pass
         else:
             logger.info("Unknown window property: %s", name)
         return False
@@ -1,4 +1,5 @@
 import os
+import struct
 
 import pytest
 import xcffib
@@ -65,3 +66,42 @@ def test_masks():
 def test_translate_masks():
     assert xcbq.translate_masks(["shift", "control"])
     assert xcbq.translate_masks([]) == 0
+
+
+def test_prefetch(xdisplay):
+    conn = xcbq.Connection(xdisplay)
+    win = conn.create_window(1, 2, 640, 480)
+    win.set_property("WM_CLASS", "xterm\0XTerm\0", type="STRING", format=8)
+    win.set_property("_NET_WM_DESKTOP", 1)
+
+    snapshot = win.prefetch()
+    assert snapshot is win.snapshot
+    assert win.get_geometry().width == 640
+    assert win.get_wm_class() == ("xterm", "XTerm")
+    assert win.get_wm_desktop() == 1
+    assert win.get_wm_window_role() is None
+
+    # writing a property makes us ask the server again
+    win.set_property("_NET_WM_DESKTOP", 2)
+    assert win.get_wm_desktop() == 2
+
+    win.configure(width=320)
+    assert "geometry" not in snapshot
+    assert win.get_geometry().width == 320
+
+    win.drop_prefetched()
+    assert win.snapshot is None
+    assert win.get_wm_class() == ("xterm", "XTerm")
+
+
+def test_net_wm_icon():
+    # a 2x1 and a 1x1 image, as a client would set them
+    pixels = [0xff102030, 0x80ff8040, 0x00ffffff]
+    raw = struct.pack("=9I", 2, 1, pixels[0], pixels[1], 1, 1, pixels[2], 0, 0)
+    assert list(xcbq.iter_net_wm_icon(raw)) == [(2, 1, 2), (1, 1, 6)]
+
+    data = bytearray(raw[8:16])
+    xcbq.premultiply_argb32(data)
+    opaque, translucent = struct.unpack("=2I", data)
+    assert opaque == 0xff102030
+    assert translucent == 0x80804020
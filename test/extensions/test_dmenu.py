@@ -0,0 +1,87 @@
+import asyncio
+import logging
+import sys
+
+from libqtile.extension import base
+from libqtile.extension.dmenu import Dmenu
+
+# prints the arguments it was given, then the last item it was offered
+STUB_DMENU = (
+    "import sys; "
+    "items = sys.stdin.read().splitlines(); "
+    "print(' '.join(sys.argv[1:])); "
+    "print(items[-1] if items else '')"
+)
+
+
+def make_dmenu(**config):
+    dmenu = Dmenu(dmenu_command=[sys.executable, "-c", STUB_DMENU], **config)
+    dmenu._configure(None)
+    return dmenu
+
+
+def run_with(dmenu, callback, items):
+    async def main():
+        await dmenu.run_with(callback, items)
+
+    asyncio.run(main())
+
+
+def test_run_with():
+    dmenu = make_dmenu(dmenu_lines=5)
+    results = []
+    items = ["item %d" % i for i in range(base.CHUNK_LINES * 2 + 1)]
+    run_with(dmenu, results.append, items)
+    run_with(dmenu, results.append, items[:3])
+    run_with(dmenu, results.append, items[:3])
+
+    args, selected = results[0].splitlines()
+    assert selected == items[-1]
+    assert args.endswith("-l 5")
+    # the number of lines is reduced to fit, without piling up across runs
+    args, selected = results[1].splitlines()
+    assert selected == "item 2"
+    assert args.endswith("-l 3")
+    assert results[2] == results[1]
+
+
+def test_run_with_coroutine():
+    dmenu = make_dmenu()
+    results = []
+
+    async def callback(out):
+        await asyncio.sleep(0)
+        results.append(out.splitlines()[-1])
+
+    run_with(dmenu, callback, ["a", "b"])
+    assert results == ["b"]
+
+
+def test_errors_are_logged(caplog):
+    results = []
+
+    def callback(out):
+        raise ValueError("bad selection")
+
+    dmenu = make_dmenu()
+    missing = Dmenu(dmenu_command="/nonexistent/dmenu")
+    missing._configure(None)
+
+    async def main():
+        tasks = [
+            missing.run_with(results.append, ["a"]),
+            dmenu.run_with(callback, ["a"]),
+        ]
+        await asyncio.wait(tasks)
+        # let the done callbacks run
+        await asyncio.sleep(0)
+
+    with caplog.at_level(logging.ERROR, logger="libqtile"):
+        asyncio.run(main())
+
+    assert results == []
+    errors = [r for r in caplog.records if r.message == "Error running Dmenu"]
+    assert len(errors) == 2
+    assert isinstance(errors[0].exc_info[1], FileNotFoundError)
+    assert isinstance(errors[1].exc_info[1], ValueError)
+    assert not missing._tasks and not dmenu._tasks
@@ -0,0 +1,88 @@
+import pytest
+
+import libqtile.config
+from libqtile import layout
+from libqtile.confreader import Config
+from test.conftest import no_xinerama
+from test.layouts.layout_utils import assert_dimensions, assert_focused
+
+
+class FocusConfig(Config):
+    auto_fullscreen = True
+    groups = [
+        libqtile.config.Group("a"),
+    ]
+    layouts = [
+        layout.Tile(border_focus="#ff0000", border_normal="#0000ff"),
+        layout.Max(),
+        layout.TreeTab(),
+    ]
+    floating_layout = libqtile.resources.default_config.floating_layout
+    keys = []
+    mouse = []
+    screens = []
+    follow_mouse_focus = False
+
+
+def focus_config(x):
+    return no_xinerama(pytest.mark.parametrize("manager", [FocusConfig], indirect=True)(x))
+
+
+def named_window(manager, name):
+    for info in manager.c.windows():
+        if info["name"] == name:
+            return manager.c.window[info["id"]]
+    raise AssertionError("No window named %r" % name)
+
+
+def window_attr(manager, name, attr):
+    """Read an attribute of the named window inside qtile"""
+    success, value = named_window(manager, name).eval("self." + attr)
+    assert success, value
+    return value
+
+
+@focus_config
+def test_tile_focus_keeps_geometry(manager):
+    manager.test_window("one")
+    manager.test_window("two")
+    manager.test_window("three")
+    assert manager.c.layout.info()["clients"] == ["three", "two", "one"]
+
+    manager.c.layout.next()
+    assert_focused(manager, "two")
+    # nothing moved, only the borders of the old and new focus changed
+    assert_dimensions(manager, 494, 0, 304, 298)
+    assert_dimensions(manager, 0, 0, 492, 598, named_window(manager, "three"))
+    assert window_attr(manager, "two", "bordercolor") == "#ff0000"
+    assert window_attr(manager, "three", "bordercolor") == "#0000ff"
+    assert window_attr(manager, "one", "bordercolor") == "#0000ff"
+
+    manager.c.layout.next()
+    assert_focused(manager, "one")
+    assert_dimensions(manager, 494, 300, 304, 298)
+    assert window_attr(manager, "one", "bordercolor") == "#ff0000"
+    assert window_attr(manager, "two", "bordercolor") == "#0000ff"
+
+    # a new window after a focus change still lays out the whole group
+    manager.test_window("four")
+    heights = sorted(info["height"] for info in manager.c.windows())
+    assert heights == [198, 198, 198, 598]
+
+
+@focus_config
+def test_focus_changes_geometry(manager):
+    manager.test_window("one")
+    manager.test_window("two")
+    manager.test_window("three")
+
+    # Max and TreeTab only show the focused window, so focusing another one
+    # has to lay the group out again
+    for x, width in [(0, 800), (150, 650)]:
+        manager.c.next_layout()
+        for _ in range(3):
+            manager.c.group.next_window()
+            focused = manager.c.window.info()["name"]
+            assert_dimensions(manager, x, 0, width, 600)
+            for name in ("one", "two", "three"):
+                assert window_attr(manager, name, "hidden") == str(name != focused)
@@ -19,11 +19,13 @@
 # SOFTWARE.
 
 import pytest
+import xcffib.xproto
 
 import libqtile.config
 from libqtile import layout
+from libqtile.backend.x11 import xcbq
 from libqtile.confreader import Config
-from test.conftest import no_xinerama
+from test.conftest import Retry, no_xinerama
 from test.layouts.layout_utils import assert_focus_path, assert_focused
 
 
@@ -147,3 +149,48 @@ def test_sort_windows(manager):
         'Even': [['102']],
         'Odd': [['101'], ['103']]
     }
+
+
+@treetab_config
+def test_urgent_tab(manager):
+    conn = xcbq.Connection(manager.display)
+    w = None
+
+    def urgent_window():
+        nonlocal w
+        w = conn.create_window(0, 0, 100, 100)
+        w.set_property("WM_NAME", "urgent", type="STRING", format=8)
+        w.map()
+        conn.conn.flush()
+
+    try:
+        manager.create_window(urgent_window)
+        two = manager.test_window("two")
+
+        # the window asks for attention while it doesn't have the focus
+        hints = [0] * 9
+        hints[0] = xcbq.HintsFlags["UrgencyHint"]
+        w.set_property("WM_HINTS", hints, type="WM_HINTS", format=32)
+        conn.conn.flush()
+
+        panel = manager.c.internal_windows()[0]["id"]
+        success, top = manager.c.layout.eval(
+            "[node._title_top for win, node in self._nodes.items() if win.name == 'urgent'][0]"
+        )
+        assert success, top
+
+        # the tab is repainted with urgent_bg, left of its title
+        @Retry(ignore_exceptions=(ValueError,), fail_msg="tab never turned urgent")
+        def tab_is_urgent():
+            image = conn.conn.core.GetImage(
+                xcffib.xproto.ImageFormat.ZPixmap, panel, 8, int(top) + 8, 1, 1, 0xffffffff
+            ).reply()
+            blue, green, red = list(image.data)[:3]
+            if (red, green, blue) != (0xff, 0, 0):
+                raise ValueError("tab is #%02x%02x%02x" % (red, green, blue))
+
+        tab_is_urgent()
+        manager.kill_window(two)
+    finally:
+        w.kill_client()
+        conn.finalize()
@@ -301,6 +301,75 @@ def test_resize(manager):
         assert off(dwidget_list) == [0, 10, 90]
 
 
+class DDrawer:
+    width = height = None
+
+
+class DrawCountWidget(DWidget):
+    def __init__(self, length):
+        DWidget.__init__(self, length, libqtile.bar.STATIC)
+        self.drawer = DDrawer()
+        self.draws = 0
+
+    @property
+    def offset(self):
+        return self.offsetx
+
+    @property
+    def width(self):
+        return self.length
+
+    @property
+    def height(self):
+        return 10
+
+    def draw(self):
+        self.draws += 1
+
+
+class LoopQtile:
+    def __init__(self):
+        self.pending = []
+
+    def call_soon(self, func):
+        self.pending.append(func)
+
+    def run_pending(self):
+        while self.pending:
+            self.pending.pop(0)()
+
+
+def test_draw_damage():
+    one, two = DrawCountWidget(10), DrawCountWidget(20)
+    b = DBarH([one, two], 10)
+    b.qtile = LoopQtile()
+    b.length = 30
+    run_pending = b.qtile.run_pending
+
+    # the first draw lays out and draws everything
+    b.draw(one)
+    run_pending()
+    assert (one.draws, two.draws) == (1, 1)
+
+    # then only the widgets that asked for it, once per loop iteration
+    b.draw(two)
+    b.draw(two)
+    run_pending()
+    assert (one.draws, two.draws) == (1, 2)
+
+    # a change of length moves the other widgets, so all of them are drawn
+    one.length = 15
+    b.draw(one)
+    run_pending()
+    assert (one.draws, two.draws) == (2, 3)
+    assert two.offsetx == 15
+    assert (one.drawer.width, one.drawer.height) == (15, 10)
+
+    b.draw()
+    run_pending()
+    assert (one.draws, two.draws) == (3, 4)
+
+
 class ExampleWidget(libqtile.widget.base._Widget):
     orientations = libqtile.widget.base.ORIENTATION_HORIZONTAL
 
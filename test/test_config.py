@@ -21,11 +21,13 @@
 # SOFTWARE.
 
 import os
+import re
 
 import pytest
 
-from libqtile import config, confreader, utils
+from libqtile import config, confreader, layout, utils
 from libqtile.backend.x11.core import Core
+from libqtile.confreader import Config
 
 tests_dir = os.path.dirname(os.path.realpath(__file__))
 
@@ -110,3 +112,54 @@ def test_ezclick_ezdrag():
     btn = config.EzDrag('A-2', cmd)
     assert btn.button == 'Button2'
     assert btn.modifiers == [config.EzClick.modifier_keys['A']]
+
+
+class MatchConfig(Config):
+    groups = [
+        config.Group("a"),
+        config.Group("mail"),
+        config.Group("term"),
+    ]
+    layouts = [
+        layout.Stack(num_stacks=1),
+    ]
+    floating_layout = layout.Floating(float_rules=[
+        config.Match(wm_type="dialog"),
+        config.Match(title=re.compile("^pop")),
+    ])
+    dgroups_app_rules = [
+        config.Rule(config.Match(title="Mail"), group="mail"),
+        config.Rule([config.Match(title="xterm"), config.Match(title=re.compile(".*shell$"))],
+                    group="term"),
+    ]
+    keys = []
+    mouse = []
+    screens = []
+
+
+def window_info(manager, key):
+    return {w["name"]: w[key] for w in manager.c.windows()}
+
+
+@pytest.mark.parametrize("manager", [MatchConfig], indirect=True)
+def test_match_index(manager):
+    manager.test_window("popup")
+    manager.test_dialog("dialog")
+    manager.test_window("plain")
+    floating = window_info(manager, "floating")
+    assert floating == {"popup": True, "dialog": True, "plain": False}
+
+    manager.test_window("Inbox - Mail")
+    manager.test_window("xterm")
+    manager.test_window("fish shell")
+    manager.test_window("shell scripts")
+    groups = window_info(manager, "group")
+    assert groups["Inbox - Mail"] == "mail"
+    assert groups["xterm"] == "term"
+    assert groups["fish shell"] == "term"
+    assert groups["shell scripts"] == "a"
+
+    # the index follows rules added later
+    manager.c.add_rule({"title": "scratch"}, {"group": "mail"})
+    manager.test_window("scratch")
+    assert window_info(manager, "group")["scratch"] == "mail"
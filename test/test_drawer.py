@@ -0,0 +1,65 @@
+import collections
+
+from libqtile import drawer
+from libqtile.widget import base
+
+
+class FakeLayout:
+    def __init__(self, measured):
+        self.measured = measured
+        self.layout = self
+        self.text = ""
+
+    def get_pixel_size(self):
+        self.measured.append(self.text)
+        return len(self.text) * 10, 12
+
+    def finalize(self):
+        pass
+
+
+def test_text_sizes_are_cached(monkeypatch):
+    measured = []
+    monkeypatch.setattr(drawer, "_text_sizes", collections.OrderedDict())
+    monkeypatch.setattr(drawer, "TEXT_SIZE_CACHE_SIZE", 3)
+    d = drawer.Drawer.__new__(drawer.Drawer)
+    d._layouts = collections.OrderedDict()
+    monkeypatch.setattr(d, "_measuring_layout", lambda *args: FakeLayout(measured))
+
+    assert d.max_layout_size(["a", "bbb", "cc"], "sans", 12) == (30, 12)
+    assert d.max_layout_size(["a", "bbb", "cc"], "sans", 12) == (30, 12)
+    assert measured == ["a", "bbb", "cc"]
+
+    # other fonts are measured separately
+    d.text_size("a", "sans", 14)
+    assert measured[-1] == "a"
+
+    # the least recently used size is forgotten
+    assert list(drawer._text_sizes) == [
+        ("bbb", "sans", 12, False), ("cc", "sans", 12, False), ("a", "sans", 14, False)
+    ]
+
+
+def test_colour_sources_are_cached():
+    d = drawer.Drawer.__new__(drawer.Drawer)
+    d._height = 20
+    assert d.source("ff0000") == (1, 0, 0, 1)
+    assert d.source([]) == (0, 0, 0, 1)
+    assert d.source(["00ff00"]) == (0, 1, 0, 1)
+    gradient = d.source(["ff0000", "0000ff"])
+    assert d.source(["ff0000", "0000ff"]) is gradient
+    d._height = 30
+    assert d.source(["ff0000", "0000ff"]) is not gradient
+
+    # stops given as lists of numbers
+    gradient = d.source([[0, 0, 0], [255, 255, 255]])
+    assert d.source([[0, 0, 0], [255, 255, 255]]) is gradient
+
+
+def test_bad_widget_colours_use_the_default():
+    widget = base._TextBox("", foreground="nonsense", background=[[0, 0, 0], "ffffff"])
+    widget.drawer = drawer.Drawer.__new__(drawer.Drawer)
+    widget.drawer._height = 20
+    widget._prepare_colours()
+    assert widget.foreground == "ffffff"
+    assert widget.background == [[0, 0, 0], "ffffff"]
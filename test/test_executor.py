@@ -0,0 +1,113 @@
+import asyncio
+import threading
+
+import pytest
+
+from libqtile.core.executor import Executor
+from libqtile.widget.base import ThreadPoolText
+
+
+def test_executor_stats():
+    executor = Executor("test", 1)
+    release = threading.Event()
+
+    def fail():
+        raise ValueError
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        blocked = executor.run(loop, release.wait)
+        queued = executor.run(loop, lambda: 1)
+        await asyncio.sleep(0.05)
+        assert executor.stats() == dict(
+            workers=1, queued=1, running=1, completed=0, failed=0, timed_out=0
+        )
+        release.set()
+        assert await blocked
+        assert await queued == 1
+        with pytest.raises(ValueError):
+            await executor.run(loop, fail)
+
+    asyncio.run(main())
+    assert executor.stats() == dict(
+        workers=1, queued=0, running=0, completed=2, failed=1, timed_out=0
+    )
+    executor.shutdown()
+
+
+def test_executor_timeout():
+    executor = Executor("test", 1)
+    release = threading.Event()
+    called = []
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        hung = executor.run(loop, release.wait, timeout=0.05)
+        dropped = executor.run(loop, called.append, 1, timeout=0.05)
+        for future in (hung, dropped):
+            with pytest.raises(asyncio.TimeoutError):
+                await future
+        stats = executor.stats()
+        release.set()
+        return stats
+
+    stats = asyncio.run(main())
+    executor.shutdown()
+    # the hung call kept its worker, the queued one never ran
+    assert stats["running"] == 1
+    assert stats["queued"] == 0
+    assert stats["timed_out"] == 2
+    assert called == []
+
+
+class FakeScheduler:
+    def call_later(self, delay, func, *args):
+        return asyncio.get_running_loop().call_later(delay, func, *args)
+
+
+class FakeQtile:
+    scheduler = FakeScheduler()
+
+    def __init__(self, executor):
+        self.executor = executor
+
+    def run_in_executor(self, func, *args, executor=None, timeout=None):
+        return self.executor.run(asyncio.get_running_loop(), func, *args, timeout=timeout)
+
+
+class HangingText(ThreadPoolText):
+    def __init__(self, release, **config):
+        ThreadPoolText.__init__(self, "", **config)
+        self.release = release
+        self.polls = 0
+
+    def poll(self):
+        self.polls += 1
+        self.release.wait()
+        return "done"
+
+    def update(self, text):
+        self.text = text
+
+
+def test_poll_timeout_backs_off():
+    executor = Executor("test", 2)
+    release = threading.Event()
+    widget = HangingText(release, update_interval=0.05, poll_timeout=0.1)
+    widget.qtile = FakeQtile(executor)
+
+    async def main():
+        widget.timer_setup()
+        await asyncio.sleep(0.45)
+        # the hung poll keeps its worker, and no other poll is queued up
+        # behind it
+        assert widget.polls == 1
+        assert executor.stats()["running"] == 1
+        assert executor.stats()["timed_out"] == 1
+        release.set()
+        await asyncio.sleep(0.3)
+
+    asyncio.run(main())
+    executor.shutdown()
+    assert widget.polls > 1
+    assert widget.text == "done"
@@ -0,0 +1,347 @@
+import asyncio
+import os
+import tempfile
+import threading
+
+import pytest
+
+from libqtile import hook, ipc
+from libqtile.command.base import (
+    CommandError,
+    CommandObject,
+    command_timeout,
+    in_executor,
+)
+from libqtile.command.client import InteractiveCommandClient
+from libqtile.command.interface import (
+    ERROR,
+    EXCEPTION,
+    SUCCESS,
+    BatchCommandInterface,
+    IPCCommandInterface,
+    IPCCommandServer,
+)
+
+
+def run_with_server(handler, func):
+    """Run the coroutine function func against a server using handler"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        socket_path = os.path.join(tmpdir, "qtilesocket")
+
+        async def main():
+            async with ipc.Server(socket_path, handler):
+                return await func(socket_path)
+
+        return asyncio.run(main())
+
+
+codecs = [
+    "marshal",
+    "json",
+    pytest.param(
+        "msgpack",
+        marks=pytest.mark.skipif(not ipc.has_msgpack, reason="msgpack not installed"),
+    ),
+]
+
+
+@pytest.mark.parametrize("codec", codecs)
+def test_one_shot(codec):
+    async def func(socket_path):
+        client = ipc.Client(socket_path, codec=codec)
+        return await client.async_send(["echo", 1])
+
+    assert run_with_server(lambda msg: msg, func) == ["echo", 1]
+
+
+def test_unpack_without_header():
+    for msg in (["echo", 1], {"a": [None]}, "", 0):
+        assert ipc._IPC.unpack(ipc._IPC.pack(msg)) == (msg, False)
+        assert ipc._IPC.unpack(ipc._IPC.pack(msg, is_json=True)) == (msg, True)
+    with pytest.raises(ipc.IPCError):
+        ipc._IPC.unpack(b"\0\0\0\5abc")
+
+
+@pytest.mark.parametrize("codec", codecs)
+def test_persistent(codec):
+    connections = []
+
+    def handler(msg):
+        return msg * 2
+
+    async def func(socket_path):
+        client = ipc.Client(socket_path, codec=codec, persistent=True)
+        results = await asyncio.gather(*(client.async_send(i) for i in range(50)))
+        connections.append(client._connection)
+        assert await client.async_send(100) == 200
+        connections.append(client._connection)
+        await client.async_close()
+        return results
+
+    assert run_with_server(handler, func) == [i * 2 for i in range(50)]
+    assert connections[0] is connections[1]
+    assert connections[0].closed
+
+
+def test_persistent_sync():
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        socket_path = os.path.join(tmpdir, "qtilesocket")
+        server = ipc.Server(socket_path, lambda msg: msg + 1)
+
+        def serve():
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(server.start())
+            started.set()
+            loop.run_forever()
+            loop.run_until_complete(server.close())
+
+        thread = threading.Thread(target=serve)
+        thread.start()
+        started.wait()
+        try:
+            client = ipc.Client(socket_path, persistent=True)
+            assert [client.send(i) for i in range(3)] == [1, 2, 3]
+            connection = client._connection
+            assert client.send(10) == 11
+            assert client._connection is connection
+            client.close()
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+
+def test_persistent_with_old_server():
+    async def old_server(reader, writer):
+        # servers before the handshake read a single message to the end
+        data = await reader.read()
+        try:
+            msg, _ = ipc._IPC.unpack(data)
+        except ipc.IPCError:
+            msg = None
+        writer.write(ipc._IPC.pack(msg))
+        writer.write_eof()
+        writer.close()
+
+    async def main(socket_path):
+        server = await asyncio.start_unix_server(old_server, path=socket_path)
+        try:
+            client = ipc.Client(socket_path, persistent=True)
+            assert await client.async_send(1) == 1
+            assert not client.persistent
+
+            # the next client doesn't wait for the handshake again
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            client = ipc.Client(socket_path, persistent=True)
+            assert await client.async_send(2) == 2
+            assert loop.time() - start < 0.5
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        asyncio.run(main(os.path.join(tmpdir, "qtilesocket")))
+
+
+def test_command_client_closes_connection():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        socket_path = os.path.join(tmpdir, "qtilesocket")
+        ipc_client = ipc.Client(socket_path, persistent=True)
+        with InteractiveCommandClient(IPCCommandInterface(ipc_client)):
+            ipc_client._loop = asyncio.new_event_loop()
+            loop = ipc_client._loop
+        assert ipc_client._loop is None
+        assert loop.is_closed()
+
+
+class CounterRoot(CommandObject):
+    def __init__(self):
+        self.values = []
+
+    def _items(self, name):
+        return None
+
+    def _select(self, name, sel):
+        return None
+
+    def cmd_add(self, value):
+        if value < 0:
+            raise CommandError("negative value")
+        self.values.append(value)
+        return len(self.values)
+
+    async def cmd_add_later(self, value, delay):
+        await asyncio.sleep(delay)
+        return self.cmd_add(value)
+
+    @in_executor
+    def cmd_thread(self):
+        return threading.current_thread() is not threading.main_thread()
+
+    @command_timeout(0.05)
+    async def cmd_hang(self):
+        await asyncio.sleep(10)
+
+
+@pytest.mark.parametrize("stop_on_error", [False, True])
+def test_batch(stop_on_error):
+    root = CounterRoot()
+    server = IPCCommandServer(root)
+
+    async def func(socket_path):
+        client = ipc.Client(socket_path, persistent=True)
+        batch = BatchCommandInterface(IPCCommandInterface(client))
+        c = InteractiveCommandClient(batch)
+        for value in (1, -1, 2):
+            assert c.add(value) is None
+        assert root.values == []
+        loop = asyncio.get_event_loop()
+        # the synchronous client must not run inside this loop
+        results = await loop.run_in_executor(None, batch.flush, stop_on_error)
+        await loop.run_in_executor(None, client.close)
+        return results
+
+    results = run_with_server(server.call, func)
+    if stop_on_error:
+        assert results == [(SUCCESS, 1), (ERROR, "negative value")]
+        assert root.values == [1]
+    else:
+        assert results == [(SUCCESS, 1), (ERROR, "negative value"), (SUCCESS, 2)]
+        assert root.values == [1, 2]
+
+
+def test_async_commands():
+    root = CounterRoot()
+    server = IPCCommandServer(root)
+
+    async def func(socket_path):
+        client = ipc.Client(socket_path, persistent=True)
+        order = []
+
+        async def send(*call):
+            reply = await client.async_send(call)
+            order.append(call[1])
+            return reply
+
+        results = await asyncio.gather(
+            send([], "add_later", (1, 0.1), {}),
+            send([], "hang", (), {}),
+            send([], "thread", (), {}),
+            send([], "add_later", (-1, 0), {}),
+            send([], "add", (2,), {}),
+            send([], "add_later", ("x", 0), {}),
+        )
+        await client.async_close()
+        return order, results
+
+    order, results = run_with_server(server.dispatch, func)
+    # the slow commands didn't hold up the replies to the others
+    assert order[0] == "add"
+    assert order[-1] == "add_later"
+    assert results[0] == (SUCCESS, 2)
+    assert results[1] == (ERROR, "Command hang timed out after 0.05 seconds")
+    assert results[2] == (SUCCESS, True)
+    assert results[3] == (ERROR, "negative value")
+    assert results[4] == (SUCCESS, 1)
+    assert results[5][0] == EXCEPTION
+    assert root.values == [2, 1]
+
+
+def test_async_command_in_batch():
+    root = CounterRoot()
+    server = IPCCommandServer(root)
+    batch = {"batch": [([], "add", (1,), {}), ([], "add_later", (2, 0), {}), ([], "add", (3,), {})]}
+
+    async def main():
+        assert server.call(batch) == [(SUCCESS, 1), (SUCCESS, None), (SUCCESS, 2)]
+        await asyncio.sleep(0.01)
+        assert root.values == [1, 3, 2]
+        return await server.dispatch(batch)
+
+    assert asyncio.run(main()) == [(SUCCESS, 4), (SUCCESS, 5), (SUCCESS, 6)]
+
+
+class FakeWindow:
+    class window:
+        wid = 42
+
+    name = "xterm"
+
+
+def test_subscribe():
+    server = IPCCommandServer(CounterRoot())
+
+    async def func(socket_path):
+        client = ipc.Client(socket_path, persistent=True)
+        with pytest.raises(ipc.IPCError, match="Unknown hooks: no_such_hook"):
+            async for _ in client.async_subscribe(["no_such_hook"]):
+                pass
+
+        events = client.async_subscribe(["client_focus", "setgroup"])
+        received = []
+
+        async def receive():
+            async for event in events:
+                received.append(event)
+                if len(received) == 2:
+                    break
+
+        receiver = asyncio.ensure_future(receive())
+        while not ipc_server.wants("client_focus"):
+            await asyncio.sleep(0.01)
+        assert not ipc_server.wants("client_new")
+
+        hook.fire("client_focus", FakeWindow())
+        hook.fire("client_new", FakeWindow())
+        hook.fire("setgroup")
+        await receiver
+        # the connection still answers requests
+        assert await client.async_send(([], "add", (1,), {})) == (SUCCESS, 1)
+        await client.async_close()
+        return received
+
+    ipc_server = None
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        socket_path = os.path.join(tmpdir, "qtilesocket")
+
+        async def main():
+            nonlocal ipc_server
+            async with ipc.Server(socket_path, server.call, server.subscribe) as ipc_server:
+                return await func(socket_path)
+
+        try:
+            received = asyncio.run(main())
+        finally:
+            hook.clear()
+
+    assert received == [
+        ("client_focus", [{"type": "window", "id": 42, "name": "xterm"}]),
+        ("setgroup", []),
+    ]
+
+
+def test_subscription_queue_is_bounded():
+    frames = []
+
+    class Writer:
+        def write(self, frame):
+            frames.append(ipc._IPC.unpack_frame(frame[ipc.FRAMELEN:]))
+
+        async def drain(self):
+            pass
+
+    async def main():
+        subscription = ipc._Subscription(Writer(), 0, {"a"}, ipc.FORMAT_MARSHAL, maxsize=3)
+        for i in (0, 1, 1, 2, 3, 4):
+            subscription.push("a", i)
+        await asyncio.sleep(0)
+        subscription.cancel()
+        return subscription.dropped
+
+    assert asyncio.run(main()) == 2
+    assert frames == [("a", 2), ("a", 3), ("a", 4)]
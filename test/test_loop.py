@@ -0,0 +1,25 @@
+import asyncio
+
+import pytest
+
+from libqtile.core import loop
+from libqtile.core.loop import LoopContext
+
+
+@pytest.mark.parametrize("has_dbus_next, glib_fallback, glib_loop", [
+    (True, False, False),
+    (True, True, True),
+    # dbus-python needs GLib's loop, so it runs without the option
+    (False, False, True),
+])
+def test_glib_loop(monkeypatch, has_dbus_next, glib_fallback, glib_loop):
+    monkeypatch.setattr(loop, "has_dbus_next", has_dbus_next)
+    started = []
+    monkeypatch.setattr(LoopContext, "_setup_glib_loop", lambda self: started.append(self))
+
+    async def main():
+        async with LoopContext(glib_fallback=glib_fallback):
+            pass
+
+    asyncio.run(main())
+    assert bool(started) == glib_loop
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import os
+
+import pytest
+
+from libqtile import notify
+from libqtile.notify import Notification, NotificationManager
+
+
+def make_manager(maxlen=notify.MAX_NOTIFICATIONS):
+    manager = NotificationManager(maxlen)
+    shown = []
+    closed = []
+    manager.callbacks.append(shown.append)
+    manager.close_callbacks.append(closed.append)
+    return manager, shown, closed
+
+
+def test_bounded():
+    manager, shown, _ = make_manager(maxlen=3)
+    ids = [manager.add(Notification(str(i))) for i in range(5)]
+    assert ids == [1, 2, 3, 4, 5]
+    assert [n.summary for n in manager.notifications] == ["2", "3", "4"]
+    assert manager.get(1) is None
+    assert manager.get(5).summary == "4"
+    assert len(shown) == 5
+
+
+def test_replace():
+    manager, shown, _ = make_manager()
+    first = manager.add(Notification("download", "1%"))
+    manager.add(Notification("other"))
+    assert manager.add(Notification("download", "2%", replaces_id=first)) == first
+    assert [n.body for n in manager.notifications] == ["2%", ""]
+    assert manager.get(first).body == "2%"
+    # an unknown id gets a new notification
+    assert manager.add(Notification("download", "3%", replaces_id=42)) == 3
+
+
+def test_close():
+    manager, _, closed = make_manager()
+    first = manager.add(Notification("first"))
+    manager.add(Notification("second"))
+    manager.close(first)
+    manager.close(first)
+    assert [n.summary for n in closed] == ["first"]
+    assert [n.summary for n in manager.notifications] == ["second"]
+    # closed notifications can't be replaced
+    assert manager.add(Notification("first", replaces_id=first)) == 3
+
+
+def test_expiry():
+    manager, _, closed = make_manager()
+
+    async def main():
+        short = manager.add(Notification("short", timeout=10))
+        manager.add(Notification("long", timeout=10000))
+        manager.add(Notification("forever", timeout=0))
+        replaced = manager.add(Notification("replaced", timeout=10))
+        manager.add(Notification("replaced", timeout=-1, replaces_id=replaced))
+        await asyncio.sleep(0.05)
+        return short
+
+    short = asyncio.run(main())
+    assert [n.id for n in closed] == [short]
+    assert [n.summary for n in manager.notifications] == ["long", "forever", "replaced"]
+
+
+def warnings(caplog):
+    return [r.message for r in caplog.records if r.levelno == logging.WARNING]
+
+
+def test_warns_without_dbus(monkeypatch, caplog):
+    monkeypatch.setattr(notify, "has_dbus_next", False)
+    monkeypatch.setattr(notify, "has_dbus", False)
+    manager, _, _ = make_manager()
+    with caplog.at_level(logging.WARNING, logger="libqtile"):
+        manager.register(print)
+        manager.register(print)
+    assert len(warnings(caplog)) == 1
+    assert "no notifications will be received" in warnings(caplog)[0]
+
+
+@pytest.mark.skipif(
+    not notify.has_dbus_next or "DBUS_SESSION_BUS_ADDRESS" not in os.environ,
+    reason="needs dbus-next and a session bus",
+)
+def test_service():
+    from dbus_next.aio import MessageBus
+
+    manager, shown, closed = make_manager()
+    signals = []
+
+    async def main():
+        manager.register(lambda notif: None, capabilities=["actions"])
+        await manager._starting
+
+        bus = await MessageBus().connect()
+        try:
+            introspection = await bus.introspect(notify.BUS_NAME, notify.SERVICE_PATH)
+            proxy = bus.get_proxy_object(notify.BUS_NAME, notify.SERVICE_PATH, introspection)
+            interface = proxy.get_interface(notify.BUS_NAME)
+            interface.on_notification_closed(lambda id, reason: signals.append((id, reason)))
+
+            assert sorted(await interface.call_get_capabilities()) == ["actions", "body"]
+            first = await interface.call_notify("app", 0, "", "hello", "body", [], {}, -1)
+            again = await interface.call_notify("app", first, "", "hello", "again", [], {}, -1)
+            assert again == first
+            await interface.call_close_notification(first)
+            # let the signal arrive
+            for _ in range(100):
+                if signals:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            bus.disconnect()
+
+    asyncio.run(main())
+    assert [n.body for n in shown] == ["body", "again"]
+    assert [n.id for n in closed] == [1]
+    assert signals == [(1, notify.CLOSED_BY_CALL)]
@@ -0,0 +1,57 @@
+import asyncio
+import time
+
+from libqtile.core.scheduler import Scheduler
+
+
+def run(func):
+    flushes = []
+
+    async def main():
+        scheduler = Scheduler(asyncio.get_running_loop(), lambda: flushes.append(time.time()))
+        try:
+            return await func(scheduler)
+        finally:
+            scheduler.close()
+
+    return asyncio.run(main()), flushes
+
+
+def test_timers_share_slots():
+    calls = []
+
+    async def func(scheduler):
+        # start just after a whole second so the rounding is predictable
+        await asyncio.sleep(1.05 - time.time() % 1)
+        for name, delay in (("a", 1), ("b", 1.3), ("c", 1.1), ("d", 1.6)):
+            scheduler.call_later(delay, lambda name=name: calls.append((name, time.time())))
+        scheduler.call_later(1, calls.append, ("cancelled", 0)).cancel()
+        assert len(scheduler._handles) == 2
+        await asyncio.sleep(2.1)
+
+    _, flushes = run(func)
+    assert [name for name, _ in calls] == ["a", "b", "c", "d"]
+    times = [t for _, t in calls]
+    for t in times:
+        assert abs(t - round(t)) < 0.05
+    assert round(times[0]) == round(times[1]) == round(times[2])
+    assert round(times[3]) == round(times[0]) + 1
+    # one flush per slot
+    assert len(flushes) == 2
+
+
+def test_short_timers_run_when_asked():
+    calls = []
+
+    async def func(scheduler):
+        await asyncio.sleep(1.2 - time.time() % 1)
+        start = time.time()
+        scheduler.call_later(0.1, lambda: calls.append(time.time() - start))
+        handle = scheduler.call_later(0.1, calls.append, None)
+        handle.cancel()
+        await asyncio.sleep(0.2)
+
+    _, flushes = run(func)
+    assert len(calls) == 1
+    assert 0.09 < calls[0] < 0.15
+    assert len(flushes) == 1
@@ -0,0 +1,119 @@
+import ast
+import asyncio
+import os
+import pickle
+import signal
+import sys
+import tempfile
+
+import pytest
+
+from libqtile.core.manager import Qtile
+from libqtile.core.state import QtileState
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, "posix_spawnp"), reason="spawning falls back to forking"
+)
+
+# writes its pid and its arguments to the file named by its first argument
+WRITE_ARGS = "import os, sys; open(sys.argv[1], 'w').write(repr([os.getpid()] + sys.argv[2:]))"
+
+
+class FakeQtile:
+    def __init__(self):
+        self._spawned_pids = set()
+        self.groups = []
+        self.groups_map = {}
+        self.screens = []
+        self.current_screen = None
+
+    cmd_spawn = Qtile.cmd_spawn
+    reap_children = Qtile.reap_children
+
+    def focus_screen(self, index):
+        pass
+
+
+def spawn_and_reap(qtile, *spawns):
+    """Spawn the commands, and wait for SIGCHLD to reap them all"""
+    async def main():
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGCHLD, qtile.reap_children)
+        try:
+            pids = [qtile.cmd_spawn(*spawn) for spawn in spawns]
+            for _ in range(500):
+                if not qtile._spawned_pids:
+                    break
+                await asyncio.sleep(0.01)
+            return pids
+        finally:
+            loop.remove_signal_handler(signal.SIGCHLD)
+
+    return asyncio.run(main())
+
+
+def read(path):
+    with open(path) as f:
+        return ast.literal_eval(f.read())
+
+
+def test_spawn():
+    qtile = FakeQtile()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        argv = os.path.join(tmpdir, "argv")
+        string = os.path.join(tmpdir, "string")
+        shell = os.path.join(tmpdir, "shell")
+        pids = spawn_and_reap(
+            qtile,
+            # arguments are passed as they are, not split again
+            ([sys.executable, "-c", WRITE_ARGS, argv, "a b", "$HOME"],),
+            # strings are split like a shell would, without running one
+            ('{} -c "{}" {} "a b" $HOME'.format(sys.executable, WRITE_ARGS, string),),
+            # or given to /bin/sh
+            ("echo $$ > {}".format(shell), True),
+        )
+
+        assert read(argv) == [pids[0], "a b", "$HOME"]
+        assert read(string) == [pids[1], "a b", "$HOME"]
+        assert read(shell) == pids[2]
+
+    # they were all reaped, and aren't zombies
+    assert qtile._spawned_pids == set()
+    for pid in pids:
+        with pytest.raises(ChildProcessError):
+            os.waitpid(pid, os.WNOHANG)
+
+
+def test_spawn_missing_command():
+    qtile = FakeQtile()
+    assert qtile.cmd_spawn("/nonexistent/command") == -1
+    assert qtile._spawned_pids == set()
+
+
+def test_spawned_pids_survive_restart():
+    old = FakeQtile()
+    pid = old.cmd_spawn([sys.executable, "-c", "import time; time.sleep(10)"])
+    try:
+        state = pickle.loads(pickle.dumps(QtileState(old), protocol=0))
+
+        new = FakeQtile()
+        state.apply(new)
+        assert new._spawned_pids == {pid}
+
+        os.kill(pid, signal.SIGTERM)
+        os.waitpid(pid, 0)
+        # already reaped by someone else, which shouldn't upset us
+        new.reap_children()
+        assert new._spawned_pids == set()
+    finally:
+        try:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        except (ProcessLookupError, ChildProcessError):
+            pass
+
+    # a state saved before pids were kept
+    del state.spawned_pids
+    new = FakeQtile()
+    state.apply(new)
+    assert new._spawned_pids == set()
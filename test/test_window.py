@@ -1,6 +1,8 @@
 import pytest
+import xcffib.xproto
 
-from test.conftest import BareConfig
+from libqtile.backend.x11 import xcbq
+from test.conftest import BareConfig, Retry
 
 bare_config = pytest.mark.parametrize("manager", [BareConfig], indirect=True)
 
@@ -29,3 +31,161 @@ def test_margin(manager):
     assert manager.c.window.info()['y'] == 22
     assert manager.c.window.info()['width'] == 36
     assert manager.c.window.info()['height'] == 50
+
+
+def own_window(manager, conn, name, properties=()):
+    """Map a window of our own, so the test sees its events and sets its properties
+
+    properties are (name, value, type, format) to set before the window is mapped.
+    """
+    w = None
+
+    def create():
+        nonlocal w
+        w = conn.create_window(0, 0, 100, 100)
+        w.set_property("WM_NAME", name, type="STRING", format=8)
+        for prop, value, type, format in properties:
+            w.set_property(prop, value, type=type, format=format)
+        w.map()
+        conn.conn.flush()
+
+    manager.create_window(create)
+    return w
+
+
+def configure_notifies(manager, conn):
+    """The ConfigureNotify geometries sent to our windows since the last call"""
+    # a round trip on qtile's connection, then on ours, means that the server
+    # has sent us everything qtile's requests caused
+    manager.c.eval("self.conn.xsync()")
+    conn.conn.core.GetInputFocus().reply()
+    geometries = []
+    while True:
+        event = conn.conn.poll_for_event()
+        if not event:
+            return geometries
+        if isinstance(event, xcffib.xproto.ConfigureNotifyEvent):
+            geometries.append((event.x, event.y, event.width, event.height))
+
+
+def set_normal_hints(w, min_width):
+    hints = [0] * 18
+    hints[0] = xcbq.NormalHintsFlags["PMinSize"]
+    hints[5] = min_width
+    w.set_property("WM_NORMAL_HINTS", hints, type="WM_SIZE_HINTS", format=32)
+    w.conn.conn.flush()
+
+
+def set_urgent(w):
+    hints = [0] * 9
+    hints[0] = xcbq.HintsFlags["UrgencyHint"]
+    w.set_property("WM_HINTS", hints, type="WM_HINTS", format=32)
+    w.conn.conn.flush()
+
+
+@bare_config
+def test_place_sends_only_changes(manager):
+    conn = xcbq.Connection(manager.display)
+    w = own_window(manager, conn, "one")
+    try:
+        window = manager.c.window[w.wid]
+        window.place(10, 20, 50, 60, 2, "ff0000")
+        assert configure_notifies(manager, conn)[-1] == (10, 20, 50, 60)
+
+        # nothing changed, or only the border colour, so nothing is sent
+        window.place(10, 20, 50, 60, 2, "ff0000")
+        window.place(10, 20, 50, 60, 2, "00ff00")
+        assert configure_notifies(manager, conn) == []
+        assert window.eval("self.bordercolor") == (True, "00ff00")
+
+        # a move gets a synthetic ConfigureNotify as well as the real one
+        window.place(15, 20, 50, 60, 2, "00ff00")
+        assert configure_notifies(manager, conn) == [(15, 20, 50, 60)] * 2
+
+        # a resize only gets the real one
+        window.place(15, 20, 55, 60, 2, "00ff00")
+        assert configure_notifies(manager, conn) == [(15, 20, 55, 60)]
+    finally:
+        w.kill_client()
+        conn.finalize()
+
+
+@bare_config
+def test_hints_relayout_only_on_size_changes(manager):
+    conn = xcbq.Connection(manager.display)
+    w = own_window(manager, conn, "one")
+    two = manager.test_window("two")
+    try:
+        window = manager.c.window[w.wid]
+        # count the group's relayouts from inside qtile
+        manager.c.group.eval(
+            "self.relayouts = []\n"
+            "self.layout_all = lambda *args, _relayouts=self.relayouts, "
+            "_layout_all=self.layout_all, **kwargs: "
+            "_relayouts.append(args) or _layout_all(*args, **kwargs)"
+        )
+
+        def relayouts():
+            return manager.c.group.eval("len(self.relayouts)")[1]
+
+        @Retry(ignore_exceptions=(ValueError,))
+        def wait_for(attr, value):
+            if window.eval("self." + attr)[1] != value:
+                raise ValueError("not updated yet")
+
+        set_normal_hints(w, 10)
+        wait_for("hints['min_width']", "10")
+        assert relayouts() == "1"
+
+        # the same size hints again, or only a change in urgency
+        set_normal_hints(w, 10)
+        set_urgent(w)
+        wait_for("urgent", "True")
+        assert relayouts() == "1"
+
+        set_normal_hints(w, 20)
+        wait_for("hints['min_width']", "20")
+        assert relayouts() == "2"
+    finally:
+        manager.kill_window(two)
+        w.kill_client()
+        conn.finalize()
+
+
+@bare_config
+def test_window_icons_are_decoded_lazily(manager):
+    conn = xcbq.Connection(manager.display)
+    # two icons, 2x1 and 1x1
+    icon = ("_NET_WM_ICON", [2, 1, 1, 2, 1, 1, 3], "CARDINAL", 32)
+    w = own_window(manager, conn, "one", [icon])
+    try:
+        window = manager.c.window[w.wid]
+
+        def decoded():
+            return window.eval("sorted(self._icons, key=str)")[1]
+
+        assert decoded() == "[]"
+
+        # only the closest icon is decoded
+        assert window.eval("sorted(self.get_icons(1))") == (True, "['1x1']")
+        assert decoded() == "[1]"
+
+        # once all are decoded, other sizes are picked from them
+        assert window.eval("sorted(self.icons)") == (True, "['1x1', '2x1']")
+        assert window.eval("sorted(self.get_icons(2))") == (True, "['2x1']")
+        assert decoded() == "[1, 2, None]"
+
+        # a new icon drops the cache
+        w.set_property("_NET_WM_ICON", [3, 1, 1, 2, 3], "CARDINAL", 32)
+        conn.conn.flush()
+
+        @Retry(ignore_exceptions=(ValueError,))
+        def dropped():
+            if decoded() != "[]":
+                raise ValueError("icons are still cached")
+
+        dropped()
+        assert window.eval("sorted(self.get_icons(1))") == (True, "['3x1']")
+    finally:
+        w.kill_client()
+        conn.finalize()
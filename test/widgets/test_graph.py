@@ -0,0 +1,45 @@
+import random
+
+import pytest
+
+from libqtile.widget.graph import _RingBuffer
+
+
+def test_ring_buffer():
+    ring = _RingBuffer(3, 5)
+    assert list(ring) == [5, 5, 5]
+    assert ring.max == 5
+
+    ring.push(1)
+    ring.push(2)
+    assert list(ring) == [2, 1, 5]
+    assert ring[0] == 2
+    assert ring[-1] == 5
+    assert list(ring.oldest_first()) == [5, 1, 2]
+    assert ring.max == 5
+
+    ring.push(0)
+    assert list(ring) == [0, 2, 1]
+    assert ring.max == 2
+    with pytest.raises(IndexError):
+        ring[3]
+
+    ring.fill(7)
+    assert list(ring) == [7, 7, 7]
+    assert ring.max == 7
+    ring.push(1)
+    ring.push(1)
+    ring.push(1)
+    assert ring.max == 1
+
+
+def test_ring_buffer_max():
+    rand = random.Random(0)
+    values = [0] * 10
+    ring = _RingBuffer(10)
+    for _ in range(500):
+        value = rand.randint(0, 50)
+        values = [value] + values[:9]
+        ring.push(value)
+        assert list(ring) == values
+        assert ring.max == max(values)
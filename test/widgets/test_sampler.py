@@ -0,0 +1,139 @@
+import asyncio
+from collections import namedtuple
+
+import pytest
+
+import libqtile
+from libqtile.widget import graph, net
+from libqtile.widget import sampler as sampler_module
+from libqtile.widget.sampler import (
+    HISTORY_LENGTH,
+    SampledText,
+    Sampler,
+    cpu_percent,
+)
+
+
+class FakeScheduler:
+    def call_later(self, delay, func, *args):
+        return asyncio.get_running_loop().call_later(delay, func, *args)
+
+
+class FakeQtile:
+    scheduler = FakeScheduler()
+
+
+@pytest.fixture
+def counters(monkeypatch):
+    reads = {"a": 0, "b": 0}
+
+    def reader(name):
+        def read():
+            reads[name] += 1
+            return reads[name]
+        return read
+
+    monkeypatch.setattr(libqtile, "qtile", FakeQtile())
+    monkeypatch.setitem(sampler_module.READERS, "a", reader("a"))
+    monkeypatch.setitem(sampler_module.READERS, "b", reader("b"))
+    return reads
+
+
+def test_sources_are_read_once_per_tick(counters):
+    sampler = Sampler()
+    seen = []
+
+    def subscriber(name, source):
+        return lambda: seen.append((name, sampler.get(source).value))
+
+    async def main():
+        subs = [
+            sampler.subscribe(["a"], 0.02, subscriber("fast", "a")),
+            sampler.subscribe(["a"], 0.02, subscriber("mirror", "a")),
+            sampler.subscribe(["a", "b"], 0.04, subscriber("slow", "b")),
+        ]
+        await asyncio.sleep(0.09)
+        for sub in subs:
+            sampler.unsubscribe(sub)
+        assert sampler._timer is None
+
+    asyncio.run(main())
+    fast = [value for name, value in seen if name == "fast"]
+    mirror = [value for name, value in seen if name == "mirror"]
+    slow = [value for name, value in seen if name == "slow"]
+    assert len(fast) >= 3
+    # subscribers to the same source see the same readings
+    assert fast == mirror
+    assert counters["a"] == len(fast)
+    assert 1 <= len(slow) < len(fast)
+    assert counters["b"] == len(slow)
+    # nobody wants the history any more
+    assert sampler.history("a") == []
+
+
+def test_history(counters):
+    sampler = Sampler()
+    assert sampler.get("a").value == 1
+    assert sampler.get("a").value == 1
+    for _ in range(HISTORY_LENGTH + 1):
+        sampler._sample("a", 0)
+    assert len(sampler.history("a")) == HISTORY_LENGTH
+    assert sampler.history("a")[-1].value == HISTORY_LENGTH + 2
+
+
+def test_cpu_percent():
+    times = namedtuple("times", "user nice system idle iowait")
+    old = times(10, 0, 10, 70, 10)
+    new = times(30, 0, 20, 130, 20)
+    assert cpu_percent(None, new) == 0.0
+    assert cpu_percent(old, old) == 0.0
+    assert cpu_percent(old, new) == 30.0
+
+
+class Polled(SampledText):
+    sources = ("a",)
+
+    def tick(self):
+        self.ticks += 1
+
+
+def test_no_update_interval(counters, monkeypatch):
+    shared = Sampler()
+    monkeypatch.setattr(sampler_module, "sampler", shared)
+
+    async def main():
+        polled = Polled(update_interval=1)
+        polled.ticks = 0
+        polled.timer_setup()
+        # like any InLoopPollText, no interval means a single update
+        once = Polled(update_interval=None)
+        once.ticks = 0
+        once.timer_setup()
+        assert once.ticks == 1
+        assert [sub.interval for sub in shared._subscriptions] == [1]
+        shared.unsubscribe(polled._subscription)
+
+    asyncio.run(main())
+
+
+def test_widgets_sample_when_set_up(counters, monkeypatch):
+    shared = Sampler()
+    monkeypatch.setattr(sampler_module, "sampler", shared)
+    monkeypatch.setattr(graph, "sampler", shared)
+    monkeypatch.setattr(net, "sampler", shared)
+    # reading the config doesn't read the system yet
+    widgets = [net.Net(), graph.CPUGraph()]
+    assert shared._history == {}
+
+    texts = []
+    widgets[0].update = texts.append
+
+    async def main():
+        for widget in widgets:
+            widget.timer_setup()
+        assert set(shared._history) == {"net_io_counters", "cpu_times"}
+        assert len(texts) == 1
+        for widget in widgets:
+            shared.unsubscribe(widget._subscription)
+
+    asyncio.run(main())